@@ -5,10 +5,58 @@ from werkzeug.utils import secure_filename
 from .auth import login_required
 from .extensions import db
 from .models import Project, Skill, Contact, Blog, BlogCategory, BlogImage, SiteSetting
+from .stats import dashboard_stats
+from . import tags, uploads
+from .listing import AdminListing
+from .media_gc import delete_after_commit
 
 admin_bp = Blueprint("admin", __name__)
 
 
+# ------------- List views (projected columns only; no BLOB/long text) -------------
+
+_project_listing = AdminListing(
+	Project,
+	[Project.id, Project.title, Project.tech_stack, Project.github_link, Project.demo_link, Project.image_url, Project.created_at],
+	sortable={"created": Project.created_at, "title": Project.title},
+	default_sort="created",
+	search=(Project.title, Project.tech_stack),
+)
+_skill_listing = AdminListing(
+	Skill,
+	[Skill.id, Skill.name, Skill.level],
+	sortable={"name": Skill.name, "level": Skill.level},
+	default_sort="name",
+	default_direction="asc",
+	search=(Skill.name, Skill.level),
+)
+_contact_listing = AdminListing(
+	Contact,
+	[Contact.id, Contact.email, Contact.phone, Contact.linkedin, Contact.github],
+	sortable={"id": Contact.id, "email": Contact.email},
+	default_sort="id",
+	default_direction="asc",
+	search=(Contact.email, Contact.phone),
+)
+_category_listing = AdminListing(
+	BlogCategory,
+	[BlogCategory.id, BlogCategory.name],
+	sortable={"name": BlogCategory.name},
+	default_sort="name",
+	default_direction="asc",
+	search=(BlogCategory.name,),
+)
+_blog_listing = AdminListing(
+	Blog,
+	[Blog.id, Blog.title, Blog.category_id, Blog.created_at, BlogCategory.name.label("category_name")],
+	sortable={"created": Blog.created_at, "title": Blog.title},
+	default_sort="created",
+	search=(Blog.title,),
+	filters={"category_id": Blog.category_id},
+	joins=[(BlogCategory, Blog.category_id == BlogCategory.id)],
+)
+
+
 @admin_bp.get("/")
 @login_required
 def dashboard():
@@ -24,13 +72,19 @@ def dashboard():
 			except Exception:
 				return 0
 
-	stats = {
-		"projects": safe_count(Project, "projects"),
-		"skills": safe_count(Skill, "skills"),
-		"contacts": safe_count(Contact, "contact"),
-		"blogs": safe_count(Blog, "blogs"),
-		"categories": safe_count(BlogCategory, "blog_categories"),
-	}
+	# Counter cache maintained by triggers (see stats.py); one query for everything
+	try:
+		stats = dashboard_stats()
+	except Exception as exc:
+		current_app.logger.warning("Stats table unavailable, falling back to COUNT(*): %s", exc)
+		db.session.rollback()
+		stats = {
+			"projects": safe_count(Project, "projects"),
+			"skills": safe_count(Skill, "skills"),
+			"contacts": safe_count(Contact, "contact"),
+			"blogs": safe_count(Blog, "blogs"),
+			"categories": safe_count(BlogCategory, "blog_categories"),
+		}
 	return render_template("admin/dashboard.html", stats=stats)
 
 
@@ -45,10 +99,16 @@ def admin_settings_hero():
 		if not setting:
 			setting = SiteSetting(key="hero_image")
 			db.session.add(setting)
-		if file and file.filename:
+		uploaded = _claimed_uploads(uploads.IMAGE_EXTENSIONS)
+		if uploaded:
+			setting.image_mime = uploaded[0]["mime"] or "image/png"
+			uploads.store_blob(setting, "image_data", uploaded[0]["path"])
+		elif file and file.filename:
 			setting.image_data = file.read()
 			setting.image_mime = file.mimetype or "image/png"
 		db.session.commit()
+		for upload in uploaded:
+			uploads.discard(upload["id"])
 		flash("Hero image updated", "success")
 		return redirect(url_for("admin.admin_settings_hero"))
 	return render_template("admin/setting_hero.html", setting=setting)
@@ -65,7 +125,15 @@ def admin_settings_cv():
 		if not setting:
 			setting = SiteSetting(key="cv_file")
 			db.session.add(setting)
-		if file and file.filename:
+		uploaded = _claimed_uploads(uploads.DOCUMENT_EXTENSIONS)
+		if uploaded:
+			setting.image_mime = "application/pdf"
+			uploads.store_blob(setting, "image_data", uploaded[0]["path"])
+			db.session.commit()
+			for upload in uploaded:
+				uploads.discard(upload["id"])
+			flash("CV updated", "success")
+		elif file and file.filename:
 			filename = secure_filename(file.filename)
 			ext = os.path.splitext(filename)[1].lower()
 			# Allow only PDF files for CV uploads
@@ -88,8 +156,8 @@ def admin_settings_cv():
 @admin_bp.get("/projects")
 @login_required
 def admin_projects():
-	items = Project.query.order_by(Project.created_at.desc()).all()
-	return render_template("admin/projects.html", items=items)
+	page = _project_listing.page(request.args)
+	return render_template("admin/projects.html", items=page.items, page=page)
 
 
 @admin_bp.route("/projects/create", methods=["GET", "POST"])
@@ -121,6 +189,7 @@ def admin_project_create():
 				item.image_data = file.read()
 				item.image_mime = file.mimetype or "application/octet-stream"
 		db.session.add(item)
+		tags.set_project_tags(item)
 		db.session.commit()
 		flash("Project created", "success")
 		return redirect(url_for("admin.admin_projects"))
@@ -137,30 +206,30 @@ def admin_project_edit(item_id: int):
 		item.tech_stack = request.form.get("tech_stack", item.tech_stack)
 		item.github_link = request.form.get("github_link", item.github_link)
 		item.demo_link = request.form.get("demo_link", item.demo_link)
+		tags.set_project_tags(item)
 		# Remove existing image if requested
 		if request.form.get("remove_image") == "on" and item.image_url:
-			try:
-				_delete_uploaded_file(item.image_url)
-			except Exception:
-				pass
+			delete_after_commit(item.image_url)
 			item.image_url = None
+			item.image_data = None
+			item.image_mime = None
 		# Handle new upload (replaces existing)
 		file = request.files.get("image")
 		if file and file.filename:
-			# Delete old file if exists
-			if item.image_url:
-				try:
-					_delete_uploaded_file(item.image_url)
-				except Exception:
-					pass
 			filename = secure_filename(file.filename)
 			ext = os.path.splitext(filename)[1].lower()
 			if ext := ext_validation(ext=ext):
+				# Old file goes only once the replacement is committed
+				if item.image_url:
+					delete_after_commit(item.image_url)
 				saved_name = f"{uuid4().hex}{ext}"
 				upload_path = _get_upload_path()
 				os.makedirs(upload_path, exist_ok=True)
 				file.save(os.path.join(upload_path, saved_name))
 				item.image_url = f"/uploads/{saved_name}"
+				file.seek(0)
+				item.image_data = file.read()
+				item.image_mime = file.mimetype or "application/octet-stream"
 		db.session.commit()
 		flash("Project updated", "success")
 		return redirect(url_for("admin.admin_projects"))
@@ -171,12 +240,8 @@ def admin_project_edit(item_id: int):
 @login_required
 def admin_project_delete(item_id: int):
 	item = Project.query.get_or_404(item_id)
-	# Remove uploaded image file if present
-	if getattr(item, "image_url", None):
-		try:
-			_delete_uploaded_file(item.image_url)
-		except Exception:
-			pass
+	# Remove uploaded image file once the delete is committed
+	delete_after_commit(item.image_url)
 	db.session.delete(item)
 	db.session.commit()
 	flash("Project deleted", "info")
@@ -186,8 +251,26 @@ def admin_project_delete(item_id: int):
 # ---------- Helpers for upload handling ----------
 
 def ext_validation(*, ext: str) -> str | None:
-	allowed = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
-	return ext if ext in allowed else None
+	return ext if ext in uploads.IMAGE_EXTENSIONS else None
+
+
+def _claimed_uploads(allowed: set[str]) -> list[dict]:
+	"""Finished resumable uploads the form refers to (``upload_id`` fields)."""
+	claimed = []
+	for upload_id in request.form.getlist("upload_id"):
+		try:
+			claimed.append(uploads.claim(upload_id, allowed))
+		except uploads.UploadError as exc:
+			flash(f"Upload skipped: {exc}", "warning")
+	return claimed
+
+
+def _add_blog_images(blog: Blog) -> None:
+	"""Attach resumable uploads to ``blog``: file renamed into uploads/, bytes streamed into the row."""
+	for upload in _claimed_uploads(uploads.IMAGE_EXTENSIONS):
+		bi = BlogImage(blog_id=blog.id, image_url=uploads.publish(upload), image_mime=upload["mime"])
+		db.session.add(bi)
+		uploads.store_blob(bi, "image_data", upload["path"])
 
 
 def _get_upload_path() -> str:
@@ -195,21 +278,13 @@ def _get_upload_path() -> str:
 	return os.path.join(current_app.instance_path, "uploads")
 
 
-def _delete_uploaded_file(image_url: str) -> None:
-	if image_url.startswith("/uploads/"):
-		fname = image_url.split("/uploads/", 1)[1]
-		path = os.path.join(_get_upload_path(), fname)
-		if os.path.exists(path):
-			os.remove(path)
-
-
 # ------------- Skills -------------
 
 @admin_bp.get("/skills")
 @login_required
 def admin_skills():
-	items = Skill.query.all()
-	return render_template("admin/skills.html", items=items)
+	page = _skill_listing.page(request.args)
+	return render_template("admin/skills.html", items=page.items, page=page)
 
 
 @admin_bp.route("/skills/create", methods=["GET", "POST"])
@@ -252,8 +327,8 @@ def admin_skill_delete(item_id: int):
 @admin_bp.get("/contact")
 @login_required
 def admin_contact():
-	items = Contact.query.all()
-	return render_template("admin/contact.html", items=items)
+	page = _contact_listing.page(request.args)
+	return render_template("admin/contact.html", items=page.items, page=page)
 
 
 @admin_bp.route("/contact/create", methods=["GET", "POST"])
@@ -303,8 +378,8 @@ def admin_contact_delete(item_id: int):
 @admin_bp.get("/categories")
 @login_required
 def admin_categories():
-	items = BlogCategory.query.all()
-	return render_template("admin/categories.html", items=items)
+	page = _category_listing.page(request.args)
+	return render_template("admin/categories.html", items=page.items, page=page)
 
 
 @admin_bp.route("/categories/create", methods=["GET", "POST"])
@@ -346,9 +421,9 @@ def admin_category_delete(item_id: int):
 @admin_bp.get("/blogs")
 @login_required
 def admin_blogs():
-	items = Blog.query.order_by(Blog.created_at.desc()).all()
-	cats = BlogCategory.query.all()
-	return render_template("admin/blogs.html", items=items, categories=cats)
+	page = _blog_listing.page(request.args)
+	cats = db.session.execute(db.select(BlogCategory.id, BlogCategory.name).order_by(BlogCategory.name)).all()
+	return render_template("admin/blogs.html", items=page.items, page=page, categories=cats)
 
 
 @admin_bp.route("/blogs/create", methods=["GET", "POST"])
@@ -383,6 +458,7 @@ def admin_blog_create():
 					bi.image_data = file.read()
 					bi.image_mime = file.mimetype or "application/octet-stream"
 					db.session.add(bi)
+		_add_blog_images(item)
 		db.session.commit()
 		flash("Blog created", "success")
 		return redirect(url_for("admin.admin_blogs"))
@@ -403,10 +479,7 @@ def admin_blog_edit(item_id: int):
 		# optional remove images
 		for img in list(item.images):
 			if request.form.get(f"remove_image_{img.id}") == "on":
-				try:
-					_delete_uploaded_file(img.image_url)
-				except Exception:
-					pass
+				delete_after_commit(img.image_url)
 				db.session.delete(img)
 
 		# add new images
@@ -426,6 +499,7 @@ def admin_blog_edit(item_id: int):
 					bi.image_data = file.read()
 					bi.image_mime = file.mimetype or "application/octet-stream"
 					db.session.add(bi)
+		_add_blog_images(item)
 
 		db.session.commit()
 		flash("Blog updated", "success")
@@ -437,12 +511,9 @@ def admin_blog_edit(item_id: int):
 @login_required
 def admin_blog_delete(item_id: int):
 	item = Blog.query.get_or_404(item_id)
-	# delete images from disk
+	# delete images from disk once the rows are gone
 	for img in item.images:
-		try:
-			_delete_uploaded_file(img.image_url)
-		except Exception:
-			pass
+		delete_after_commit(img.image_url)
 	db.session.delete(item)
 	db.session.commit()
 	flash("Blog deleted", "info")
@@ -1,9 +1,13 @@
-from flask import Blueprint, request, jsonify, current_app, session
+from datetime import datetime
+
+from flask import Blueprint, Response, request, jsonify, current_app, session
 from sqlalchemy.exc import SQLAlchemyError
-import requests
 import os
 
+from . import tags
+from .blog_index import facet_index
 from .extensions import db
+from .throttle import contact_admission
 from .models import Project, Skill, Contact, ContactMessage, Blog, BlogCategory, BlogImage
 
 api_bp = Blueprint("api", __name__)
@@ -42,6 +46,8 @@ def send_telegram_message(message_text):
 			"parse_mode": "HTML"
 		}
 		
+		import requests  # deferred until a message is actually sent
+
 		response = requests.post(url, data=data, timeout=10)
 		response.raise_for_status()
 		
@@ -56,6 +62,7 @@ def send_telegram_message(message_text):
 # ---------- Contact Form ----------
 
 @api_bp.post("/contact")
+@contact_admission
 def submit_contact():
 	"""Handle contact form submission and send to Telegram"""
 	try:
@@ -113,10 +120,34 @@ def submit_contact():
 
 # ---------- Projects ----------
 
+# Same keys as Project.to_dict(), selected as plain columns: no BLOBs loaded, no
+# ORM objects built, rows handed straight to the JSON provider
+_PROJECT_FIELDS = (
+	Project.id, Project.title, Project.description, Project.tech_stack,
+	Project.github_link, Project.demo_link, Project.image_url, Project.created_at,
+)
+
+
+def _tech_filter() -> tuple[list[str], str]:
+	"""``?tech=a&tech=b`` (or ``tech=a,b``); ``match=any`` relaxes the default all-of, ``match=contains`` matches inside tags."""
+	match = request.args.get("match", "all")
+	return tags.slugs(request.args.getlist("tech")), match if match in tags.MATCH_MODES else "all"
+
+
 @api_bp.get("/projects")
 def list_projects():
-	items = Project.query.order_by(Project.created_at.desc()).all()
-	return jsonify([i.to_dict() for i in items])
+	tech, match = _tech_filter()
+	stmt = tags.filter_projects(db.select(*_PROJECT_FIELDS), tech, match)
+	rows = db.session.execute(stmt.order_by(Project.created_at.desc())).all()
+	return jsonify(rows)
+
+
+@api_bp.get("/projects/facets")
+def project_facets():
+	"""Tag counts for the projects matching the same ``tech``/``match`` filter."""
+	tech, match = _tech_filter()
+	limit = request.args.get("limit", type=int)
+	return jsonify({"selected": tech, **tags.facets(tech, match, limit)})
 
 
 @api_bp.post("/projects")
@@ -131,6 +162,7 @@ def create_project():
 		image_url=data.get("image_url"),
 	)
 	db.session.add(item)
+	tags.set_project_tags(item)
 	commit_or_rollback()
 	return jsonify(item.to_dict()), 201
 
@@ -149,6 +181,8 @@ def update_project(item_id: int):
 	for field in ["title", "description", "tech_stack", "github_link", "demo_link", "image_url"]:
 		if field in data:
 			setattr(item, field, data[field])
+	if "tech_stack" in data:
+		tags.set_project_tags(item)
 	commit_or_rollback()
 	return jsonify(item.to_dict())
 
@@ -251,14 +285,49 @@ def delete_category(item_id: int):
 
 # ---------- Blogs ----------
 
+# Same keys as Blog.to_dict(); the category name comes from a join instead of a lazy load per blog
+_BLOG_FIELDS = (
+	Blog.id, Blog.title, Blog.category_id, BlogCategory.name.label("category_name"), Blog.content, Blog.created_at,
+)
+
+
+def _archive_range() -> tuple[datetime, datetime] | None:
+	"""``?month=YYYY-MM`` or ``?year=YYYY`` as a created_at range."""
+	try:
+		if month := request.args.get("month"):
+			start = datetime.strptime(month, "%Y-%m")
+			return start, start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+		if year := request.args.get("year", type=int):
+			return datetime(year, 1, 1), datetime(year + 1, 1, 1)
+	except ValueError:
+		pass
+	return None
+
+
 @api_bp.get("/blogs")
 def list_blogs():
 	category_id = request.args.get("category_id", type=int)
-	query = Blog.query
+	stmt = db.select(*_BLOG_FIELDS).outerjoin(BlogCategory, Blog.category_id == BlogCategory.id)
 	if category_id:
-		query = query.filter(Blog.category_id == category_id)
-	items = query.order_by(Blog.created_at.desc()).all()
-	return jsonify([i.to_dict() for i in items])
+		stmt = stmt.where(Blog.category_id == category_id)
+	if window := _archive_range():
+		stmt = stmt.where(Blog.created_at >= window[0], Blog.created_at < window[1])
+	rows = db.session.execute(stmt.order_by(Blog.created_at.desc())).all()
+	return jsonify(rows)
+
+
+@api_bp.get("/blogs/facets")
+def blog_facets():
+	"""Posts per category and per year/month from the trigger-maintained index."""
+	payload, etag = facet_index.get()
+	# Weak comparison: compression hands clients a W/ version of this tag
+	if request.if_none_match.contains_weak(etag):
+		resp = Response(status=304)
+	else:
+		resp = jsonify(payload)
+	resp.set_etag(etag)
+	resp.headers["Cache-Control"] = "no-cache"
+	return resp
 
 
 @api_bp.post("/blogs")
@@ -1,20 +1,24 @@
 import os
-import logging
-from logging.handlers import RotatingFileHandler
+import threading
 from pathlib import Path
 
-from flask import Flask, jsonify, send_from_directory, request
-from dotenv import load_dotenv
+from flask import Flask, jsonify, request
 from werkzeug.exceptions import HTTPException, BadRequest, RequestEntityTooLarge
 
 from .extensions import db
 from .config import Config
 
 
-def create_app() -> Flask:
-	load_dotenv()
-
-	app = Flask(__name__, instance_relative_config=True, template_folder=os.path.join(os.path.dirname(__file__), "..", "templates"))
+def create_app(instance_path: str | None = None) -> Flask:
+	# INSTANCE_PATH moves the database default, uploads, logs and every state file
+	# (benchmarks and tests point it at a scratch directory); Flask wants it absolute
+	instance_path = instance_path or os.getenv("INSTANCE_PATH")
+	app = Flask(
+		__name__,
+		instance_path=os.path.abspath(instance_path) if instance_path else None,
+		instance_relative_config=True,
+		template_folder=os.path.join(os.path.dirname(__file__), "..", "templates"),
+	)
 
 	# Ensure instance folder exists
 	Path(app.instance_path).mkdir(parents=True, exist_ok=True)
@@ -25,6 +29,17 @@ def create_app() -> Flask:
 	# Override with instance config if available
 	app.config.from_pyfile('config.py', silent=True)
 
+	# Behind TRUSTED_PROXY_HOPS proxies, take the client address and scheme from
+	# the X-Forwarded-* values they appended; with none, clients cannot spoof them
+	hops = int(app.config.get("TRUSTED_PROXY_HOPS", 0))
+	if hops > 0:
+		from werkzeug.middleware.proxy_fix import ProxyFix
+		app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops, x_host=0)
+
+	# Fast JSON (orjson when installed); metrics swaps in a timed subclass
+	from .json_provider import JSONProvider
+	app.json = JSONProvider(app)
+
 	# Init extensions
 	db.init_app(app)
 
@@ -34,11 +49,31 @@ def create_app() -> Flask:
 	from .auth import auth_bp
 	from .github import github_bp
 	from .public import public_bp
+	from .metrics import metrics_bp
+	from .transfer import transfer_bp
+	from .inbox import inbox_bp
+	from .assets import assets_bp
+	from .media_gc import media_bp
+	from .backup import backup_bp
+	from .health import health_bp
+	from .profiling import profiles_bp
+	from .uploads import uploads_bp
+	from .service_worker import sw_bp
 
 	app.register_blueprint(api_bp, url_prefix="/api")
 	app.register_blueprint(github_bp, url_prefix="/api")
+	app.register_blueprint(uploads_bp, url_prefix="/api")
 	app.register_blueprint(auth_bp, url_prefix="/admin")
 	app.register_blueprint(admin_bp, url_prefix="/admin")
+	app.register_blueprint(transfer_bp, url_prefix="/admin")
+	app.register_blueprint(inbox_bp, url_prefix="/admin")
+	app.register_blueprint(media_bp, url_prefix="/admin")
+	app.register_blueprint(backup_bp, url_prefix="/admin")
+	app.register_blueprint(profiles_bp, url_prefix="/admin")
+	app.register_blueprint(metrics_bp)
+	app.register_blueprint(health_bp)
+	app.register_blueprint(assets_bp)
+	app.register_blueprint(sw_bp)
 	app.register_blueprint(public_bp)
 
 	# Error handlers
@@ -82,15 +117,9 @@ def create_app() -> Flask:
 			return jsonify(payload), error.code or 500
 		return error
 
-	# Logging
-	_log_level = getattr(logging, str(app.config.get("LOG_LEVEL", "INFO")).upper(), logging.INFO)
-	app.logger.setLevel(_log_level)
-	log_path = os.path.join(app.instance_path, "app.log")
-	file_handler = RotatingFileHandler(log_path, maxBytes=512 * 1024, backupCount=3)
-	file_handler.setLevel(_log_level)
-	formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s")
-	file_handler.setFormatter(formatter)
-	app.logger.addHandler(file_handler)
+	# Logging (queue-based, JSON lines in instance/app.log)
+	from . import logs
+	logs.init_app(app)
 
 	# Create DB tables if not exist and run light migrations
 	with app.app_context():
@@ -141,13 +170,58 @@ def create_app() -> Flask:
 					conn.commit()
 		except Exception as exc:
 			app.logger.warning("Skipping image_url migration: %s", exc)
+			migrated = False
+		else:
+			migrated = True
+
+		# Later schema steps each run on their own, so one failure neither hides
+		# nor skips the rest; /readyz only sees the new version when all succeeded
+		from . import blog_index, github_history, inbox, stats, tags
+		schema_steps = [
+			("dashboard counters", stats.ensure_schema),  # counter cache tables + triggers
+			("contact inbox", inbox.ensure_schema),  # is_read column, created_at index, FTS5 search
+			("GitHub history", github_history.ensure_schema),  # delta-encoded days, weekly/monthly rollups
+			("project tags", tags.ensure_schema),  # backfills project_tags from tech_stack once
+			("blog facet index", blog_index.ensure_schema),  # per category/month counts kept by triggers
+		]
+		try:
+			with db.engine.connect() as conn:
+				for name, ensure_schema in schema_steps:
+					try:
+						ensure_schema(conn)
+					except Exception:
+						conn.rollback()
+						migrated = False
+						app.logger.exception("Schema migration failed: %s", name)
+				if migrated:
+					from .health import mark_migrated
+					mark_migrated(conn)
+		except Exception as exc:
+			app.logger.exception("Schema migrations could not run: %s", exc)
+
+	# In-process SiteSetting cache, invalidated on commit
+	from . import site_settings
+	site_settings.init_app(app)
+
+	# Uploads are unlinked after the deleting transaction commits
+	from . import media_gc
+	media_gc.init_app(app)
 
-	# Serve frontend assets
-	frontend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "frontend"))
+	# Request instrumentation (Server-Timing header and /metrics)
+	from . import metrics
+	metrics.init_app(app)
 
-	@app.route("/assets/<path:filename>")
-	def assets(filename: str):
-		return send_from_directory(os.path.join(frontend_dir, "assets"), filename)
+	# Response compression (after metrics so it is timed as its own phase)
+	from . import compression
+	compression.init_app(app)
+
+	# ETags and 304s for API JSON (the service worker revalidates with them); runs before compression
+	from . import service_worker
+	service_worker.init_app(app)
+
+	# Opt-in sampling profiler (no hooks at all unless PROFILE_ENABLED)
+	from . import profiling
+	profiling.init_app(app)
 
 	# Ensure DB session cleanup and rollback on errors to avoid cascading failures
 	@app.teardown_request
@@ -159,5 +233,22 @@ def create_app() -> Flask:
 			db.session.remove()
 
 	return app
-# Expose a module-level app instance for platforms that don't support --factory
-app = create_app()
+
+
+_app_lock = threading.Lock()
+
+
+def __getattr__(name: str):
+	"""Build the module-level ``app`` on first access (``gunicorn backend.app:app``).
+
+	Importing this module for ``create_app`` (run.py, the CLI, benchmarks)
+	no longer constructs an app as a side effect, so each process builds
+	exactly one.
+	"""
+	if name != "app":
+		raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+	global app
+	with _app_lock:
+		if "app" not in globals():
+			app = create_app()
+	return app
@@ -0,0 +1,341 @@
+import gzip
+import json
+import mimetypes
+import os
+import re
+import shutil
+from hashlib import blake2b
+from time import time
+
+import click
+from flask import Blueprint, current_app, request, send_from_directory
+
+try:  # optional: without it only .gz siblings are produced
+	import brotli
+except ImportError:  # pragma: no cover - depends on environment
+	brotli = None
+
+assets_bp = Blueprint("assets", __name__, cli_group="assets")
+
+FRONTEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "frontend"))
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# Precompressed siblings, in order of preference
+_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+_SCRIPT_RUN = re.compile(r'(?:[ \t]*<script src="/assets/[\w.-]+\.js"></script>\s*)+')
+_SCRIPT_SRC = re.compile(r'<script src="/assets/([\w.-]+\.js)"></script>')
+_STYLESHEET = re.compile(r'(<link href=")/assets/([\w.-]+\.css)(" rel="stylesheet"\s*/?>)')
+
+
+# ---------- Minifiers ----------
+#
+# Deliberately conservative: comments and indentation go, but a line break
+# is kept wherever the source had one (so automatic semicolon insertion
+# behaves exactly as before) and string, template and regex literals are
+# copied verbatim.
+
+_WORD = re.compile(r"[\w$]")
+_REGEX_KEYWORDS = {"return", "typeof", "case", "do", "else", "in", "of", "new", "delete", "void", "throw", "instanceof", "yield", "await"}
+
+
+def _skip_string(src: str, i: int) -> int:
+	quote = src[i]
+	i += 1
+	while i < len(src):
+		c = src[i]
+		if c == "\\":
+			i += 2
+			continue
+		if c == quote:
+			return i + 1
+		if quote == "`" and src.startswith("${", i):
+			i = _skip_expression(src, i + 2)
+			continue
+		i += 1
+	return i
+
+
+def _skip_expression(src: str, i: int) -> int:
+	"""Skip a template ``${...}`` body, returning the index after its ``}``."""
+	depth = 1
+	while i < len(src):
+		c = src[i]
+		if c in "'\"`":
+			i = _skip_string(src, i)
+			continue
+		if c == "{":
+			depth += 1
+		elif c == "}":
+			depth -= 1
+			if depth == 0:
+				return i + 1
+		i += 1
+	return i
+
+
+def _skip_regex(src: str, i: int) -> int:
+	i += 1
+	in_class = False
+	while i < len(src) and src[i] != "\n":
+		c = src[i]
+		if c == "\\":
+			i += 2
+			continue
+		if c == "[":
+			in_class = True
+		elif c == "]":
+			in_class = False
+		elif c == "/" and not in_class:
+			i += 1
+			while i < len(src) and _WORD.match(src[i]):
+				i += 1
+			return i
+		i += 1
+	return i
+
+
+def _regex_allowed(out: list[str]) -> bool:
+	text = "".join(out[-12:]).rstrip()
+	if not text:
+		return True
+	if text[-1] in "(,=:[!&|?{};+-*%<>~^}":
+		return True
+	word = re.search(r"[\w$]+$", text)
+	return bool(word and word.group(0) in _REGEX_KEYWORDS)
+
+
+def _skip_blank(src: str, i: int, line_comments: bool) -> tuple[int, bool]:
+	"""Skip whitespace and comments from ``i``; report whether a line break was crossed."""
+	n = len(src)
+	newline = False
+	while i < n:
+		if src[i] in " \t\r\n":
+			newline = newline or src[i] == "\n"
+			i += 1
+		elif src.startswith("/*", i):
+			end = src.find("*/", i + 2)
+			end = n if end == -1 else end + 2
+			newline = newline or "\n" in src[i:end]
+			i = end
+		elif line_comments and src.startswith("//", i):
+			end = src.find("\n", i)
+			i = n if end == -1 else end
+		else:
+			break
+	return i, newline
+
+
+def minify_js(src: str) -> str:
+	out: list[str] = []
+	i, n = 0, len(src)
+	while i < n:
+		c = src[i]
+		if c in " \t\r\n" or src.startswith(("/*", "//"), i):
+			i, newline = _skip_blank(src, i, line_comments=True)
+			before, after = (out[-1][-1:] if out else ""), src[i:i + 1]
+			if not before or not after:
+				continue
+			if newline:
+				out.append("\n")
+			elif (_WORD.match(before) and _WORD.match(after)) or before + after in ("++", "--", "+-", "-+"):
+				out.append(" ")
+		elif c in "'\"`":
+			j = _skip_string(src, i)
+			out.append(src[i:j])
+			i = j
+		elif c == "/" and _regex_allowed(out):
+			j = _skip_regex(src, i)
+			out.append(src[i:j])
+			i = j
+		else:
+			out.append(c)
+			i += 1
+	return "".join(out) + "\n"
+
+
+def minify_css(src: str) -> str:
+	out: list[str] = []
+	i, n = 0, len(src)
+	while i < n:
+		c = src[i]
+		if c in " \t\r\n" or src.startswith("/*", i):
+			i, _ = _skip_blank(src, i, line_comments=False)
+			before, after = (out[-1][-1:] if out else ""), src[i:i + 1]
+			# A space before ":" may be a descendant combinator (a :hover), so it stays
+			if before and after and before not in "{};,>:(" and after not in "{};,>)":
+				out.append(" ")
+		elif c in "'\"":
+			j = _skip_string(src, i)
+			out.append(src[i:j])
+			i = j
+		else:
+			if c == "}" and out and out[-1] == ";":
+				out.pop()
+			out.append(c)
+			i += 1
+	return "".join(out) + "\n"
+
+
+# ---------- Build ----------
+
+def _digest(data: bytes) -> str:
+	return blake2b(data, digest_size=5).hexdigest()
+
+
+def _write_variants(path: str, data: bytes) -> None:
+	with open(path, "wb") as fh:
+		fh.write(data)
+	gz = gzip.compress(data, compresslevel=9, mtime=0)
+	if len(gz) < len(data):
+		with open(path + ".gz", "wb") as fh:
+			fh.write(gz)
+	if brotli is not None:
+		br = brotli.compress(data, quality=11)
+		if len(br) < len(data):
+			with open(path + ".br", "wb") as fh:
+				fh.write(br)
+
+
+def build(source_dir: str = FRONTEND_DIR, dist_dir: str | None = None) -> dict:
+	"""Bundle, minify and fingerprint ``frontend/assets`` into ``dist_dir``.
+
+	Each run of adjacent local ``<script>`` tags in a page becomes one bundle
+	(order preserved, so globals still resolve), stylesheets are minified
+	individually, and rewritten copies of the HTML pages are written next to
+	the hashed files. Returns the manifest (logical name -> hashed name).
+	"""
+	dist_dir = dist_dir or os.path.join(source_dir, "dist")
+	asset_src = os.path.join(source_dir, "assets")
+	staging = dist_dir + ".tmp"
+	shutil.rmtree(staging, ignore_errors=True)
+	os.makedirs(os.path.join(staging, "assets"))
+
+	manifest: dict[str, str] = {}
+	cache: dict[str, str] = {}
+
+	def emit(logical: str, text: str) -> str:
+		data = text.encode("utf-8")
+		stem, ext = os.path.splitext(logical)
+		hashed = f"{stem}.{_digest(data)}{ext}"
+		if hashed not in cache.values():
+			_write_variants(os.path.join(staging, "assets", hashed), data)
+		manifest[logical] = hashed
+		return hashed
+
+	def read(name: str) -> str:
+		with open(os.path.join(asset_src, name), encoding="utf-8") as fh:
+			return fh.read()
+
+	def bundle(names: list[str]) -> str:
+		key = "+".join(names)
+		if key not in cache:
+			logical = "-".join(os.path.splitext(name)[0] for name in names) + ".js"
+			code = ";\n".join(minify_js(read(name)) for name in names)
+			cache[key] = emit(logical, code)
+		return cache[key]
+
+	def stylesheet(name: str) -> str:
+		if name not in cache:
+			cache[name] = emit(name, minify_css(read(name)))
+		return cache[name]
+
+	def rewrite_scripts(match: re.Match) -> str:
+		block = match.group(0)
+		indent = re.match(r"[ \t]*", block).group(0)
+		trailing = block[len(block.rstrip()):]
+		names = _SCRIPT_SRC.findall(block)
+		return f'{indent}<script src="/assets/{bundle(names)}"></script>{trailing}'
+
+	pages = sorted(name for name in os.listdir(source_dir) if name.endswith(".html"))
+	for page in pages:
+		with open(os.path.join(source_dir, page), encoding="utf-8") as fh:
+			html = fh.read()
+		html = _SCRIPT_RUN.sub(rewrite_scripts, html)
+		html = _STYLESHEET.sub(lambda m: f"{m.group(1)}/assets/{stylesheet(m.group(2))}{m.group(3)}", html)
+		with open(os.path.join(staging, page), "w", encoding="utf-8") as fh:
+			fh.write(html)
+
+	with open(os.path.join(staging, "manifest.json"), "w", encoding="utf-8") as fh:
+		json.dump({"assets": manifest, "pages": pages}, fh, indent=2, sort_keys=True)
+	# Swap the finished tree in so a running server never sees a half-built dist
+	old = dist_dir + ".old"
+	shutil.rmtree(old, ignore_errors=True)
+	if os.path.isdir(dist_dir):
+		os.rename(dist_dir, old)
+	os.rename(staging, dist_dir)
+	shutil.rmtree(old, ignore_errors=True)
+	return manifest
+
+
+@assets_bp.cli.command("build")
+@click.option("--out", "out_dir", default=None, help="output directory (default frontend/dist)")
+def build_command(out_dir: str | None):
+	"""Bundle, minify, fingerprint and precompress the frontend assets."""
+	manifest = build(FRONTEND_DIR, out_dir or current_app.config.get("ASSETS_DIST_DIR") or None)
+	for logical, hashed in sorted(manifest.items()):
+		click.echo(f"{logical} -> {hashed}")
+
+
+# ---------- Serving ----------
+
+_dist_state = {"checked": 0.0, "path": None, "warned": False}
+
+
+def _sources_mtime() -> float:
+	newest = 0.0
+	for directory in (FRONTEND_DIR, os.path.join(FRONTEND_DIR, "assets")):
+		for entry in os.scandir(directory):
+			if entry.is_file() and entry.name.endswith((".html", ".js", ".css")):
+				newest = max(newest, entry.stat().st_mtime)
+	return newest
+
+
+def dist_dir() -> str | None:
+	"""The built output directory, or None when no build is present or it is older than the sources.
+
+	Checked at most every ``ASSETS_CHECK_INTERVAL`` seconds, so an edited
+	page is served from source until the next build instead of from a stale dist.
+	"""
+	now = time()
+	if now - _dist_state["checked"] < float(current_app.config.get("ASSETS_CHECK_INTERVAL", 2)):
+		return _dist_state["path"]
+	path = current_app.config.get("ASSETS_DIST_DIR") or os.path.join(FRONTEND_DIR, "dist")
+	try:
+		built = os.stat(os.path.join(path, "manifest.json")).st_mtime
+	except OSError:
+		built = None
+	if built is not None and built < _sources_mtime():
+		if not _dist_state["warned"]:
+			current_app.logger.warning("%s is older than frontend/ sources; serving sources until the next assets build", path)
+			_dist_state["warned"] = True
+		built = None
+	_dist_state.update(checked=now, path=path if built is not None else None)
+	return _dist_state["path"]
+
+
+def pages_dir() -> str:
+	"""Where HTML pages should be served from (rewritten copies once built)."""
+	return dist_dir() or FRONTEND_DIR
+
+
+@assets_bp.route("/assets/<path:filename>")
+def asset(filename: str):
+	built = dist_dir()
+	if built is None or not os.path.isfile(os.path.join(built, "assets", filename)):
+		# Unbuilt source files (development, or old unhashed URLs)
+		return send_from_directory(os.path.join(FRONTEND_DIR, "assets"), filename)
+
+	directory = os.path.join(built, "assets")
+	mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+	served, encoding = filename, None
+	for name, suffix in _ENCODINGS:
+		if request.accept_encodings[name] and os.path.isfile(os.path.join(directory, filename + suffix)):
+			served, encoding = filename + suffix, name
+			break
+	resp = send_from_directory(directory, served, mimetype=mimetype)
+	if encoding:
+		resp.headers["Content-Encoding"] = encoding
+	resp.headers["Vary"] = "Accept-Encoding"
+	resp.headers["Cache-Control"] = IMMUTABLE
+	return resp
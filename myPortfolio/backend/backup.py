@@ -0,0 +1,431 @@
+"""Online backups of the SQLite database.
+
+Copying ``portfolio.db`` while workers write can capture a half-written
+page set, and one long read blocks writers for its whole duration. Backups
+here use SQLite's online backup API instead: ``BACKUP_PAGES_PER_STEP`` pages
+are copied per step under a short shared lock, with a pause between steps so
+writers get the database in between (SQLite restarts the copy if another
+connection changed it). The snapshot is checked, optionally zstd-compressed,
+renamed into ``instance/backups`` and older ones beyond ``BACKUP_KEEP`` are
+rotated out.
+
+Restores run ``PRAGMA integrity_check`` on the snapshot first, keep a
+pre-restore backup of the live database, and copy the snapshot in with the
+same backup API so open connections never see a partial file.
+"""
+
+import os
+import re
+import shutil
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from time import perf_counter, sleep
+
+import click
+from flask import Blueprint, abort, current_app, flash, redirect, render_template, send_file, url_for
+from sqlalchemy.exc import SQLAlchemyError
+
+from .auth import login_required
+from .extensions import db
+
+try:  # optional; without it backups are stored uncompressed
+	import zstandard
+except ImportError:  # pragma: no cover - depends on environment
+	zstandard = None
+
+try:  # POSIX only; elsewhere concurrent backups are not prevented across workers
+	import fcntl
+except ImportError:  # pragma: no cover - Windows
+	fcntl = None
+
+backup_bp = Blueprint("backup", __name__, cli_group="backup")
+
+_NAME = re.compile(r"^[\w.-]+-\d{8}T\d{6}Z(?:-[\w-]+)?\.db(?:\.zst)?$")
+_REQUIRED_TABLES = {"projects", "blogs", "site_settings"}
+
+
+class BackupError(Exception):
+	pass
+
+
+# ---------- Paths ----------
+
+def database_path() -> str:
+	url = db.engine.url
+	if url.get_backend_name() != "sqlite" or not url.database or url.database == ":memory:":
+		raise BackupError("backups need a file-based SQLite database")
+	return url.database
+
+
+def backup_dir() -> str:
+	path = current_app.config.get("BACKUP_DIR") or os.path.join(current_app.instance_path, "backups")
+	os.makedirs(path, exist_ok=True)
+	return path
+
+
+def _backup_path(name: str) -> str:
+	if not _NAME.match(name):
+		raise BackupError(f"not a backup name: {name}")
+	path = os.path.join(backup_dir(), name)
+	if not os.path.isfile(path):
+		raise BackupError(f"no such backup: {name}")
+	return path
+
+
+def list_backups() -> list[dict]:
+	"""Backups in the backup directory, newest first."""
+	items = []
+	for entry in os.scandir(backup_dir()):
+		if entry.is_file() and _NAME.match(entry.name):
+			stat = entry.stat()
+			items.append({
+				"name": entry.name,
+				"size": stat.st_size,
+				"created": datetime.fromtimestamp(stat.st_mtime, timezone.utc),
+				"compressed": entry.name.endswith(".zst"),
+			})
+	return sorted(items, key=lambda item: (item["created"], item["name"]), reverse=True)
+
+
+# ---------- Copying ----------
+
+class _Restarted(Exception):
+	pass
+
+
+def _online_copy(source: str, target: str, pages: int, pause: float, max_restarts: int = 0) -> int:
+	"""Copy ``source`` into ``target`` step by step; returns the page count.
+
+	A write from another connection makes SQLite start the copy over. After
+	``max_restarts`` of those the copy is finished in one step instead, which
+	holds the read lock for the whole copy but is certain to complete.
+	"""
+	src = sqlite3.connect(source, timeout=30)
+	dst = sqlite3.connect(target)
+	total = 0
+	restarts = 0
+	try:
+		def progress(status, remaining, count):
+			nonlocal total, restarts
+			# A restarted copy makes no headway: the same pages are left afterwards
+			if total and remaining and count - remaining <= copied[0]:
+				restarts += 1
+				if restarts > max_restarts:
+					raise _Restarted
+			total = count
+			copied[0] = count - remaining
+			if remaining and pause:
+				sleep(pause)  # no lock is held between steps: let writers in
+
+		copied = [0]
+		try:
+			src.backup(dst, pages=pages, progress=progress)
+		except _Restarted:
+			src.backup(dst, pages=-1)
+			total = src.execute("PRAGMA page_count").fetchone()[0]
+	finally:
+		dst.close()
+		src.close()
+	return total
+
+
+def _check(path: str, full: bool = True) -> None:
+	"""Raise unless ``path`` is a sound copy of this app's database."""
+	conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+	try:
+		rows = conn.execute("PRAGMA integrity_check" if full else "PRAGMA quick_check").fetchall()
+		if [row[0] for row in rows] != ["ok"]:
+			raise BackupError("integrity check failed: " + "; ".join(str(row[0]) for row in rows[:5]))
+		tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+		if missing := _REQUIRED_TABLES - tables:
+			raise BackupError(f"not a portfolio database (missing {', '.join(sorted(missing))})")
+	except sqlite3.DatabaseError as exc:
+		raise BackupError(f"unreadable database: {exc}") from exc
+	finally:
+		conn.close()
+
+
+def _compress(path: str, level: int) -> str:
+	target = path + ".zst"
+	with open(path, "rb") as src, open(target, "wb") as dst:
+		zstandard.ZstdCompressor(level=level, threads=-1).copy_stream(src, dst)
+	os.remove(path)
+	return target
+
+
+def _decompress(path: str, target: str) -> None:
+	with open(path, "rb") as src, open(target, "wb") as dst:
+		zstandard.ZstdDecompressor().copy_stream(src, dst)
+
+
+def _compression(requested: str | None) -> str:
+	mode = (requested or current_app.config.get("BACKUP_COMPRESSION", "auto")).lower()
+	if mode == "auto":
+		return "zstd" if zstandard is not None else "none"
+	if mode == "zstd" and zstandard is None:
+		raise BackupError("zstd compression requested but the zstandard package is not installed")
+	if mode not in ("zstd", "none"):
+		raise BackupError(f"unknown compression: {mode}")
+	return mode
+
+
+# ---------- Operations ----------
+
+class _Lock:
+	"""Exclusive, non-blocking lock on instance/backup.lock (one operation at a time)."""
+
+	def __enter__(self):
+		self._file = open(os.path.join(current_app.instance_path, "backup.lock"), "a")
+		if fcntl is not None:
+			try:
+				fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+			except BlockingIOError:
+				self._file.close()
+				raise BackupError("another backup or restore is running")
+		return self
+
+	def __exit__(self, *exc):
+		self._file.close()
+
+
+def _create(label: str | None, compression: str | None) -> dict:
+	config = current_app.config
+	mode = _compression(compression)
+	source = database_path()
+	stem = os.path.splitext(os.path.basename(source))[0] or "portfolio"
+	stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+	directory = backup_dir()
+	name = f"{stem}-{stamp}{'-' + label if label else ''}.db"
+	# Two backups in one second (restoring a pre-restore copy) must not overwrite each other
+	serial = 1
+	while any(os.path.exists(os.path.join(directory, n)) for n in (name, f"{name}.zst")):
+		serial += 1
+		name = f"{stem}-{stamp}-{label or 'backup'}-{serial}.db"
+	tmp = os.path.join(directory, f".{name}.{os.getpid()}.tmp")
+
+	started = perf_counter()
+	try:
+		pages = _online_copy(
+			source, tmp,
+			int(config.get("BACKUP_PAGES_PER_STEP", 256)),
+			float(config.get("BACKUP_STEP_PAUSE", 0.01)),
+			int(config.get("BACKUP_MAX_RESTARTS", 3)),
+		)
+		_check(tmp, full=False)
+		if mode == "zstd":
+			tmp = _compress(tmp, int(config.get("BACKUP_ZSTD_LEVEL", 3)))
+			name += ".zst"
+		os.replace(tmp, os.path.join(directory, name))
+	finally:
+		for leftover in (tmp, tmp.removesuffix(".zst")):
+			if os.path.exists(leftover):
+				os.remove(leftover)
+	return {
+		"name": name,
+		"pages": pages,
+		"size": os.path.getsize(os.path.join(directory, name)),
+		"seconds": round(perf_counter() - started, 3),
+	}
+
+
+def _rotate(keep: int) -> list[str]:
+	"""Delete all but the newest ``keep`` scheduled backups (pre-restore ones are kept)."""
+	removed = []
+	regular = [b for b in list_backups() if "-pre-restore" not in b["name"]]
+	for item in regular[max(keep, 1):]:
+		os.remove(os.path.join(backup_dir(), item["name"]))
+		removed.append(item["name"])
+	return removed
+
+
+def create_backup(compression: str | None = None, keep: int | None = None) -> dict:
+	"""Take a backup and apply retention; returns what was written and rotated."""
+	with _Lock():
+		result = _create(None, compression)
+		result["rotated"] = _rotate(current_app.config.get("BACKUP_KEEP", 7) if keep is None else keep)
+	current_app.logger.info("Backup %s written (%d bytes, %.2fs)", result["name"], result["size"], result["seconds"])
+	return result
+
+
+def verify_backup(name: str) -> dict:
+	"""Full integrity check of a stored backup (decompressed to a scratch file)."""
+	path = _backup_path(name)
+	scratch = os.path.join(backup_dir(), f".verify-{os.getpid()}.db")
+	try:
+		if name.endswith(".zst"):
+			if zstandard is None:
+				raise BackupError("the zstandard package is needed to read this backup")
+			_decompress(path, scratch)
+		else:
+			shutil.copyfile(path, scratch)
+		started = perf_counter()
+		_check(scratch)
+		return {"name": name, "ok": True, "seconds": round(perf_counter() - started, 3)}
+	finally:
+		if os.path.exists(scratch):
+			os.remove(scratch)
+
+
+def restore_backup(name: str) -> dict:
+	"""Replace the live database with backup ``name`` after verifying it."""
+	path = _backup_path(name)
+	target = database_path()
+	with _Lock():
+		scratch = os.path.join(backup_dir(), f".restore-{os.getpid()}.db")
+		try:
+			if name.endswith(".zst"):
+				if zstandard is None:
+					raise BackupError("the zstandard package is needed to read this backup")
+				_decompress(path, scratch)
+			else:
+				shutil.copyfile(path, scratch)
+			_check(scratch)
+			safety = _create("pre-restore", None)
+			generation = _facet_generation()
+			# Close pooled connections so none holds a stale schema or lock
+			db.session.remove()
+			db.engine.dispose()
+			_online_copy(scratch, target, pages=-1, pause=0)
+		finally:
+			if os.path.exists(scratch):
+				os.remove(scratch)
+		_check(target)
+	_invalidate_caches(generation)
+	current_app.logger.warning("Database restored from backup %s (previous state saved as %s)", name, safety["name"])
+	return {"restored": name, "safety_backup": safety["name"]}
+
+
+def _facet_generation() -> int | None:
+	from .blog_index import facet_index
+
+	try:
+		return facet_index.generation()
+	except SQLAlchemyError:
+		db.session.rollback()
+		return None
+
+
+def _invalidate_caches(generation: int | None) -> None:
+	"""Caches keyed on DB contents must not outlive a restore, in any worker."""
+	from . import github_history
+	from .blog_index import facet_index
+	from .media_cache import media_cache
+	from .site_settings import settings_cache
+
+	settings_cache.invalidate()
+	media_cache.invalidate()
+	github_history.forget()
+	try:
+		facet_index.reset(generation)
+	except SQLAlchemyError as exc:
+		# A backup from before the facet index has no blog_index_meta until the next start
+		db.session.rollback()
+		facet_index.reset()
+		current_app.logger.warning("Could not advance the blog index generation: %s", exc)
+
+
+def _start_background(app, fn, *args) -> None:
+	def work():
+		with app.app_context():
+			try:
+				fn(*args)
+			except BackupError as exc:
+				app.logger.warning("Backup failed: %s", exc)
+			except Exception:
+				app.logger.exception("Backup failed")
+			finally:
+				db.session.remove()
+
+	threading.Thread(target=work, name="backup", daemon=True).start()
+
+
+# ---------- Admin ----------
+
+@backup_bp.get("/backups")
+@login_required
+def backups_page():
+	try:
+		items = list_backups()
+	except OSError as exc:
+		items = []
+		flash(f"Could not read the backup directory: {exc}", "danger")
+	return render_template("admin/backups.html", items=items, zstd=zstandard is not None)
+
+
+@backup_bp.post("/backups")
+@login_required
+def backups_create():
+	_start_background(current_app._get_current_object(), create_backup)
+	flash("Backup started; refresh in a moment", "info")
+	return redirect(url_for("backup.backups_page"))
+
+
+@backup_bp.get("/backups/<name>")
+@login_required
+def backups_download(name: str):
+	try:
+		path = _backup_path(name)
+	except BackupError:
+		abort(404)
+	return send_file(path, as_attachment=True, download_name=name, mimetype="application/octet-stream")
+
+
+@backup_bp.post("/backups/<name>/restore")
+@login_required
+def backups_restore(name: str):
+	try:
+		result = restore_backup(name)
+	except BackupError as exc:
+		flash(f"Restore failed: {exc}", "danger")
+	else:
+		flash(f"Restored {result['restored']}; the previous database was saved as {result['safety_backup']}", "success")
+	return redirect(url_for("backup.backups_page"))
+
+
+# ---------- CLI ----------
+
+@backup_bp.cli.command("create")
+@click.option("--compression", type=click.Choice(["auto", "zstd", "none"]), default=None, help="default: BACKUP_COMPRESSION")
+@click.option("--keep", type=int, default=None, help="backups to retain (default: BACKUP_KEEP)")
+def create_command(compression: str | None, keep: int | None):
+	"""Take an online backup of the database."""
+	try:
+		result = create_backup(compression, keep)
+	except BackupError as exc:
+		raise click.ClickException(str(exc))
+	click.echo(f"{result['name']}: {result['pages']} pages, {result['size']} bytes in {result['seconds']}s")
+	for name in result["rotated"]:
+		click.echo(f"rotated out {name}")
+
+
+@backup_bp.cli.command("list")
+def list_command():
+	"""List stored backups, newest first."""
+	for item in list_backups():
+		click.echo(f"{item['name']}\t{item['size']}\t{item['created']:%Y-%m-%d %H:%M:%S}")
+
+
+@backup_bp.cli.command("verify")
+@click.argument("name")
+def verify_command(name: str):
+	"""Run a full integrity check on a backup."""
+	try:
+		result = verify_backup(name)
+	except BackupError as exc:
+		raise click.ClickException(str(exc))
+	click.echo(f"{result['name']}: ok ({result['seconds']}s)")
+
+
+@backup_bp.cli.command("restore")
+@click.argument("name")
+@click.option("--yes", is_flag=True, help="do not ask for confirmation")
+def restore_command(name: str, yes: bool):
+	"""Replace the database with a verified backup."""
+	if not yes:
+		click.confirm(f"Replace the live database with {name}?", abort=True)
+	try:
+		result = restore_backup(name)
+	except BackupError as exc:
+		raise click.ClickException(str(exc))
+	click.echo(f"restored {result['restored']} (previous database saved as {result['safety_backup']})")
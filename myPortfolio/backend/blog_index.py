@@ -0,0 +1,135 @@
+"""Blog facet index: posts per category and per month, kept by triggers.
+
+Like the dashboard counters in ``stats.py``, the counts live in small tables
+that SQLite triggers adjust on every insert, delete and relevant update of
+``blogs`` (ORM, Core imports and raw SQL alike), so reading the index never
+scans posts. The triggers also bump ``blog_index_meta.generation``; the
+endpoint keeps the built payload per process and only rebuilds it, with a
+new ETag, when the generation moved.
+"""
+
+import hashlib
+import threading
+
+from sqlalchemy import text
+
+from .extensions import db
+
+_MONTH = "strftime('%Y-%m', {row}.created_at)"
+# Uncategorized posts are counted under category 0
+_CATEGORY = "COALESCE({row}.category_id, 0)"
+
+
+def _bump(row: str, sign: str) -> str:
+	return (
+		f"INSERT INTO blog_category_counts (category_id, count) VALUES ({_CATEGORY.format(row=row)}, {sign}1) "
+		f"ON CONFLICT(category_id) DO UPDATE SET count = count {sign} 1; "
+		f"INSERT INTO blog_month_counts (month, count) VALUES ({_MONTH.format(row=row)}, {sign}1) "
+		f"ON CONFLICT(month) DO UPDATE SET count = count {sign} 1;"
+	)
+
+
+_GENERATION = "UPDATE blog_index_meta SET generation = generation + 1 WHERE id = 1;"
+
+_TRIGGERS = [
+	f"""CREATE TRIGGER IF NOT EXISTS blog_index_insert AFTER INSERT ON blogs BEGIN
+		{_bump('NEW', '+')} {_GENERATION}
+	END""",
+	f"""CREATE TRIGGER IF NOT EXISTS blog_index_delete AFTER DELETE ON blogs BEGIN
+		{_bump('OLD', '-')} {_GENERATION}
+	END""",
+	f"""CREATE TRIGGER IF NOT EXISTS blog_index_update AFTER UPDATE OF category_id, created_at ON blogs
+	WHEN {_CATEGORY.format(row='OLD')} != {_CATEGORY.format(row='NEW')} OR {_MONTH.format(row='OLD')} != {_MONTH.format(row='NEW')} BEGIN
+		{_bump('OLD', '-')} {_bump('NEW', '+')} {_GENERATION}
+	END""",
+	# Names are joined in at read time, so renames only need a new generation
+	f"""CREATE TRIGGER IF NOT EXISTS blog_index_category_insert AFTER INSERT ON blog_categories BEGIN {_GENERATION} END""",
+	f"""CREATE TRIGGER IF NOT EXISTS blog_index_category_update AFTER UPDATE ON blog_categories BEGIN {_GENERATION} END""",
+	f"""CREATE TRIGGER IF NOT EXISTS blog_index_category_delete AFTER DELETE ON blog_categories BEGIN {_GENERATION} END""",
+]
+
+
+def ensure_schema(conn) -> None:
+	"""Create the count tables and triggers (SQLite), backfilling once."""
+	conn.execute(text("CREATE TABLE IF NOT EXISTS blog_category_counts (category_id INTEGER PRIMARY KEY, count INTEGER NOT NULL DEFAULT 0)"))
+	conn.execute(text("CREATE TABLE IF NOT EXISTS blog_month_counts (month CHAR(7) PRIMARY KEY, count INTEGER NOT NULL DEFAULT 0)"))
+	conn.execute(text("CREATE TABLE IF NOT EXISTS blog_index_meta (id INTEGER PRIMARY KEY, generation INTEGER NOT NULL DEFAULT 0)"))
+	conn.execute(text("CREATE INDEX IF NOT EXISTS ix_blogs_created_at ON blogs (created_at)"))
+	conn.execute(text("CREATE INDEX IF NOT EXISTS ix_blogs_category_id ON blogs (category_id, created_at)"))
+	if not conn.execute(text("SELECT 1 FROM blog_index_meta WHERE id = 1")).first():
+		conn.execute(text(
+			"INSERT INTO blog_category_counts (category_id, count) "
+			"SELECT COALESCE(category_id, 0), COUNT(*) FROM blogs GROUP BY COALESCE(category_id, 0)"
+		))
+		conn.execute(text(
+			"INSERT INTO blog_month_counts (month, count) "
+			"SELECT strftime('%Y-%m', created_at), COUNT(*) FROM blogs GROUP BY strftime('%Y-%m', created_at)"
+		))
+		conn.execute(text("INSERT INTO blog_index_meta (id, generation) VALUES (1, 1)"))
+	for ddl in _TRIGGERS:
+		conn.execute(text(ddl))
+	conn.commit()
+
+
+def _build() -> dict:
+	categories = db.session.execute(text(
+		"SELECT c.id, c.name, COALESCE(n.count, 0) FROM blog_categories c "
+		"LEFT JOIN blog_category_counts n ON n.category_id = c.id ORDER BY c.name"
+	)).all()
+	uncategorized = db.session.execute(text("SELECT count FROM blog_category_counts WHERE category_id = 0")).scalar() or 0
+	months = db.session.execute(text("SELECT month, count FROM blog_month_counts WHERE count > 0 ORDER BY month DESC")).all()
+
+	archive: list[dict] = []
+	for month, count in months:
+		year = int(month[:4])
+		if not archive or archive[-1]["year"] != year:
+			archive.append({"year": year, "count": 0, "months": []})
+		archive[-1]["count"] += count
+		archive[-1]["months"].append({"month": month, "count": count})
+	return {
+		"total": sum(count for _, count in months),
+		"categories": [{"id": cid, "name": name, "count": count} for cid, name, count in categories],
+		"uncategorized": uncategorized,
+		"archive": archive,
+	}
+
+
+class FacetIndex:
+	"""Per-process copy of the built index, keyed by the trigger-maintained generation."""
+
+	def __init__(self):
+		self._lock = threading.Lock()
+		self._generation = None
+		self._payload: dict | None = None
+		self._etag: str | None = None
+
+	@staticmethod
+	def generation() -> int | None:
+		return db.session.execute(text("SELECT generation FROM blog_index_meta WHERE id = 1")).scalar()
+
+	def reset(self, floor: int | None = None) -> None:
+		"""Forget the built index after a database restore.
+
+		The restored database may carry a generation other workers already
+		built from. Moving it past ``floor``, the generation the replaced
+		database had reached, makes every worker rebuild under a new ETag.
+		"""
+		if floor is not None:
+			db.session.execute(text("UPDATE blog_index_meta SET generation = max(generation, :floor) + 1 WHERE id = 1"), {"floor": floor})
+			db.session.commit()
+		with self._lock:
+			self._generation = self._payload = self._etag = None
+
+	def get(self) -> tuple[dict, str]:
+		generation = self.generation()
+		with self._lock:
+			if generation is not None and generation == self._generation and self._payload is not None:
+				return self._payload, self._etag
+		payload = _build()
+		etag = hashlib.blake2b(f"{generation}:{payload}".encode(), digest_size=8).hexdigest()
+		with self._lock:
+			self._generation, self._payload, self._etag = generation, payload, etag
+		return payload, etag
+
+
+facet_index = FacetIndex()
@@ -0,0 +1,157 @@
+import gzip
+import threading
+from collections import OrderedDict
+from hashlib import blake2b
+
+from flask import Flask, request
+
+from .metrics import timed
+
+try:  # optional encoders; gzip is always available
+	import brotli
+except ImportError:  # pragma: no cover - depends on environment
+	brotli = None
+
+try:
+	import zstandard
+except ImportError:  # pragma: no cover - depends on environment
+	zstandard = None
+
+
+def _gzip(data: bytes, level: int) -> bytes:
+	return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _brotli(data: bytes, level: int) -> bytes:
+	return brotli.compress(data, quality=level)
+
+
+def _zstd(data: bytes, level: int) -> bytes:
+	return zstandard.ZstdCompressor(level=level).compress(data)
+
+
+# name -> (encoder, default level); fast levels, since this runs per cache miss
+ENCODERS = {"gzip": (_gzip, 6)}
+if brotli is not None:
+	ENCODERS["br"] = (_brotli, 5)
+if zstandard is not None:
+	ENCODERS["zstd"] = (_zstd, 3)
+
+
+class CompressedCache:
+	"""Byte-bounded LRU of compressed bodies keyed by (body digest, encoding).
+
+	Hot payloads (the same project list or GitHub repo page served over and
+	over) are compressed once per worker; the key is the strong ETag when the
+	view set one, else a BLAKE2 digest of the body, which is far cheaper than
+	recompressing it.
+	"""
+
+	def __init__(self, max_bytes: int):
+		self.max_bytes = max_bytes
+		self.size = 0
+		self.hits = 0
+		self.misses = 0
+		self._items: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+		self._lock = threading.Lock()
+
+	def get(self, key: tuple[str, str]) -> bytes | None:
+		with self._lock:
+			value = self._items.get(key)
+			if value is None:
+				self.misses += 1
+				return None
+			self._items.move_to_end(key)
+			self.hits += 1
+			return value
+
+	def put(self, key: tuple[str, str], value: bytes) -> None:
+		if len(value) > self.max_bytes:
+			return
+		with self._lock:
+			old = self._items.pop(key, None)
+			if old is not None:
+				self.size -= len(old)
+			self._items[key] = value
+			self.size += len(value)
+			while self.size > self.max_bytes:
+				_, evicted = self._items.popitem(last=False)
+				self.size -= len(evicted)
+
+
+def negotiate(accept_encodings, preference: list[str]) -> str | None:
+	"""Pick the client's highest-quality encoding; ties go to ``preference`` order."""
+	best, best_q = None, 0.0
+	for name in preference:
+		if name not in ENCODERS:
+			continue
+		quality = accept_encodings[name]
+		if quality > best_q:
+			best, best_q = name, quality
+	return best
+
+
+def _compressible(response, allowlist: tuple[str, ...], min_size: int, max_file_size: int) -> bool:
+	if response.direct_passthrough:
+		# send_file responses (static pages, unbuilt assets): only if small enough to buffer
+		length = response.content_length
+		if length is None or length > max_file_size:
+			return False
+	elif response.is_streamed:
+		return False
+	else:
+		length = response.calculate_content_length()
+	if response.status_code < 200 or response.status_code in (204, 206, 304):
+		return False
+	if "Content-Encoding" in response.headers:
+		return False
+	if response.mimetype not in allowlist:
+		return False
+	return length is not None and length >= min_size
+
+
+def init_app(app: Flask) -> None:
+	"""Compress eligible responses according to ``Accept-Encoding``.
+
+	Register after :func:`metrics.init_app` so the time spent shows up in the
+	``compress`` Server-Timing phase.
+	"""
+	if not app.config.get("COMPRESS_ENABLED", True):
+		return
+
+	allowlist = tuple(t.strip() for t in app.config.get("COMPRESS_MIMETYPES", "").split(",") if t.strip())
+	preference = [name.strip() for name in app.config.get("COMPRESS_ALGORITHMS", "br,zstd,gzip").split(",")]
+	min_size = int(app.config.get("COMPRESS_MIN_SIZE", 1024))
+	max_file_size = int(app.config.get("COMPRESS_MAX_FILE_SIZE", 1024 * 1024))
+	levels = {"br": app.config.get("COMPRESS_BR_LEVEL"), "gzip": app.config.get("COMPRESS_GZIP_LEVEL"), "zstd": app.config.get("COMPRESS_ZSTD_LEVEL")}
+	cache = CompressedCache(int(app.config.get("COMPRESS_CACHE_BYTES", 8 * 1024 * 1024)))
+	app.extensions["compression_cache"] = cache
+
+	@app.after_request
+	def _compress_response(response):  # type: ignore[no-redef]
+		if not _compressible(response, allowlist, min_size, max_file_size):
+			return response
+		response.vary.add("Accept-Encoding")
+		encoding = negotiate(request.accept_encodings, preference)
+		if encoding is None:
+			return response
+
+		with timed("compress"):
+			response.direct_passthrough = False
+			data = response.get_data()
+			etag, weak = response.get_etag()
+			key = (etag if etag and not weak else blake2b(data, digest_size=16).hexdigest(), encoding)
+			body = cache.get(key)
+			if body is None:
+				encoder, default_level = ENCODERS[encoding]
+				body = encoder(data, int(levels.get(encoding) or default_level))
+				cache.put(key, body)
+		if len(body) >= len(data):
+			return response
+
+		response.set_data(body)
+		response.headers["Content-Encoding"] = encoding
+		if etag and not weak:
+			# The representation changed, so the validator only holds weakly (as nginx does)
+			response.set_etag(etag, weak=True)
+		return response
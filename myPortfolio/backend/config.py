@@ -18,4 +18,90 @@ class Config:
     
     # File Upload Configuration
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16 MB
+    # Resumable uploads (/api/uploads): files of any size up to UPLOAD_MAX_SIZE arrive in chunks
+    UPLOAD_MAX_SIZE = int(os.getenv('UPLOAD_MAX_SIZE', str(64 * 1024 * 1024)))
+    UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', str(4 * 1024 * 1024)))  # must stay below MAX_CONTENT_LENGTH
+    UPLOAD_EXPIRY = int(os.getenv('UPLOAD_EXPIRY', '86400'))  # seconds before an abandoned upload is dropped
     # UPLOAD_FOLDER will be set dynamically in app.py using instance_path
+
+    # Contact form abuse protection (shared across workers via instance/throttle-*.bin)
+    CONTACT_MAX_BYTES = int(os.getenv('CONTACT_MAX_BYTES', '8192'))
+    CONTACT_RATE_BURST = float(os.getenv('CONTACT_RATE_BURST', '5'))  # messages allowed back to back per IP
+    CONTACT_RATE_REFILL_SECONDS = float(os.getenv('CONTACT_RATE_REFILL_SECONDS', '60'))  # one more allowed per interval
+    CONTACT_DUPLICATE_WINDOW = float(os.getenv('CONTACT_DUPLICATE_WINDOW', '600'))  # seconds
+    CONTACT_HONEYPOT_FIELD = os.getenv('CONTACT_HONEYPOT_FIELD', 'website')
+    TRUSTED_PROXY_HOPS = int(os.getenv('TRUSTED_PROXY_HOPS', '0'))  # proxies in front that set X-Forwarded-*; 0 ignores those headers
+    THROTTLE_SLOTS = int(os.getenv('THROTTLE_SLOTS', '4096'))
+
+    # Dynamic response compression (brotli/zstd used when their packages are installed)
+    COMPRESS_ENABLED = os.getenv('COMPRESS_ENABLED', 'True').lower() == 'true'
+    COMPRESS_ALGORITHMS = os.getenv('COMPRESS_ALGORITHMS', 'br,zstd,gzip')  # server preference on ties
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', '1024'))  # bytes; smaller bodies are sent as-is
+    COMPRESS_MAX_FILE_SIZE = int(os.getenv('COMPRESS_MAX_FILE_SIZE', str(1024 * 1024)))  # largest static file buffered
+    COMPRESS_MIMETYPES = os.getenv('COMPRESS_MIMETYPES', 'application/json,text/html,text/css,text/javascript,application/javascript,text/plain,image/svg+xml')
+    COMPRESS_CACHE_BYTES = int(os.getenv('COMPRESS_CACHE_BYTES', str(8 * 1024 * 1024)))  # per worker
+    COMPRESS_GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', '6'))
+    COMPRESS_BR_LEVEL = int(os.getenv('COMPRESS_BR_LEVEL', '5'))
+    COMPRESS_ZSTD_LEVEL = int(os.getenv('COMPRESS_ZSTD_LEVEL', '3'))
+
+    # Frontend build output (`flask assets build`); defaults to frontend/dist
+    ASSETS_DIST_DIR = os.getenv('ASSETS_DIST_DIR', '')
+    ASSETS_CHECK_INTERVAL = float(os.getenv('ASSETS_CHECK_INTERVAL', '2'))  # seconds between checks that the build is newer than the sources
+
+    # Service worker (/sw.js): app shell precache, stale-while-revalidate for these API prefixes
+    SW_ENABLED = os.getenv('SW_ENABLED', 'True').lower() == 'true'  # off: /sw.js unregisters itself and clears its caches
+    SW_API_PATHS = os.getenv('SW_API_PATHS', '/api/projects,/api/skills,/api/github/,/api/blogs,/api/categories,/api/blogimages/')
+    SW_API_FRESH_SECONDS = float(os.getenv('SW_API_FRESH_SECONDS', '60'))  # cached JSON younger than this is not revalidated
+
+    # Site settings cache (hero image, CV); larger payloads keep only their ETag in memory
+    SETTINGS_CACHE_MAX_BYTES = int(os.getenv('SETTINGS_CACHE_MAX_BYTES', str(4 * 1024 * 1024)))
+
+    # Hot media cache for /uploads and large settings payloads (byte budget, frequency-aware admission)
+    MEDIA_CACHE_ENABLED = os.getenv('MEDIA_CACHE_ENABLED', 'True').lower() == 'true'
+    MEDIA_CACHE_BYTES = int(os.getenv('MEDIA_CACHE_BYTES', str(32 * 1024 * 1024)))  # per worker, bodies plus encoded variants
+    MEDIA_CACHE_MAX_ENTRY_BYTES = int(os.getenv('MEDIA_CACHE_MAX_ENTRY_BYTES', '0'))  # larger files stream from disk; 0 = 1/8 of the budget
+
+    # Orphaned media garbage collection (`flask media gc`, /admin/media)
+    MEDIA_GC_MIN_AGE = float(os.getenv('MEDIA_GC_MIN_AGE', '3600'))  # seconds; newer files may be mid-upload
+    MEDIA_GC_BATCH_SIZE = int(os.getenv('MEDIA_GC_BATCH_SIZE', '500'))
+    MEDIA_GC_BATCH_PAUSE = float(os.getenv('MEDIA_GC_BATCH_PAUSE', '0.05'))  # seconds between committed batches
+
+    # SQLite online backups (`flask backup create`, /admin/backups)
+    BACKUP_DIR = os.getenv('BACKUP_DIR', '')  # defaults to instance/backups
+    BACKUP_KEEP = int(os.getenv('BACKUP_KEEP', '7'))  # newest backups retained
+    BACKUP_PAGES_PER_STEP = int(os.getenv('BACKUP_PAGES_PER_STEP', '256'))  # pages copied per lock hold
+    BACKUP_STEP_PAUSE = float(os.getenv('BACKUP_STEP_PAUSE', '0.01'))  # seconds writers get between steps
+    BACKUP_MAX_RESTARTS = int(os.getenv('BACKUP_MAX_RESTARTS', '3'))  # then finish in one locked step
+    BACKUP_COMPRESSION = os.getenv('BACKUP_COMPRESSION', 'auto')  # auto (zstd if installed), zstd, none
+    BACKUP_ZSTD_LEVEL = int(os.getenv('BACKUP_ZSTD_LEVEL', '3'))
+
+    # Readiness probe (/readyz); /healthz never touches the database
+    READYZ_CACHE_SECONDS = float(os.getenv('READYZ_CACHE_SECONDS', '5'))  # checks run at most once per interval per worker
+    READYZ_GITHUB_MAX_AGE = float(os.getenv('READYZ_GITHUB_MAX_AGE', '3600'))  # older GitHub cache is reported stale
+
+    # Request profiling (/admin/profiles); nothing is registered unless enabled
+    PROFILE_ENABLED = os.getenv('PROFILE_ENABLED', 'False').lower() == 'true'
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))  # fraction of requests profiled at random
+    PROFILE_TOKEN = os.getenv('PROFILE_TOKEN', '')  # X-Profile value accepted without an admin session
+    PROFILE_INTERVAL = float(os.getenv('PROFILE_INTERVAL', '0.005'))  # seconds between stack samples
+    PROFILE_MIN_DURATION_MS = float(os.getenv('PROFILE_MIN_DURATION_MS', '0'))  # faster requests are not kept
+    PROFILE_KEEP = int(os.getenv('PROFILE_KEEP', '50'))  # newest captures retained
+    PROFILE_DIR = os.getenv('PROFILE_DIR', '')  # defaults to instance/profiles
+
+    # Admin list views
+    ADMIN_PAGE_SIZE = int(os.getenv('ADMIN_PAGE_SIZE', '25'))
+    ADMIN_PAGE_SIZE_MAX = int(os.getenv('ADMIN_PAGE_SIZE_MAX', '100'))
+
+    # Logging Configuration
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_FILE_MAX_BYTES = int(os.getenv('LOG_FILE_MAX_BYTES', str(512 * 1024)))
+    LOG_FILE_BACKUPS = int(os.getenv('LOG_FILE_BACKUPS', '3'))
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))  # records dropped (not blocked on) when full
+    LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', '0.01'))  # fraction of high-volume events kept
+
+    # Instrumentation Configuration
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() == 'true'
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')  # Bearer token for Prometheus scrapers
+    METRICS_DIR = os.getenv('METRICS_DIR', '')  # defaults to instance/metrics
+    METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '5'))  # seconds between worker snapshots
+    METRICS_STALE_SECONDS = float(os.getenv('METRICS_STALE_SECONDS', '300'))  # snapshots older than this stop adding cache gauges
@@ -1,7 +1,11 @@
 import os
+from datetime import datetime, timedelta
 from time import time
 from flask import Blueprint, jsonify, request, current_app
-import requests
+
+from . import github_history
+from .github_languages import count_primary, language_stats
+from .metrics import timed
 
 github_bp = Blueprint("github", __name__)
 
@@ -10,6 +14,9 @@ github_bp = Blueprint("github", __name__)
 _CACHE_TTL_SECONDS = int(os.getenv("GITHUB_CACHE_TTL", "300"))  # default 5 minutes
 _cache_store: dict[str, dict] = {}
 
+# Overridable so benchmarks and local development can point at a fake server
+_GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+
 
 def _cache_get(key: str):
 	entry = _cache_store.get(key)
@@ -24,6 +31,18 @@ def _cache_set(key: str, data):
 	_cache_store[key] = {"ts": time(), "data": data}
 
 
+def cache_age() -> float | None:
+	"""Seconds since this process last stored a GitHub response (None if never)."""
+	newest = max((entry.get("ts", 0) for entry in list(_cache_store.values())), default=None)
+	return None if newest is None else time() - newest
+
+
+def _is_site_user(username: str) -> bool:
+	"""Only the configured user gets per-repo fetches and stored data; any ``?username=`` is public."""
+	configured = os.getenv("GITHUB_USERNAME")
+	return bool(configured) and username.lower() == configured.lower()
+
+
 def _build_github_headers() -> dict:
 	headers = {
 		'User-Agent': 'Portfolio-App/1.0',
@@ -38,14 +57,16 @@ def _build_github_headers() -> dict:
 
 @github_bp.get("/github/stats")
 def github_stats():
+	import requests  # deferred: importing it costs ~100 ms of cold start
+
 	username = request.args.get("username") or os.getenv("GITHUB_USERNAME")
 	if not username:
 		return jsonify({"error": "GitHub username not configured. Please set GITHUB_USERNAME in environment variables."}), 400
 
 	try:
 		# Get user info
-		user_url = f"https://api.github.com/users/{username}"
-		repos_url = f"https://api.github.com/users/{username}/repos?per_page=100&sort=updated"
+		user_url = f"{_GITHUB_API_URL}/users/{username}"
+		repos_url = f"{_GITHUB_API_URL}/users/{username}/repos?per_page=100&sort=updated"
 		headers = _build_github_headers()
 
 		# Serve from cache if available
@@ -55,29 +76,36 @@ def github_stats():
 			return jsonify(cached)
 
 		# Fetch user and repos data
-		user_resp = requests.get(user_url, headers=headers, timeout=15)
-		repos_resp = requests.get(repos_url, headers=headers, timeout=15)
+		with timed("github"):
+			user_resp = requests.get(user_url, headers=headers, timeout=15)
+			repos_resp = requests.get(repos_url, headers=headers, timeout=15)
 		
 		user_resp.raise_for_status()
 		repos_resp.raise_for_status()
 		
 		user_data = user_resp.json()
 		repos_data = repos_resp.json()
+		if _is_site_user(username):
+			history = github_history.repos_metrics(username, repos_data)
+			history[github_history.user_subject(username)].update(github_history.user_metrics(user_data))
+			github_history.record_quietly(current_app, history)
 		
 		# Calculate statistics
 		total_stars = sum(r.get("stargazers_count", 0) for r in repos_data)
 		total_forks = sum(r.get("forks_count", 0) for r in repos_data)
 		total_watchers = sum(r.get("watchers_count", 0) for r in repos_data)
 		
-		# Get top languages
-		languages = {}
-		for repo in repos_data:
-			lang = repo.get("language")
-			if lang:
-				languages[lang] = languages.get(lang, 0) + 1
-		
-		# Sort languages by frequency
-		top_languages = sorted(languages.items(), key=lambda x: x[1], reverse=True)[:5]
+		# Repo counts per primary language; the configured user also gets the byte-weighted
+		# breakdown from the stored aggregate, refreshed in the background (one call per repo)
+		top_languages = [(lang["name"], lang["repositories"]) for lang in count_primary(repos_data)["languages"][:5]]
+		language_breakdown = {"languages": []}
+		if _is_site_user(username):
+			language_breakdown = language_stats.get(username) or language_breakdown
+			if language_breakdown.get("age", _CACHE_TTL_SECONDS) >= _CACHE_TTL_SECONDS:
+				app = current_app._get_current_object()
+				language_stats.refresh_in_background(
+					app, username, lambda: language_stats.update(username, repos_data, headers, _GITHUB_API_URL),
+				)
 		
 		# Get most starred repos
 		top_starred = sorted(repos_data, key=lambda x: x.get("stargazers_count", 0), reverse=True)[:5]
@@ -129,6 +157,7 @@ def github_stats():
 				"average_forks": round(total_forks / len(repos_data), 1) if repos_data else 0
 			},
 			"top_languages": top_languages,
+			"languages": language_breakdown["languages"],
 			"top_starred": top_starred,
 			"recent_repos": recent_repos
 		}
@@ -159,11 +188,13 @@ def github_stats():
 
 @github_bp.get("/github/user")
 def github_user():
+	import requests
+
 	username = request.args.get("username") or os.getenv("GITHUB_USERNAME")
 	if not username:
 		return jsonify({"error": "GitHub username not configured. Please set GITHUB_USERNAME in environment variables."}), 400
 
-	url = f"https://api.github.com/users/{username}"
+	url = f"{_GITHUB_API_URL}/users/{username}"
 	
 	try:
 		headers = _build_github_headers()
@@ -174,9 +205,12 @@ def github_user():
 		if cached is not None:
 			return jsonify(cached)
 
-		resp = requests.get(url, headers=headers, timeout=15)
+		with timed("github"):
+			resp = requests.get(url, headers=headers, timeout=15)
 		resp.raise_for_status()
 		data = resp.json()
+		if _is_site_user(username):
+			github_history.record_quietly(current_app, {github_history.user_subject(username): github_history.user_metrics(data)})
 		
 		# Map user data
 		mapped = {
@@ -228,11 +262,13 @@ def github_user():
 
 @github_bp.get("/github/repos")
 def github_repos():
+	import requests
+
 	username = request.args.get("username") or os.getenv("GITHUB_USERNAME")
 	if not username:
 		return jsonify({"error": "GitHub username not configured. Please set GITHUB_USERNAME in environment variables."}), 400
 
-	url = f"https://api.github.com/users/{username}/repos?per_page=100&sort=updated"
+	url = f"{_GITHUB_API_URL}/users/{username}/repos?per_page=100&sort=updated"
 	
 	try:
 		headers = _build_github_headers()
@@ -243,9 +279,12 @@ def github_repos():
 		if cached is not None:
 			return jsonify(cached)
 
-		resp = requests.get(url, headers=headers, timeout=15)
+		with timed("github"):
+			resp = requests.get(url, headers=headers, timeout=15)
 		resp.raise_for_status()
 		data = resp.json()
+		if _is_site_user(username):
+			github_history.record_quietly(current_app, github_history.repos_metrics(username, data))
 		
 		# Map repository data with all necessary fields
 		mapped = [
@@ -310,3 +349,102 @@ def github_repos():
 	except Exception as exc:
 		current_app.logger.exception("Unexpected error in GitHub repos endpoint: %s", exc)
 		return jsonify({"error": "An unexpected error occurred while fetching repositories."}), 500
+
+
+def _fetch_repos(username: str, headers: dict) -> list[dict]:
+	import requests
+
+	with timed("github"):
+		resp = requests.get(f"{_GITHUB_API_URL}/users/{username}/repos?per_page=100&sort=updated", headers=headers, timeout=15)
+	resp.raise_for_status()
+	return resp.json()
+
+
+def _refresh_languages(username: str) -> dict:
+	headers = _build_github_headers()
+	return language_stats.update(username, _fetch_repos(username, headers), headers, _GITHUB_API_URL)
+
+
+def _count_languages(username: str) -> dict:
+	_cache_key = f"languages:{username}"
+	cached = _cache_get(_cache_key)
+	if cached is None:
+		cached = count_primary(_fetch_repos(username, _build_github_headers()))
+		_cache_set(_cache_key, cached)
+	return cached
+
+
+@github_bp.get("/github/languages")
+def github_languages():
+	"""Byte-weighted language histogram across the configured user's repositories.
+
+	Served from the stored aggregate without touching GitHub; once it is
+	older than the cache TTL a background refresh fetches only repositories
+	pushed to since. Any other ``?username=`` gets primary-language counts
+	from a single ``/repos`` call.
+	"""
+	import requests
+
+	username = request.args.get("username") or os.getenv("GITHUB_USERNAME")
+	if not username:
+		return jsonify({"error": "GitHub username not configured. Please set GITHUB_USERNAME in environment variables."}), 400
+
+	if _is_site_user(username):
+		cached = language_stats.get(username)
+		if cached is not None:
+			if cached["age"] >= _CACHE_TTL_SECONDS:
+				app = current_app._get_current_object()
+				language_stats.refresh_in_background(app, username, lambda: _refresh_languages(username))
+			return jsonify(cached)
+		if language_stats.backing_off(username):
+			return jsonify({"error": "GitHub API rate limit exceeded. Please try again later."}), 429
+
+	try:
+		return jsonify(_refresh_languages(username) if _is_site_user(username) else _count_languages(username))
+
+	except requests.exceptions.Timeout:
+		current_app.logger.error("GitHub API request timed out")
+		return jsonify({"error": "Request to GitHub API timed out. Please try again later."}), 504
+
+	except requests.exceptions.RequestException as exc:
+		current_app.logger.exception("GitHub languages fetch failed: %s", exc)
+		if hasattr(exc, 'response') and exc.response is not None:
+			if exc.response.status_code == 404:
+				return jsonify({"error": f"GitHub user '{username}' not found"}), 404
+			elif exc.response.status_code == 403:
+				return jsonify({"error": "GitHub API rate limit exceeded. Please try again later."}), 429
+
+		return jsonify({"error": "Failed to fetch language statistics from GitHub."}), 502
+
+	except Exception as exc:
+		current_app.logger.exception("Unexpected error in GitHub languages endpoint: %s", exc)
+		return jsonify({"error": "An unexpected error occurred while fetching language statistics."}), 500
+
+
+@github_bp.get("/github/history")
+def github_history_endpoint():
+	"""Stored time series for the user (or ``?repo=name``); never calls GitHub.
+
+	``period`` is ``day`` (change points, value holds until the next one),
+	``week`` or ``month`` (open/close/low/high per period). ``days`` limits
+	how far back, ``metrics`` is an optional comma-separated filter.
+	"""
+	username = request.args.get("username") or os.getenv("GITHUB_USERNAME")
+	if not username:
+		return jsonify({"error": "GitHub username not configured. Please set GITHUB_USERNAME in environment variables."}), 400
+
+	period = request.args.get("period", "day")
+	if period not in github_history.PERIODS:
+		return jsonify({"error": f"period must be one of: {', '.join(github_history.PERIODS)}"}), 400
+	days = request.args.get("days", type=int)
+	since = datetime.utcnow().date() - timedelta(days=days) if days and days > 0 else None
+	metrics = [m for m in request.args.get("metrics", "").split(",") if m] or None
+
+	repo = request.args.get("repo")
+	if repo:
+		subject = github_history.repo_subject(repo if "/" in repo else f"{username}/{repo}")
+	else:
+		subject = github_history.user_subject(username)
+
+	series = github_history.history(subject, period, since, metrics)
+	return jsonify({"subject": subject, "period": period, "since": since.isoformat() if since else None, "series": series})
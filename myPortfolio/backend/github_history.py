@@ -0,0 +1,227 @@
+"""Persisted GitHub metrics: a delta-encoded daily series plus weekly/monthly rollups.
+
+Every successful fetch for the configured ``GITHUB_USERNAME`` hands its numbers to
+:func:`record`. A metric only gets a daily row when its value changed, and
+that row stores the change (``delta``), so the value on any day is the sum of
+the deltas up to it and an idle repository costs nothing. The same write
+updates open/close/low/high for the current ISO week and calendar month, so
+charts read precomputed rows instead of scanning days or calling GitHub.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import text
+
+from .extensions import db
+
+USER_METRICS = ("followers", "following", "public_repos", "public_gists")
+REPO_METRICS = ("stars", "forks", "watchers", "open_issues", "size")
+# Summed over all repositories and kept on the user subject
+TOTAL_METRICS = ("total_stars", "total_forks")
+
+PERIODS = ("day", "week", "month")
+
+# (subject, metric) -> (day, value) already written by this process, valid while
+# instance/github-history.version keeps the stamp it had when they were written
+_seen: dict[tuple[str, str], tuple[date, int]] = {}
+_seen_stamp = {"value": None}
+_seen_lock = threading.Lock()
+
+
+def ensure_schema(conn) -> None:
+	conn.execute(text(
+		"CREATE TABLE IF NOT EXISTS github_metric_daily (subject VARCHAR(200) NOT NULL, metric VARCHAR(32) NOT NULL, "
+		"day DATE NOT NULL, delta INTEGER NOT NULL, PRIMARY KEY (subject, metric, day)) WITHOUT ROWID"
+	))
+	conn.execute(text(
+		"CREATE TABLE IF NOT EXISTS github_metric_latest (subject VARCHAR(200) NOT NULL, metric VARCHAR(32) NOT NULL, "
+		"value INTEGER NOT NULL, day DATE NOT NULL, PRIMARY KEY (subject, metric)) WITHOUT ROWID"
+	))
+	conn.execute(text(
+		"CREATE TABLE IF NOT EXISTS github_metric_rollup (subject VARCHAR(200) NOT NULL, metric VARCHAR(32) NOT NULL, "
+		"period VARCHAR(5) NOT NULL, start DATE NOT NULL, open INTEGER NOT NULL, close INTEGER NOT NULL, "
+		"low INTEGER NOT NULL, high INTEGER NOT NULL, PRIMARY KEY (subject, metric, period, start)) WITHOUT ROWID"
+	))
+	conn.commit()
+
+
+def user_subject(login: str) -> str:
+	return f"user:{login.lower()}"
+
+
+def repo_subject(full_name: str) -> str:
+	return f"repo:{full_name.lower()}"
+
+
+def user_metrics(user: dict) -> dict[str, int]:
+	return {metric: int(user.get(metric) or 0) for metric in USER_METRICS if user.get(metric) is not None}
+
+
+def repo_metrics(repo: dict) -> dict[str, int]:
+	return {
+		"stars": int(repo.get("stargazers_count") or 0),
+		"forks": int(repo.get("forks_count") or 0),
+		"watchers": int(repo.get("watchers_count") or 0),
+		"open_issues": int(repo.get("open_issues_count") or 0),
+		"size": int(repo.get("size") or 0),
+	}
+
+
+def repos_metrics(username: str, repos: list[dict]) -> dict[str, dict[str, int]]:
+	"""Per-repo metrics plus the user's totals from a ``/users/{user}/repos`` payload."""
+	subjects = {repo_subject(r["full_name"]): repo_metrics(r) for r in repos if r.get("full_name")}
+	subjects[user_subject(username)] = {
+		"total_stars": sum(m["stars"] for m in subjects.values()),
+		"total_forks": sum(m["forks"] for m in subjects.values()),
+	}
+	return subjects
+
+
+def _period_starts(day: date) -> dict[str, date]:
+	return {"week": day - timedelta(days=day.weekday()), "month": day.replace(day=1)}
+
+
+@contextmanager
+def _write_locked():
+	"""A connection of its own holding SQLite's write lock from the first statement.
+
+	Taking the lock before reading the previous values keeps two workers from
+	both computing a delta from the same value (it would count twice), and a
+	separate connection never commits the caller's request session.
+	"""
+	with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+		conn.exec_driver_sql("BEGIN IMMEDIATE")
+		try:
+			yield conn
+		except BaseException:
+			conn.exec_driver_sql("ROLLBACK")
+			raise
+		conn.exec_driver_sql("COMMIT")
+
+
+def _stamp_path() -> str:
+	return os.path.join(current_app.instance_path, "github-history.version")
+
+
+def _current_stamp():
+	try:
+		st = os.stat(_stamp_path())
+	except OSError:
+		return None
+	return (st.st_ino, st.st_mtime_ns)
+
+
+def record(subjects: dict[str, dict[str, int]], day: date | None = None) -> int:
+	"""Store today's values; returns how many metrics changed.
+
+	Values this process already wrote today are skipped without touching
+	the database, so hot fetch paths cost a ``stat()`` and a dict lookup.
+	"""
+	day = day or datetime.utcnow().date()
+	stamp = _current_stamp()
+	with _seen_lock:
+		if stamp != _seen_stamp["value"]:
+			# Another worker restored the database: what we wrote may be gone
+			_seen.clear()
+			_seen_stamp["value"] = stamp
+		pending = {
+			(subject, metric): value
+			for subject, metrics in subjects.items()
+			for metric, value in metrics.items()
+			if _seen.get((subject, metric)) != (day, value)
+		}
+	if not pending:
+		return 0
+
+	with _write_locked() as conn:
+		changed = 0
+		latest = {}
+		names = sorted({subject for subject, _ in pending})
+		for i in range(0, len(names), 500):
+			chunk = names[i:i + 500]
+			params = {f"s{n}": name for n, name in enumerate(chunk)}
+			rows = conn.execute(
+				text(f"SELECT subject, metric, value FROM github_metric_latest WHERE subject IN ({', '.join(':' + k for k in params)})"),
+				params,
+			)
+			latest.update({(subject, metric): value for subject, metric, value in rows})
+
+		for (subject, metric), value in pending.items():
+			previous = latest.get((subject, metric))
+			if previous == value:
+				continue
+			changed += 1
+			key = {"subject": subject, "metric": metric, "day": day}
+			conn.execute(text(
+				"INSERT INTO github_metric_daily (subject, metric, day, delta) VALUES (:subject, :metric, :day, :delta) "
+				"ON CONFLICT (subject, metric, day) DO UPDATE SET delta = delta + excluded.delta"
+			), {**key, "delta": value - (previous or 0)})
+			# A change undone on the same day leaves nothing worth storing
+			conn.execute(text("DELETE FROM github_metric_daily WHERE subject = :subject AND metric = :metric AND day = :day AND delta = 0"), key)
+			conn.execute(text(
+				"INSERT INTO github_metric_latest (subject, metric, value, day) VALUES (:subject, :metric, :value, :day) "
+				"ON CONFLICT (subject, metric) DO UPDATE SET value = excluded.value, day = excluded.day"
+			), {**key, "value": value})
+			opening = value if previous is None else previous
+			for period, start in _period_starts(day).items():
+				conn.execute(text(
+					"INSERT INTO github_metric_rollup (subject, metric, period, start, open, close, low, high) "
+					"VALUES (:subject, :metric, :period, :start, :open, :value, min(:open, :value), max(:open, :value)) "
+					"ON CONFLICT (subject, metric, period, start) DO UPDATE SET close = excluded.close, "
+					"low = min(low, excluded.close), high = max(high, excluded.close)"
+				), {"subject": subject, "metric": metric, "period": period, "start": start, "open": opening, "value": value})
+
+	with _seen_lock:
+		_seen.update({key: (day, value) for key, value in pending.items()})
+	return changed
+
+
+def forget() -> None:
+	"""Drop every worker's record of today's writes (after a database restore)."""
+	with _seen_lock:
+		_seen.clear()
+	# Replace rather than touch, like settings.version: a new inode changes the stamp
+	path = _stamp_path()
+	tmp = f"{path}.{os.getpid()}.tmp"
+	try:
+		with open(tmp, "w") as fh:
+			fh.write(os.urandom(8).hex())
+		os.replace(tmp, path)
+	except OSError as exc:
+		current_app.logger.warning("Could not bump GitHub history version: %s", exc)
+
+
+def record_quietly(app, subjects: dict[str, dict[str, int]]) -> None:
+	""":func:`record` for request handlers: history must never fail a response."""
+	try:
+		record(subjects)
+	except Exception as exc:
+		app.logger.warning("Could not record GitHub history: %s", exc)
+
+
+def history(subject: str, period: str = "day", since: date | None = None, metrics: list[str] | None = None) -> dict[str, list[dict]]:
+	"""Series per metric for ``subject``. Points are change points: a value holds until the next one."""
+	since = since or date.min
+	series: dict[str, list[dict]] = {}
+	if period == "day":
+		# Sum over the whole series first, then cut to the window
+		rows = db.session.execute(text(
+			"SELECT metric, day, value FROM (SELECT metric, day, SUM(delta) OVER (PARTITION BY metric ORDER BY day) AS value "
+			"FROM github_metric_daily WHERE subject = :subject) WHERE day >= :since ORDER BY metric, day"
+		), {"subject": subject, "since": since})
+		for metric, day, value in rows:
+			if metrics is None or metric in metrics:
+				series.setdefault(metric, []).append({"date": str(day), "value": value})
+	else:
+		rows = db.session.execute(text(
+			"SELECT metric, start, open, close, low, high FROM github_metric_rollup "
+			"WHERE subject = :subject AND period = :period AND start >= :since ORDER BY metric, start"
+		), {"subject": subject, "period": period, "since": _period_starts(since)[period] if since != date.min else since})
+		for metric, start, opening, close, low, high in rows:
+			if metrics is None or metric in metrics:
+				series.setdefault(metric, []).append({"date": str(start), "open": opening, "close": close, "low": low, "high": high})
+	return series
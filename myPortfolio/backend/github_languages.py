@@ -0,0 +1,220 @@
+"""Byte-weighted language statistics from GitHub's per-repository /languages.
+
+``/users/{user}/repos`` only names one language per repository. The accurate
+breakdown (bytes of code per language) takes one request per repository, so
+those requests run concurrently on a small pool and every result is cached
+under the repository's ``pushed_at``: a refresh only refetches repositories
+that were pushed to since the last one. Per-repo results and the aggregate are
+kept in ``instance/github-languages.json`` so restarts and other workers start
+warm. Only the configured ``GITHUB_USERNAME`` is fetched and stored this way;
+the blueprint answers any other username from primary-language counts.
+"""
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from time import time
+
+from flask import current_app
+
+from .metrics import timed
+
+_CONCURRENCY = int(os.getenv("GITHUB_LANGUAGES_CONCURRENCY", "8"))
+_INCLUDE_FORKS = os.getenv("GITHUB_LANGUAGES_INCLUDE_FORKS", "False").lower() == "true"
+# After a refresh where every fetch failed (usually the rate limit), wait this long before the next one
+_RETRY_SECONDS = int(os.getenv("GITHUB_LANGUAGES_RETRY", "60"))
+
+
+class LanguageStats:
+	"""Per-user cache of ``{repo: {"pushed_at", "languages"}}`` plus the aggregate."""
+
+	def __init__(self):
+		self._lock = threading.Lock()
+		self._refreshing: dict[str, threading.Thread] = {}
+		self._retry_at: dict[str, float] = {}
+		self._users: dict[str, dict] = {}
+		self._loaded_mtime = None
+
+	# ---- persistence ----
+
+	def _path(self) -> str:
+		return os.path.join(current_app.instance_path, "github-languages.json")
+
+	def _load(self) -> None:
+		"""Pick up the file when another process (or a previous run) wrote it."""
+		try:
+			mtime = os.stat(self._path()).st_mtime_ns
+		except OSError:
+			return
+		if mtime == self._loaded_mtime:
+			return
+		try:
+			with open(self._path(), encoding="utf-8") as fh:
+				data = json.load(fh)
+		except (OSError, ValueError):
+			return
+		for username, entry in data.items():
+			mine = self._users.get(username)
+			if mine is None or entry.get("updated", 0) > mine.get("updated", 0):
+				self._users[username] = entry
+		self._loaded_mtime = mtime
+
+	def _save(self) -> None:
+		path = self._path()
+		tmp = f"{path}.{os.getpid()}.tmp"
+		with open(tmp, "w", encoding="utf-8") as fh:
+			json.dump(self._users, fh, separators=(",", ":"))
+		os.replace(tmp, path)
+		self._loaded_mtime = os.stat(path).st_mtime_ns
+
+	# ---- reading ----
+
+	def get(self, username: str) -> dict | None:
+		"""Last aggregate for ``username`` (no network), with its age in seconds."""
+		with self._lock:
+			self._load()
+			entry = self._users.get(username)
+			if not entry or "histogram" not in entry:
+				return None
+			return {**entry["histogram"], "age": round(time() - entry["updated"], 1)}
+
+	def backing_off(self, username: str) -> bool:
+		"""True while the last refresh for ``username`` failed outright and the retry delay runs."""
+		with self._lock:
+			return time() < self._retry_at.get(username, 0)
+
+	# ---- refreshing ----
+
+	def update(self, username: str, repos: list[dict], headers: dict, api_url: str) -> dict:
+		"""Fetch /languages for new or pushed-to repos and rebuild the aggregate.
+
+		``repos`` is the ``/users/{user}/repos`` payload. Repositories whose
+		fetch fails keep their previous numbers; ones that no longer exist
+		are dropped. When every fetch fails nothing is stored: the previous
+		aggregate stays current and refreshes pause for ``_RETRY_SECONDS``.
+		"""
+		with self._lock:
+			self._load()
+			entry = self._users.get(username) or {"repos": {}}
+		known = entry["repos"]
+		wanted = {r["full_name"]: r.get("pushed_at") for r in repos if r.get("full_name") and (_INCLUDE_FORKS or not r.get("fork"))}
+		stale = [name for name, pushed_at in wanted.items() if name not in known or known[name]["pushed_at"] != pushed_at]
+
+		fetched, failed = {}, 0
+		if stale:
+			with timed("github"):
+				fetched, failed = _fetch_all(stale, headers, api_url)
+
+		if failed and not fetched:
+			with self._lock:
+				self._retry_at[username] = time() + _RETRY_SECONDS
+				previous = self._users.get(username)
+			if previous and "histogram" in previous:
+				return {**previous["histogram"], "failed": failed, "age": round(time() - previous["updated"], 1)}
+			return {**_aggregate({}), "fetched": 0, "failed": failed, "age": 0.0}
+
+		merged = {}
+		for name, pushed_at in wanted.items():
+			if name in fetched:
+				merged[name] = {"pushed_at": pushed_at, "languages": fetched[name]}
+			elif name in known:
+				merged[name] = known[name]  # unchanged, or failed this time: keep what we had
+		histogram = _aggregate(merged)
+		histogram.update({"fetched": len(fetched), "failed": failed})
+
+		with self._lock:
+			self._retry_at.pop(username, None)
+			self._users[username] = {"repos": merged, "histogram": histogram, "updated": time()}
+			try:
+				self._save()
+			except OSError as exc:
+				current_app.logger.warning("Could not persist GitHub language stats: %s", exc)
+		return {**histogram, "age": 0.0}
+
+	def refresh_in_background(self, app, username: str, refresh) -> None:
+		"""Run ``refresh()`` on a thread unless one is already running for ``username``
+		or the last one failed outright less than ``_RETRY_SECONDS`` ago.
+		"""
+		def work():
+			try:
+				with app.app_context():
+					refresh()
+			except Exception:
+				app.logger.exception("Background GitHub language refresh failed")
+			finally:
+				with self._lock:
+					self._refreshing.pop(username, None)
+
+		with self._lock:
+			if username in self._refreshing or time() < self._retry_at.get(username, 0):
+				return
+			thread = self._refreshing[username] = threading.Thread(target=work, name="github-languages", daemon=True)
+			thread.start()
+
+	def wait(self, timeout: float | None = None) -> None:
+		"""Join running background refreshes (before the GitHub API they call goes away)."""
+		with self._lock:
+			threads = list(self._refreshing.values())
+		for thread in threads:
+			thread.join(timeout)
+
+
+def _fetch_all(names: list[str], headers: dict, api_url: str) -> tuple[dict, int]:
+	import requests  # deferred like the rest of the GitHub module
+	from requests.adapters import HTTPAdapter
+
+	workers = max(1, min(_CONCURRENCY, len(names)))
+	results, failed = {}, 0
+	with requests.Session() as session:
+		# One keep-alive connection per worker instead of a handshake per repo
+		adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+		session.mount("http://", adapter)
+		session.mount("https://", adapter)
+		session.headers.update(headers)
+
+		def fetch(name: str) -> dict:
+			resp = session.get(f"{api_url}/repos/{name}/languages", timeout=15)
+			resp.raise_for_status()
+			return {lang: int(size) for lang, size in resp.json().items()}
+
+		with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gh-lang") as pool:
+			futures = {pool.submit(fetch, name): name for name in names}
+			for future in as_completed(futures):
+				try:
+					results[futures[future]] = future.result()
+				except (requests.exceptions.RequestException, ValueError) as exc:
+					failed += 1
+					current_app.logger.warning("GitHub languages fetch failed for %s: %s", futures[future], exc)
+	return results, failed
+
+
+def _aggregate(repos: dict) -> dict:
+	totals: dict[str, int] = {}
+	for entry in repos.values():
+		for lang, size in entry["languages"].items():
+			totals[lang] = totals.get(lang, 0) + size
+	total = sum(totals.values())
+	languages = [
+		{"name": lang, "bytes": size, "percent": round(size * 100 / total, 2) if total else 0.0}
+		for lang, size in sorted(totals.items(), key=lambda item: item[1], reverse=True)
+	]
+	return {"weighted_by": "bytes", "total_bytes": total, "repositories": len(repos), "languages": languages}
+
+
+def count_primary(repos: list[dict]) -> dict:
+	"""Histogram of each repository's primary language, from the ``/users/{user}/repos`` payload alone."""
+	counts: dict[str, int] = {}
+	for repo in repos:
+		lang = repo.get("language")
+		if lang:
+			counts[lang] = counts.get(lang, 0) + 1
+	total = sum(counts.values())
+	languages = [
+		{"name": lang, "repositories": count, "percent": round(count * 100 / total, 2) if total else 0.0}
+		for lang, count in sorted(counts.items(), key=lambda item: item[1], reverse=True)
+	]
+	return {"weighted_by": "repositories", "repositories": len(repos), "languages": languages}
+
+
+language_stats = LanguageStats()
@@ -0,0 +1,113 @@
+"""Liveness and readiness probes.
+
+``/healthz`` answers from memory in constant time: the process is up and
+serving. ``/readyz`` checks what a request needs (the database answers, the
+migrations in ``create_app`` completed, the GitHub cache is warm) and keeps
+the result for ``READYZ_CACHE_SECONDS``, so probes at any frequency run the
+checks at most once per interval per worker.
+"""
+
+import os
+import threading
+from time import monotonic, perf_counter, time
+
+from flask import Blueprint, current_app, jsonify
+from sqlalchemy import text
+
+from .extensions import db
+
+health_bp = Blueprint("health", __name__)
+
+# Bump together with a new step in the migration block of ``create_app``
+SCHEMA_VERSION = 1
+
+_started = time()
+
+
+def mark_migrated(conn) -> None:
+	"""Record that the migrations for :data:`SCHEMA_VERSION` ran (SQLite ``user_version``)."""
+	conn.execute(text(f"PRAGMA user_version = {int(SCHEMA_VERSION)}"))
+	conn.commit()
+
+
+def _check_database() -> dict:
+	start = perf_counter()
+	db.session.execute(text("SELECT 1"))
+	version = db.session.execute(text("PRAGMA user_version")).scalar() or 0
+	db.session.rollback()
+	return {
+		"database": {"ok": True, "ms": round((perf_counter() - start) * 1000, 2)},
+		"migrations": {"ok": version >= SCHEMA_VERSION, "version": version, "expected": SCHEMA_VERSION},
+	}
+
+
+def _check_github() -> dict:
+	"""Age of this worker's newest GitHub fetch; informational, never fails readiness."""
+	if not os.getenv("GITHUB_USERNAME"):
+		return {"status": "disabled"}
+	from .github import cache_age
+	age = cache_age()
+	if age is None:
+		return {"status": "empty"}
+	max_age = current_app.config.get("READYZ_GITHUB_MAX_AGE", 3600)
+	return {"status": "fresh" if age <= max_age else "stale", "age": round(age, 1)}
+
+
+def _run_checks() -> tuple[dict, bool]:
+	checks: dict = {}
+	try:
+		checks.update(_check_database())
+	except Exception as exc:
+		db.session.rollback()
+		current_app.logger.warning("Readiness database check failed: %s", exc)
+		checks["database"] = {"ok": False, "error": exc.__class__.__name__}
+		checks["migrations"] = {"ok": False}
+	checks["github"] = _check_github()
+	return checks, checks["database"]["ok"] and checks["migrations"]["ok"]
+
+
+class _ReadinessCache:
+	"""Last readiness result per process; one thread refreshes it while others wait."""
+
+	def __init__(self):
+		self._lock = threading.Lock()
+		self._expires = 0.0
+		self._result: tuple[dict, bool] | None = None
+
+	def get(self, ttl: float) -> tuple[dict, bool, float]:
+		with self._lock:
+			now = monotonic()
+			if self._result is None or now >= self._expires:
+				self._result = _run_checks()
+				self._expires = now + ttl
+			checks, ready = self._result
+			return checks, ready, max(0.0, ttl - (self._expires - now))
+
+
+readiness = _ReadinessCache()
+
+
+def _liveness():
+	resp = jsonify({"status": "ok", "uptime": round(time() - _started, 1)})
+	resp.headers["Cache-Control"] = "no-store"
+	return resp
+
+
+@health_bp.get("/healthz")
+def healthz():
+	return _liveness()
+
+
+@health_bp.get("/health")
+def health():
+	"""Kept for existing probes; same as ``/healthz``."""
+	return _liveness()
+
+
+@health_bp.get("/readyz")
+def readyz():
+	checks, ready, age = readiness.get(float(current_app.config.get("READYZ_CACHE_SECONDS", 5)))
+	resp = jsonify({"status": "ready" if ready else "unavailable", "checks": checks, "age": round(age, 2)})
+	resp.status_code = 200 if ready else 503
+	resp.headers["Cache-Control"] = "no-store"
+	return resp
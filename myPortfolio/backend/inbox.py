@@ -0,0 +1,177 @@
+import csv
+import io
+import json
+import re
+from datetime import datetime
+
+from flask import Blueprint, Response, abort, flash, redirect, render_template, request, stream_with_context, url_for
+from sqlalchemy import Integer, column, delete, func, or_, text, update
+from sqlalchemy.exc import OperationalError
+
+from .auth import login_required
+from .extensions import db
+from .listing import AdminListing, contains_pattern
+from .models import ContactMessage
+
+inbox_bp = Blueprint("inbox", __name__)
+
+# Flipped on by ensure_schema() when SQLite was built with FTS5
+_fts = {"enabled": False}
+
+_EXPORT_FIELDS = ("id", "created_at", "first_name", "last_name", "phone_number", "message", "is_read")
+
+
+# ---------- Schema: created_at index, is_read column, FTS5 index ----------
+
+def ensure_schema(conn) -> None:
+	cols = [row[1] for row in conn.execute(text("PRAGMA table_info(contact_messages)"))]
+	if "is_read" not in cols:
+		conn.execute(text("ALTER TABLE contact_messages ADD COLUMN is_read BOOLEAN NOT NULL DEFAULT 0"))
+	conn.execute(text("CREATE INDEX IF NOT EXISTS ix_contact_messages_created_at ON contact_messages (created_at)"))
+	conn.commit()
+	try:
+		exists = conn.execute(text("SELECT name FROM sqlite_master WHERE type='table' AND name='contact_messages_fts'")).first()
+		if not exists:
+			conn.execute(text(
+				"CREATE VIRTUAL TABLE contact_messages_fts USING fts5("
+				"first_name, last_name, message, content='contact_messages', content_rowid='id')"
+			))
+			conn.execute(text("INSERT INTO contact_messages_fts(contact_messages_fts) VALUES ('rebuild')"))
+		conn.execute(text(
+			"""CREATE TRIGGER IF NOT EXISTS contact_messages_fts_insert AFTER INSERT ON contact_messages BEGIN
+				INSERT INTO contact_messages_fts (rowid, first_name, last_name, message) VALUES (NEW.id, NEW.first_name, NEW.last_name, NEW.message);
+			END"""
+		))
+		conn.execute(text(
+			"""CREATE TRIGGER IF NOT EXISTS contact_messages_fts_delete AFTER DELETE ON contact_messages BEGIN
+				INSERT INTO contact_messages_fts (contact_messages_fts, rowid, first_name, last_name, message) VALUES ('delete', OLD.id, OLD.first_name, OLD.last_name, OLD.message);
+			END"""
+		))
+		conn.execute(text(
+			"""CREATE TRIGGER IF NOT EXISTS contact_messages_fts_update AFTER UPDATE OF first_name, last_name, message ON contact_messages BEGIN
+				INSERT INTO contact_messages_fts (contact_messages_fts, rowid, first_name, last_name, message) VALUES ('delete', OLD.id, OLD.first_name, OLD.last_name, OLD.message);
+				INSERT INTO contact_messages_fts (rowid, first_name, last_name, message) VALUES (NEW.id, NEW.first_name, NEW.last_name, NEW.message);
+			END"""
+		))
+		conn.commit()
+		_fts["enabled"] = True
+	except OperationalError:
+		# SQLite without FTS5: search falls back to LIKE
+		conn.rollback()
+
+
+def _search_clause(q: str):
+	terms = re.findall(r"\w+", q)
+	if _fts["enabled"] and terms:
+		match = " ".join(f'"{term}"*' for term in terms)
+		matching = text("SELECT rowid FROM contact_messages_fts WHERE contact_messages_fts MATCH :match").bindparams(match=match)
+		return ContactMessage.id.in_(matching.columns(column("rowid", Integer)))
+	like = contains_pattern(q)
+	return or_(*(column.ilike(like, escape="\\") for column in (ContactMessage.first_name, ContactMessage.last_name, ContactMessage.message)))
+
+
+_message_listing = AdminListing(
+	ContactMessage,
+	[
+		ContactMessage.id, ContactMessage.first_name, ContactMessage.last_name, ContactMessage.phone_number,
+		func.substr(ContactMessage.message, 1, 140).label("preview"), ContactMessage.created_at, ContactMessage.is_read,
+	],
+	sortable={"created": ContactMessage.created_at},
+	default_sort="created",
+	search=_search_clause,
+	filters={"read": ContactMessage.is_read},
+)
+
+
+# ---------- Inbox views ----------
+
+@inbox_bp.get("/messages")
+@login_required
+def messages():
+	page = _message_listing.page(request.args)
+	unread = db.session.execute(db.select(func.count()).select_from(ContactMessage).where(ContactMessage.is_read.is_(False))).scalar()
+	return render_template("admin/messages.html", items=page.items, page=page, unread=unread)
+
+
+@inbox_bp.get("/messages/<int:item_id>")
+@login_required
+def message_detail(item_id: int):
+	item = db.session.get(ContactMessage, item_id) or abort(404)
+	if not item.is_read:
+		item.is_read = True
+		db.session.commit()
+	return render_template("admin/message_detail.html", item=item)
+
+
+@inbox_bp.post("/messages/bulk")
+@login_required
+def messages_bulk():
+	ids = [int(i) for i in request.form.getlist("ids") if i.isdigit()]
+	action = request.form.get("action")
+	if not ids:
+		flash("No messages selected", "warning")
+	elif action in ("read", "unread"):
+		result = db.session.execute(update(ContactMessage).where(ContactMessage.id.in_(ids)).values(is_read=action == "read"))
+		db.session.commit()
+		flash(f"Marked {result.rowcount} message(s) as {action}", "success")
+	elif action == "delete":
+		result = db.session.execute(delete(ContactMessage).where(ContactMessage.id.in_(ids)))
+		db.session.commit()
+		flash(f"Deleted {result.rowcount} message(s)", "info")
+	else:
+		flash("Unknown action", "danger")
+	next_url = request.form.get("next", "")
+	return redirect(next_url if next_url.startswith("/admin/") else url_for("inbox.messages"))
+
+
+# ---------- Streaming export ----------
+
+def _export_rows():
+	fields = [getattr(ContactMessage, name) for name in _EXPORT_FIELDS]
+	stmt, _, _ = _message_listing.query(request.args, columns=fields)
+	stmt = stmt.order_by(ContactMessage.created_at.desc(), ContactMessage.id.desc())
+	return db.session.execute(stmt.execution_options(yield_per=1000))
+
+
+def _csv_safe(value):
+	# Keep spreadsheet apps from evaluating user-supplied text as formulas
+	if isinstance(value, str) and value[:1] in ("=", "+", "-", "@"):
+		return "'" + value
+	if isinstance(value, datetime):
+		return value.isoformat()
+	return value
+
+
+def iter_csv(rows, flush_bytes: int = 64 * 1024):
+	buffer = io.StringIO()
+	writer = csv.writer(buffer)
+	writer.writerow(_EXPORT_FIELDS)
+	for row in rows:
+		writer.writerow([_csv_safe(value) for value in row])
+		if buffer.tell() >= flush_bytes:
+			yield buffer.getvalue()
+			buffer.seek(0)
+			buffer.truncate()
+	yield buffer.getvalue()
+
+
+def iter_ndjson(rows):
+	for row in rows:
+		record = dict(zip(_EXPORT_FIELDS, row))
+		record["created_at"] = record["created_at"].isoformat() if record["created_at"] else None
+		record["is_read"] = bool(record["is_read"])
+		yield json.dumps(record, ensure_ascii=False) + "\n"
+
+
+@inbox_bp.get("/messages/export.<fmt>")
+@login_required
+def messages_export(fmt: str):
+	if fmt not in ("csv", "ndjson"):
+		abort(404)
+	stamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+	body = iter_csv(_export_rows()) if fmt == "csv" else iter_ndjson(_export_rows())
+	return Response(
+		stream_with_context(body),
+		mimetype="text/csv" if fmt == "csv" else "application/x-ndjson",
+		headers={"Content-Disposition": f'attachment; filename="messages-{stamp}.{fmt}"'},
+	)
@@ -0,0 +1,91 @@
+import dataclasses
+import decimal
+import json
+import uuid
+from collections.abc import Mapping
+from datetime import date, datetime, time
+
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy.engine import Row, RowMapping
+
+try:  # optional: several times faster, falls back to the stdlib encoder
+	import orjson
+except ImportError:  # pragma: no cover - depends on environment
+	orjson = None
+
+
+def _default(obj):
+	"""Types neither encoder knows: SQLAlchemy rows and mappings, plus stdlib fallbacks."""
+	if isinstance(obj, Row):
+		return obj._asdict()
+	if isinstance(obj, Mapping):
+		return dict(obj)
+	if isinstance(obj, (datetime, date, time)):
+		return obj.isoformat()
+	if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+		return dataclasses.asdict(obj)
+	if isinstance(obj, (decimal.Decimal, uuid.UUID)):
+		return str(obj)
+	if isinstance(obj, (set, frozenset)):
+		return list(obj)
+	if hasattr(obj, "__html__"):
+		return str(obj.__html__())
+	raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _plain(obj):
+	"""Turn a list of SQLAlchemy rows into dicts in one pass.
+
+	Going through ``default`` would cost a Python callback per row; zipping
+	the shared key tuple with each row keeps the per-row work in C.
+	"""
+	if isinstance(obj, list) and obj:
+		first = obj[0]
+		if isinstance(first, Row):
+			keys = first._fields
+			return [dict(zip(keys, row)) for row in obj]
+		if isinstance(first, RowMapping):
+			keys = tuple(first.keys())
+			return [dict(zip(keys, row.values())) for row in obj]
+	return obj
+
+
+class JSONProvider(DefaultJSONProvider):
+	"""orjson-backed provider with the stdlib encoder as fallback.
+
+	Datetimes are written as ISO 8601 (the same strings ``to_dict()`` used to
+	build with ``isoformat()``), so views can hand over query rows,
+	``RowMapping`` objects or dataclasses directly instead of building a dict
+	per row. ``sort_keys`` and debug pretty-printing behave as in Flask.
+	"""
+
+	default = staticmethod(_default)
+
+	def _orjson_option(self, indent: bool = False) -> int:
+		option = orjson.OPT_NON_STR_KEYS
+		if self.sort_keys:
+			option |= orjson.OPT_SORT_KEYS
+		if indent:
+			option |= orjson.OPT_INDENT_2
+		return option
+
+	def dumps(self, obj, **kwargs) -> str:
+		if orjson is None or kwargs:
+			kwargs.setdefault("default", self.default)
+			kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+			kwargs.setdefault("sort_keys", self.sort_keys)
+			return json.dumps(_plain(obj), **kwargs)
+		return orjson.dumps(_plain(obj), default=self.default, option=self._orjson_option()).decode("utf-8")
+
+	def loads(self, s, **kwargs):
+		if orjson is None or kwargs:
+			return json.loads(s, **kwargs)
+		return orjson.loads(s)
+
+	def response(self, *args, **kwargs):
+		if orjson is None:
+			return super().response(_plain(self._prepare_response_obj(args, kwargs)))
+		obj = _plain(self._prepare_response_obj(args, kwargs))
+		indent = self.compact is False or (self.compact is None and self._app.debug)
+		body = orjson.dumps(obj, default=self.default, option=self._orjson_option(indent) | orjson.OPT_APPEND_NEWLINE)
+		return self._app.response_class(body, mimetype=self.mimetype)
@@ -0,0 +1,149 @@
+import base64
+import json
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import DateTime, String, func, or_, select, tuple_
+
+from .extensions import db
+
+
+def _encode_cursor(values: tuple) -> str:
+	raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+	return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort_column) -> tuple | None:
+	try:
+		padded = cursor + "=" * (-len(cursor) % 4)
+		value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+		if isinstance(getattr(sort_column, "type", None), DateTime) and value is not None:
+			value = datetime.fromisoformat(value)
+		return value, int(row_id)
+	except (ValueError, TypeError):
+		return None
+
+
+def contains_pattern(q: str) -> str:
+	"""``LIKE`` pattern matching ``q`` anywhere, with its own ``%``/``_`` taken literally (escape ``\\``)."""
+	escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+	return f"%{escaped}%"
+
+
+class ListingPage:
+	"""One page of an admin listing plus everything the template needs to link onwards."""
+
+	def __init__(self, items, *, sort, direction, q, filters, page_size, next_cursor, prev_cursor):
+		self.items = items
+		self.sort = sort
+		self.direction = direction
+		self.q = q
+		self.filters = filters
+		self.page_size = page_size
+		self.next_cursor = next_cursor
+		self.prev_cursor = prev_cursor
+
+	def args(self, **overrides) -> dict:
+		"""Query-string arguments for a link that keeps the current sort/filter."""
+		args = {"sort": self.sort, "dir": self.direction, "q": self.q or None, "size": self.page_size, **self.filters}
+		args.update(overrides)
+		return {k: v for k, v in args.items() if v not in (None, "")}
+
+	def sort_args(self, key: str) -> dict:
+		direction = "asc" if self.sort == key and self.direction == "desc" else "desc"
+		return self.args(sort=key, dir=direction, after=None, before=None)
+
+
+class AdminListing:
+	"""Keyset-paginated, column-projected listing for admin tables.
+
+	Only the given ``columns`` are selected, so BLOB and long-text columns
+	never leave SQLite. Sorting is by one of ``sortable`` with the primary key
+	as tie-breaker, and pages are addressed by opaque ``after``/``before``
+	cursors instead of OFFSET, so deep pages cost the same as the first.
+	``search`` is either columns to ILIKE or a callable returning a clause.
+
+	Row-value comparisons are NULL for NULL keys, which would end the
+	listing at the first such row, so nullable text columns sort (and page)
+	as ``COALESCE(column, '')``; other sort columns must be NOT NULL.
+	"""
+
+	def __init__(self, model, columns, *, sortable: dict, default_sort: str, default_direction: str = "desc", search=(), filters=None, joins=()):
+		for name, column in sortable.items():
+			if getattr(column, "nullable", False) and not isinstance(column.type, String):
+				raise ValueError(f"sort key {name!r} is nullable; only nullable text columns can be sorted on")
+		self.model = model
+		self.columns = columns
+		self.sortable = sortable
+		self.default_sort = default_sort
+		self.default_direction = default_direction
+		self.search = search
+		self.filters = filters or {}
+		self.joins = joins
+
+	def query(self, args, columns=None):
+		"""Build the filtered (unsorted, unpaginated) select for ``args``."""
+		stmt = select(*(columns or self.columns))
+		for target, onclause in self.joins:
+			stmt = stmt.outerjoin(target, onclause)
+		q = (args.get("q") or "").strip()
+		if q and callable(self.search):
+			stmt = stmt.where(self.search(q))
+		elif q and self.search:
+			stmt = stmt.where(or_(*[column.ilike(contains_pattern(q), escape="\\") for column in self.search]))
+		active_filters = {}
+		for name, column in self.filters.items():
+			value = args.get(name, type=int)
+			if value is not None:
+				stmt = stmt.where(column == value)
+				active_filters[name] = value
+		return stmt, q, active_filters
+
+	def page(self, args) -> ListingPage:
+		max_size = int(current_app.config.get("ADMIN_PAGE_SIZE_MAX", 100))
+		page_size = min(max(args.get("size", type=int) or int(current_app.config.get("ADMIN_PAGE_SIZE", 25)), 1), max_size)
+		sort = args.get("sort") if args.get("sort") in self.sortable else self.default_sort
+		direction = args.get("dir") if args.get("dir") in ("asc", "desc") else self.default_direction
+		sort_column = self.sortable[sort]
+		nullable = bool(getattr(sort_column, "nullable", False))
+		sort_key = func.coalesce(sort_column, "") if nullable else sort_column
+		pk = self.model.id
+		stmt, q, active_filters = self.query(args)
+
+		before = args.get("before")
+		cursor = _decode_cursor(before or args.get("after") or "", sort_column) if (before or args.get("after")) else None
+		# Walking backwards flips the comparison and the order, then re-reverses the rows
+		forward = not before
+		descending = (direction == "desc") == forward
+		key = tuple_(sort_key, pk)
+		if cursor is not None:
+			stmt = stmt.where(key < tuple_(*cursor) if descending else key > tuple_(*cursor))
+		order = (sort_key.desc(), pk.desc()) if descending else (sort_key.asc(), pk.asc())
+		rows = db.session.execute(stmt.order_by(*order).limit(page_size + 1)).all()
+
+		has_more = len(rows) > page_size
+		rows = rows[:page_size]
+		if not forward:
+			rows.reverse()
+
+		def cursor_of(row) -> str:
+			mapping = row._mapping
+			value = mapping[sort_column]
+			return _encode_cursor(("" if nullable and value is None else value, mapping[pk]))
+
+		next_cursor = prev_cursor = None
+		if rows:
+			if (has_more if forward else cursor is not None):
+				next_cursor = cursor_of(rows[-1])
+			if (cursor is not None if forward else has_more):
+				prev_cursor = cursor_of(rows[0])
+		return ListingPage(
+			rows,
+			sort=sort,
+			direction=direction,
+			q=q,
+			filters=active_filters,
+			page_size=page_size,
+			next_cursor=next_cursor,
+			prev_cursor=prev_cursor,
+		)
@@ -0,0 +1,161 @@
+import os
+import json
+import atexit
+import copy
+import logging
+import queue
+import random
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from flask import Flask, has_request_context, request
+from flask.logging import default_handler
+
+try:  # POSIX only; rotation falls back to single-process semantics elsewhere
+	import fcntl
+except ImportError:  # pragma: no cover - Windows
+	fcntl = None
+
+
+# Attributes every LogRecord has; anything else was passed via ``extra=``
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+	"""Render records as one JSON object per line."""
+
+	def format(self, record: logging.LogRecord) -> str:
+		payload = {
+			"ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+			"level": record.levelname,
+			"logger": record.name,
+			"pid": record.process,
+			"msg": record.getMessage(),
+		}
+		for key, value in vars(record).items():
+			if key not in _RESERVED and not key.startswith("_"):
+				payload[key] = value
+		if record.exc_info:
+			payload["exc"] = self.formatException(record.exc_info)
+		elif record.exc_text:
+			payload["exc"] = record.exc_text
+		return json.dumps(payload, default=str)
+
+
+class SamplingFilter(logging.Filter):
+	"""Keep only a fraction of records flagged with ``extra={"sampled": True}``."""
+
+	def __init__(self, rate: float):
+		super().__init__()
+		self.rate = rate
+
+	def filter(self, record: logging.LogRecord) -> bool:
+		if getattr(record, "sampled", False) and record.levelno < logging.WARNING:
+			return self.rate >= 1.0 or random.random() < self.rate
+		return True
+
+
+class LockedRotatingFileHandler(RotatingFileHandler):
+	"""RotatingFileHandler that is safe when several workers share one file.
+
+	Writes and rollovers happen under an ``flock`` on a sidecar lock file, and
+	the stream is reopened when another process has already rotated the file.
+	"""
+
+	def __init__(self, filename: str, **kwargs):
+		super().__init__(filename, delay=True, **kwargs)
+		self._lock_path = f"{self.baseFilename}.lock"
+
+	def _reopen_if_rotated(self) -> None:
+		if self.stream is None:
+			return
+		try:
+			current = os.stat(self.baseFilename)
+			opened = os.fstat(self.stream.fileno())
+			if (current.st_ino, current.st_dev) == (opened.st_ino, opened.st_dev):
+				return
+		except OSError:
+			pass
+		self.stream.close()
+		self.stream = None  # type: ignore[assignment]
+
+	def emit(self, record: logging.LogRecord) -> None:
+		if fcntl is None:
+			return super().emit(record)
+		with open(self._lock_path, "a") as lock_file:
+			fcntl.flock(lock_file, fcntl.LOCK_EX)
+			try:
+				self._reopen_if_rotated()
+				super().emit(record)
+				if self.stream is not None:
+					self.stream.flush()
+			finally:
+				fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class _ForkSafeQueueHandler(QueueHandler):
+	"""Never blocks the caller and restarts the listener thread after a fork."""
+
+	def __init__(self, log_queue: queue.Queue, start_listener):
+		super().__init__(log_queue)
+		self._start_listener = start_listener
+		self._pid = None
+		self.dropped = 0
+
+	def enqueue(self, record: logging.LogRecord) -> None:
+		if self._pid != os.getpid():
+			self._pid = os.getpid()
+			self._start_listener()
+		try:
+			self.queue.put_nowait(record)
+		except queue.Full:
+			self.dropped += 1
+
+	def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+		# Resolve everything on the calling thread; the listener has no request context
+		record = copy.copy(record)
+		record.message = record.getMessage()
+		record.msg, record.args = record.message, None
+		if record.exc_info:
+			record.exc_text = logging.Formatter().formatException(record.exc_info)
+			record.exc_info = None
+		if has_request_context() and not hasattr(record, "path"):
+			record.method = request.method
+			record.path = request.path
+		return record
+
+
+def init_app(app: Flask) -> None:
+	"""Route ``app.logger`` through a queue drained by a background thread."""
+	level = getattr(logging, str(app.config.get("LOG_LEVEL", "INFO")).upper(), logging.INFO)
+	app.logger.setLevel(level)
+
+	# create_app may run more than once per process; drop earlier pipelines
+	for handler in list(app.logger.handlers):
+		if handler is default_handler or isinstance(handler, _ForkSafeQueueHandler):
+			app.logger.removeHandler(handler)
+			if isinstance(handler, _ForkSafeQueueHandler) and handler.listener is not None:
+				handler.listener.stop()
+
+	file_handler = LockedRotatingFileHandler(
+		os.path.join(app.instance_path, "app.log"),
+		maxBytes=int(app.config.get("LOG_FILE_MAX_BYTES", 512 * 1024)),
+		backupCount=int(app.config.get("LOG_FILE_BACKUPS", 3)),
+	)
+	file_handler.setFormatter(JsonFormatter())
+	console_handler = logging.StreamHandler()
+	console_handler.setFormatter(logging.Formatter("[%(asctime)s] %(levelname)s in %(module)s: %(message)s"))
+
+	log_queue: queue.Queue = queue.Queue(maxsize=int(app.config.get("LOG_QUEUE_SIZE", 10000)))
+
+	def start_listener() -> None:
+		listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+		listener.start()
+		queue_handler.listener = listener
+		atexit.register(listener.stop)
+
+	queue_handler = _ForkSafeQueueHandler(log_queue, start_listener)
+	queue_handler.listener = None
+	queue_handler.setLevel(level)
+	queue_handler.addFilter(SamplingFilter(float(app.config.get("LOG_SAMPLE_RATE", 0.01))))
+	app.logger.addHandler(queue_handler)
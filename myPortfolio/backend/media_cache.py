@@ -0,0 +1,245 @@
+"""Per-process cache of hot media bodies, bounded by bytes.
+
+A handful of images (hero, project thumbnails) take most media requests.
+Entries hold the body, its strong ETag and, for compressible types such as
+SVG, pre-encoded variants, all counted against ``MEDIA_CACHE_BYTES``.
+
+Eviction is LRU, but admission is frequency-aware (TinyLFU): a count-min
+sketch tracks how often every key is requested, cached or not, and a new
+entry only displaces what it would evict if none of those victims is more
+popular than it. Entries above ``MEDIA_CACHE_MAX_ENTRY_BYTES`` are never
+admitted, so one large PDF cannot flush the thumbnails.
+
+Deleting an upload or changing a site setting invalidates the cache; like
+``settings.version``, a stamp file in the instance folder carries that to
+every worker at the cost of one ``stat()`` per lookup. Deletions are rare,
+so invalidation simply empties the cache.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from hashlib import blake2b
+
+from flask import current_app
+
+from .compression import ENCODERS
+from .metrics import register_cache
+
+
+class MediaEntry:
+	__slots__ = ("key", "data", "mime", "etag", "variants", "size")
+
+	def __init__(self, key: str, data: bytes, mime: str, etag: str, variants: dict[str, bytes]):
+		self.key = key
+		self.data = data
+		self.mime = mime
+		self.etag = etag
+		self.variants = variants
+		self.size = len(data) + sum(len(v) for v in variants.values())
+
+
+class FrequencySketch:
+	"""Count-min sketch of 4-bit counters, halved periodically so old popularity fades."""
+
+	_DEPTH = 4
+	_MAX = 15
+
+	def __init__(self, width: int = 4096):
+		self.width = width
+		self.rows = [bytearray(width) for _ in range(self._DEPTH)]
+		self.additions = 0
+		self.sample_size = 10 * width
+
+	def _slots(self, key: str):
+		digest = blake2b(key.encode(), digest_size=4 * self._DEPTH).digest()
+		for i in range(self._DEPTH):
+			yield self.rows[i], int.from_bytes(digest[4 * i:4 * i + 4], "little") % self.width
+
+	def increment(self, key: str) -> None:
+		for row, slot in self._slots(key):
+			if row[slot] < self._MAX:
+				row[slot] += 1
+		self.additions += 1
+		if self.additions >= self.sample_size:
+			for row in self.rows:
+				for i, value in enumerate(row):
+					row[i] = value >> 1
+			self.additions //= 2
+
+	def frequency(self, key: str) -> int:
+		return min(row[slot] for row, slot in self._slots(key))
+
+
+class MediaCache:
+	def __init__(self):
+		self._lock = threading.Lock()
+		self._items: OrderedDict[str, MediaEntry] = OrderedDict()
+		self._sketch = FrequencySketch()
+		self._stamp = None
+		self.size = 0
+		self.hits = 0
+		self.misses = 0
+		self.admissions = 0
+		self.rejections = 0
+		self.evictions = 0
+
+	# ----- configuration -----
+
+	@staticmethod
+	def _budget() -> int:
+		return int(current_app.config.get("MEDIA_CACHE_BYTES", 32 * 1024 * 1024))
+
+	def _max_entry(self) -> int:
+		return int(current_app.config.get("MEDIA_CACHE_MAX_ENTRY_BYTES", 0)) or self._budget() // 8
+
+	@staticmethod
+	def _stamp_path() -> str:
+		return os.path.join(current_app.instance_path, "media.version")
+
+	def _sync(self) -> None:
+		"""Drop everything if another worker invalidated since the last look."""
+		try:
+			st = os.stat(self._stamp_path())
+			stamp = (st.st_ino, st.st_mtime_ns)
+		except OSError:
+			stamp = None
+		if stamp != self._stamp:
+			with self._lock:
+				self._items.clear()
+				self.size = 0
+				self._stamp = stamp
+
+	def admits(self, size: int, key: str | None = None) -> bool:
+		"""Whether a body of ``size`` bytes would be cached (else stream it).
+
+		With ``key`` the admission policy is applied too, so a body that
+		TinyLFU would turn away is never read whole or compressed.
+		"""
+		if not current_app.config.get("MEDIA_CACHE_ENABLED", True) or size > min(self._budget(), self._max_entry()):
+			return False
+		if key is None:
+			return True
+		with self._lock:
+			if self._victims(key, size) is None:
+				self.rejections += 1
+				return False
+			return True
+
+	# ----- lookups -----
+
+	def get(self, key: str) -> MediaEntry | None:
+		if not current_app.config.get("MEDIA_CACHE_ENABLED", True):
+			return None
+		self._sync()
+		with self._lock:
+			self._sketch.increment(key)
+			entry = self._items.get(key)
+			if entry is None:
+				self.misses += 1
+				return None
+			self._items.move_to_end(key)
+			self.hits += 1
+			return entry
+
+	def build(self, key: str, data: bytes, mime: str, etag: str | None = None, admitted: bool = False) -> MediaEntry:
+		"""Make an entry (ETag and compressed variants) and admit it if the policy allows.
+
+		The entry is returned either way so the caller can answer from it;
+		variants are only encoded, at the ``COMPRESS_*_LEVEL`` settings, for
+		entries the policy admits. Pass ``admitted=True`` when :meth:`admits`
+		already said yes for this key, so the decision (and a rejection) is
+		not counted twice.
+		"""
+		etag = etag or blake2b(data, digest_size=16).hexdigest()
+		# Refused entries are answered uncompressed rather than encoded for nothing
+		if not admitted and not self.admits(len(data), key):
+			return MediaEntry(key, data, mime, etag, {})
+		variants = {}
+		if mime in _compressible_types() and len(data) >= int(current_app.config.get("COMPRESS_MIN_SIZE", 1024)):
+			for name, (encoder, default_level) in ENCODERS.items():
+				body = encoder(data, int(current_app.config.get(_LEVELS[name]) or default_level))
+				if len(body) < len(data):
+					variants[name] = body
+		entry = MediaEntry(key, data, mime, etag, variants)
+		self._admit(entry)
+		return entry
+
+	def _victims(self, key: str, size: int) -> list[MediaEntry] | None:
+		"""LRU entries to evict so ``size`` bytes fit, or None if one of them is more popular than ``key``."""
+		budget = self._budget()
+		old = self._items.get(key)
+		needed = self.size - (old.size if old is not None else 0) + size - budget
+		victims = []
+		if needed > 0:
+			candidate = self._sketch.frequency(key)
+			for victim in self._items.values():
+				if needed <= 0:
+					break
+				if victim is old:
+					continue
+				if self._sketch.frequency(victim.key) > candidate:
+					return None
+				victims.append(victim)
+				needed -= victim.size
+		return victims
+
+	def _admit(self, entry: MediaEntry) -> None:
+		with self._lock:
+			# Checked again: variants add to the size, and other threads may have filled the cache
+			victims = self._victims(entry.key, entry.size) if entry.size <= min(self._budget(), self._max_entry()) else None
+			if victims is None:
+				self.rejections += 1
+				return
+			old = self._items.pop(entry.key, None)
+			if old is not None:
+				self.size -= old.size
+			for victim in victims:
+				del self._items[victim.key]
+				self.size -= victim.size
+				self.evictions += 1
+			self._items[entry.key] = entry
+			self.size += entry.size
+			self.admissions += 1
+
+	# ----- invalidation -----
+
+	def invalidate(self) -> None:
+		"""Empty the cache in every worker (this one included, on its next lookup)."""
+		# Replace rather than touch: a new inode changes the stamp even on coarse-mtime filesystems
+		path = self._stamp_path()
+		tmp = f"{path}.{os.getpid()}.tmp"
+		try:
+			with open(tmp, "w") as fh:
+				fh.write(os.urandom(8).hex())
+			os.replace(tmp, path)
+		except OSError as exc:
+			current_app.logger.warning("Could not bump media cache version: %s", exc)
+			with self._lock:
+				self._items.clear()
+				self.size = 0
+
+	def stats(self) -> dict:
+		with self._lock:
+			lookups = self.hits + self.misses
+			return {
+				"entries": len(self._items),
+				"bytes": self.size,
+				"hits": self.hits,
+				"misses": self.misses,
+				"hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+				"admissions": self.admissions,
+				"rejections": self.rejections,
+				"evictions": self.evictions,
+			}
+
+
+_LEVELS = {"br": "COMPRESS_BR_LEVEL", "gzip": "COMPRESS_GZIP_LEVEL", "zstd": "COMPRESS_ZSTD_LEVEL"}
+
+
+def _compressible_types() -> set[str]:
+	return {t.strip() for t in current_app.config.get("COMPRESS_MIMETYPES", "").split(",") if t.strip()}
+
+
+media_cache = MediaCache()
+register_cache("media", media_cache.stats)
@@ -0,0 +1,440 @@
+import json
+import os
+import queue
+import re
+import threading
+from datetime import datetime
+from time import perf_counter, sleep, time
+
+import click
+from flask import Blueprint, current_app, flash, redirect, render_template, request, url_for
+from sqlalchemy import delete, event, select, update
+from sqlalchemy.orm import Session
+from werkzeug.security import safe_join
+
+from .auth import login_required
+from .extensions import db
+from .media_cache import media_cache
+from .models import Blog, BlogImage, Project
+
+try:  # POSIX only; elsewhere concurrent GC runs are not prevented across workers
+	import fcntl
+except ImportError:  # pragma: no cover - Windows
+	fcntl = None
+
+media_bp = Blueprint("media", __name__, cli_group="media")
+
+_UPLOAD_URL = re.compile(r"/uploads/[\w./-]+")
+
+
+def _uploads_dir() -> str:
+	return os.path.join(current_app.instance_path, "uploads")
+
+
+def upload_path(image_url: str | None) -> str | None:
+	"""Filesystem path behind an ``/uploads/...`` URL (None if not a local upload)."""
+	if not image_url or not image_url.startswith("/uploads/"):
+		return None
+	return safe_join(_uploads_dir(), image_url[len("/uploads/"):])
+
+
+# ---------- Deferred deletion ----------
+
+class _Deleter:
+	"""Single background thread that unlinks files queued by admin requests.
+
+	Restarted lazily after a fork, like the logging queue. Failures are
+	logged rather than swallowed; anything left behind is picked up by the
+	next garbage collection.
+	"""
+
+	def __init__(self):
+		self._queue: queue.Queue = queue.Queue()
+		self._pid = None
+		self._lock = threading.Lock()
+
+	def submit(self, paths: list[str], logger) -> None:
+		with self._lock:
+			if self._pid != os.getpid():
+				self._pid = os.getpid()
+				self._queue = queue.Queue()
+				threading.Thread(target=self._run, args=(self._queue,), name="media-deleter", daemon=True).start()
+		for path in paths:
+			self._queue.put((path, logger))
+
+	@staticmethod
+	def _run(work: queue.Queue) -> None:
+		while True:
+			path, logger = work.get()
+			try:
+				os.remove(path)
+			except FileNotFoundError:
+				pass
+			except OSError as exc:
+				logger.warning("Could not delete upload %s: %s", path, exc)
+
+	def drain(self, timeout: float = 5.0) -> None:
+		"""Wait until queued deletions are done (tests and CLI use)."""
+		deadline = time() + timeout
+		while not self._queue.empty() and time() < deadline:
+			sleep(0.01)
+
+
+_deleter = _Deleter()
+_listening = {"installed": False}
+
+
+def delete_after_commit(image_url: str | None) -> None:
+	"""Remove the upload behind ``image_url`` once the current transaction commits.
+
+	Nothing happens on rollback, and the unlink runs on a background thread
+	so admin requests never wait on the filesystem.
+	"""
+	path = upload_path(image_url)
+	if path:
+		db.session.info.setdefault("media_pending_delete", []).append(path)
+
+
+def _install_listeners() -> None:
+	if _listening["installed"]:
+		return
+	_listening["installed"] = True
+
+	@event.listens_for(Session, "after_commit")
+	def _flush_deletions(session):
+		paths = session.info.pop("media_pending_delete", None)
+		if paths:
+			media_cache.invalidate()
+			_deleter.submit(paths, current_app.logger)
+
+	@event.listens_for(Session, "after_rollback")
+	def _drop_deletions(session):
+		session.info.pop("media_pending_delete", None)
+
+
+# ---------- Garbage collection ----------
+
+class _Budget:
+	"""Counts batches across phases so one run does bounded work."""
+
+	def __init__(self, max_batches: int | None, pause: float):
+		self.max_batches = max_batches
+		self.pause = pause
+		self.used = 0
+
+	def take(self) -> bool:
+		if self.max_batches is not None and self.used >= self.max_batches:
+			return False
+		if self.used and self.pause:
+			sleep(self.pause)  # let other writers at the SQLite lock between batches
+		self.used += 1
+		return True
+
+
+def _referenced_in_content() -> set[str]:
+	"""Upload URLs embedded in blog bodies (kept even without an image row)."""
+	urls = set()
+	rows = db.session.execute(select(Blog.content).where(Blog.content.contains("/uploads/")).execution_options(yield_per=500))
+	for (content,) in rows:
+		urls.update(_UPLOAD_URL.findall(content or ""))
+	return urls
+
+
+def _walk_key(url: str) -> tuple:
+	"""Sort key matching the walk order below: directories depth-first, then names."""
+	parts = url[len("/uploads/"):].split("/")
+	return tuple(parts[:-1]), parts[-1]
+
+
+def _iter_upload_files(root: str, after: str | None = None):
+	"""Upload files in a stable order, starting after the URL ``after`` (which may be gone)."""
+	resume = _walk_key(after) if after else None
+	for dirpath, dirnames, filenames in os.walk(root):
+		rel = os.path.relpath(dirpath, root)
+		parts = () if rel == "." else tuple(rel.split(os.sep))
+		dirnames[:] = sorted(
+			d for d in dirnames
+			if not d.startswith(".") and (resume is None or parts + (d,) >= resume[0][:len(parts) + 1])
+		)
+		for name in sorted(filenames):
+			if not name.startswith(".") and (resume is None or (parts, name) > resume):
+				full = os.path.join(dirpath, name)
+				yield full, "/uploads/" + "/".join(parts + (name,))
+
+
+def _collect_files(report: dict, budget: _Budget, batch_size: int, min_age: float, dry_run: bool, position: dict) -> bool:
+	root = _uploads_dir()
+	if not os.path.isdir(root):
+		return True
+	in_content = _referenced_in_content()
+	cutoff = time() - min_age
+	files = _iter_upload_files(root, position["after"])
+	while True:
+		batch = [entry for _, entry in zip(range(batch_size), files)]
+		if not batch:
+			return True
+		if not budget.take():
+			return False
+		position["after"] = batch[-1][1]
+		urls = [url for _, url in batch]
+		referenced = set(db.session.execute(
+			select(Project.image_url).where(Project.image_url.in_(urls))
+			.union(select(BlogImage.image_url).where(BlogImage.image_url.in_(urls)))
+		).scalars())
+		report["files_scanned"] += len(batch)
+		for path, url in batch:
+			if url in referenced or url in in_content:
+				continue
+			try:
+				stat = os.stat(path)
+			except FileNotFoundError:
+				continue
+			# Young files may belong to an upload whose row is not committed yet
+			if stat.st_mtime > cutoff:
+				continue
+			report["orphan_files"] += 1
+			report["orphan_bytes"] += stat.st_size
+			if len(report["samples"]["orphan_files"]) < report["sample_limit"]:
+				report["samples"]["orphan_files"].append(url)
+			if not dry_run:
+				try:
+					os.remove(path)
+				except OSError as exc:
+					report["errors"].append(f"{url}: {exc}")
+
+
+def _collect_rows(report: dict, budget: _Budget, batch_size: int, dry_run: bool, position: dict, name: str, id_column, where, apply) -> bool:
+	"""Walk rows matching ``where`` by id in batches; ``apply(ids)`` fixes them."""
+	while True:
+		ids = db.session.execute(select(id_column).where(where, id_column > (position["after"] or 0)).order_by(id_column).limit(batch_size)).scalars().all()
+		if not ids:
+			return True
+		if not budget.take():
+			return False
+		position["after"] = ids[-1]
+		report[name] += len(ids)
+		samples = report["samples"][name]
+		samples.extend(ids[: max(report["sample_limit"] - len(samples), 0)])
+		if not dry_run:
+			db.session.execute(apply(ids))
+			db.session.commit()
+
+
+def _missing(urls_by_id: dict[int, str]) -> list[int]:
+	missing = []
+	for row_id, url in urls_by_id.items():
+		path = upload_path(url)
+		if path is None or not os.path.isfile(path):
+			missing.append(row_id)
+	return missing
+
+
+def _collect_broken_refs(report: dict, budget: _Budget, batch_size: int, dry_run: bool, position: dict, model, name: str) -> bool:
+	"""Rows whose URL points at a missing file and that have no BLOB to fall back on."""
+	while True:
+		rows = db.session.execute(
+			select(model.id, model.image_url)
+			.where(model.image_url.is_not(None), model.image_data.is_(None), model.id > (position["after"] or 0))
+			.order_by(model.id).limit(batch_size)
+		).all()
+		if not rows:
+			return True
+		if not budget.take():
+			return False
+		position["after"] = rows[-1][0]
+		broken = _missing(dict(rows))
+		report[name] += len(broken)
+		samples = report["samples"][name]
+		samples.extend(broken[: max(report["sample_limit"] - len(samples), 0)])
+		if broken and not dry_run:
+			if model is Project:
+				db.session.execute(update(Project).where(Project.id.in_(broken)).values(image_url=None, image_mime=None))
+			else:
+				db.session.execute(delete(BlogImage).where(BlogImage.id.in_(broken)))
+			db.session.commit()
+
+
+# ---------- Resuming bounded runs ----------
+
+PHASES = ("stale_project_blobs", "dangling_blog_images", "broken_project_images", "broken_blog_images", "orphan_files")
+
+
+def _cursor_path() -> str:
+	return os.path.join(current_app.instance_path, "media-gc-cursor.json")
+
+
+def _load_cursor(dry_run: bool) -> dict | None:
+	"""Where the last bounded run of this mode stopped (None: start a new pass)."""
+	try:
+		with open(_cursor_path(), encoding="utf-8") as fh:
+			cursor = json.load(fh).get("dry_run" if dry_run else "apply")
+	except (OSError, ValueError, AttributeError):
+		return None
+	if not isinstance(cursor, dict) or cursor.get("phase") not in PHASES:
+		return None
+	return {"phase": cursor["phase"], "after": cursor.get("after")}
+
+
+def _save_cursor(dry_run: bool, cursor: dict | None) -> None:
+	path = _cursor_path()
+	try:
+		with open(path, encoding="utf-8") as fh:
+			cursors = json.load(fh)
+	except (OSError, ValueError):
+		cursors = {}
+	if not isinstance(cursors, dict):
+		cursors = {}
+	cursors["dry_run" if dry_run else "apply"] = cursor
+	tmp = f"{path}.{os.getpid()}.tmp"
+	with open(tmp, "w", encoding="utf-8") as fh:
+		json.dump(cursors, fh)
+	os.replace(tmp, path)
+
+
+def collect(*, dry_run: bool = True, batch_size: int | None = None, max_batches: int | None = None, min_age: float | None = None, pause: float | None = None, sample_limit: int = 50) -> dict:
+	"""Reconcile ``instance/uploads``, image BLOBs and URL references.
+
+	Removes upload files no row or blog body refers to, clears project BLOBs
+	left behind after the image was removed, deletes blog image rows whose
+	blog is gone, and drops references to files that are missing and have no
+	BLOB fallback. Work happens in batches of ``batch_size`` with a commit
+	each; ``max_batches`` caps one run, and ``complete`` in the report says
+	whether it finished. A capped run that stops early saves the row id or
+	file it reached, and the next capped run of the same mode carries on from
+	there, starting a new pass once one completes; uncapped runs always do a
+	full pass. With ``dry_run`` nothing is changed.
+	"""
+	config = current_app.config
+	batch_size = batch_size or int(config.get("MEDIA_GC_BATCH_SIZE", 500))
+	min_age = float(config.get("MEDIA_GC_MIN_AGE", 3600) if min_age is None else min_age)
+	pause = float(config.get("MEDIA_GC_BATCH_PAUSE", 0.05) if pause is None else pause)
+	budget = _Budget(max_batches, pause)
+	report = {
+		"dry_run": dry_run,
+		"started_at": datetime.utcnow().isoformat(timespec="seconds"),
+		"complete": False,
+		"files_scanned": 0,
+		"orphan_files": 0,
+		"orphan_bytes": 0,
+		"stale_project_blobs": 0,
+		"dangling_blog_images": 0,
+		"broken_project_images": 0,
+		"broken_blog_images": 0,
+		"errors": [],
+		"sample_limit": sample_limit,
+		"samples": {name: [] for name in ("orphan_files", "stale_project_blobs", "dangling_blog_images", "broken_project_images", "broken_blog_images")},
+	}
+	phases = {
+		"stale_project_blobs": lambda position: _collect_rows(
+			report, budget, batch_size, dry_run, position, "stale_project_blobs", Project.id,
+			(Project.image_url.is_(None)) & (Project.image_data.is_not(None)),
+			lambda ids: update(Project).where(Project.id.in_(ids)).values(image_data=None, image_mime=None),
+		),
+		"dangling_blog_images": lambda position: _collect_rows(
+			report, budget, batch_size, dry_run, position, "dangling_blog_images", BlogImage.id,
+			BlogImage.blog_id.not_in(select(Blog.id)),
+			lambda ids: delete(BlogImage).where(BlogImage.id.in_(ids)),
+		),
+		"broken_project_images": lambda position: _collect_broken_refs(report, budget, batch_size, dry_run, position, Project, "broken_project_images"),
+		"broken_blog_images": lambda position: _collect_broken_refs(report, budget, batch_size, dry_run, position, BlogImage, "broken_blog_images"),
+		"orphan_files": lambda position: _collect_files(report, budget, batch_size, min_age, dry_run, position),
+	}
+	resume = _load_cursor(dry_run) if max_batches is not None else None
+	report["resumed_from"] = resume
+
+	started = perf_counter()
+	report["complete"] = True
+	position = None
+	for name in PHASES[PHASES.index(resume["phase"]) if resume else 0:]:
+		position = {"phase": name, "after": resume["after"] if resume and resume["phase"] == name else None}
+		if not phases[name](position):
+			report["complete"] = False
+			break
+	try:
+		_save_cursor(dry_run, None if report["complete"] else position)
+	except OSError as exc:
+		current_app.logger.warning("Could not save the media GC position: %s", exc)
+	if not dry_run:
+		media_cache.invalidate()
+	report["batches"] = budget.used
+	report["seconds"] = round(perf_counter() - started, 3)
+	return report
+
+
+# ---------- Background runs ----------
+
+def _report_path() -> str:
+	return os.path.join(current_app.instance_path, "media-gc.json")
+
+
+def last_report() -> dict | None:
+	try:
+		with open(_report_path(), encoding="utf-8") as fh:
+			return json.load(fh)
+	except (OSError, ValueError):
+		return None
+
+
+def run_locked(**options) -> dict | None:
+	"""Run :func:`collect` unless another process is already collecting."""
+	lock_path = os.path.join(current_app.instance_path, "media-gc.lock")
+	with open(lock_path, "a") as lock_file:
+		if fcntl is not None:
+			try:
+				fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+			except BlockingIOError:
+				return None
+		try:
+			report = collect(**options)
+		except Exception as exc:
+			db.session.rollback()
+			current_app.logger.exception("Media GC failed")
+			report = {"dry_run": options.get("dry_run", True), "complete": False, "errors": [str(exc)]}
+		finally:
+			db.session.remove()
+		report["finished_at"] = datetime.utcnow().isoformat(timespec="seconds")
+		tmp = _report_path() + ".tmp"
+		with open(tmp, "w", encoding="utf-8") as fh:
+			json.dump(report, fh, indent=2)
+		os.replace(tmp, _report_path())
+		return report
+
+
+def start_background(app, **options) -> None:
+	def work():
+		with app.app_context():
+			run_locked(**options)
+
+	threading.Thread(target=work, name="media-gc", daemon=True).start()
+
+
+@media_bp.get("/media")
+@login_required
+def media_page():
+	return render_template("admin/media.html", report=last_report(), cache=media_cache.stats())
+
+
+@media_bp.post("/media/gc")
+@login_required
+def media_gc():
+	dry_run = request.form.get("mode") != "apply"
+	start_background(current_app._get_current_object(), dry_run=dry_run, max_batches=request.form.get("max_batches", type=int))
+	flash("Dry run started" if dry_run else "Garbage collection started", "info")
+	return redirect(url_for("media.media_page"))
+
+
+@media_bp.cli.command("gc")
+@click.option("--apply", "apply_changes", is_flag=True, help="delete and update (default is a dry run)")
+@click.option("--batch-size", type=int, default=None, help="rows or files per batch")
+@click.option("--max-batches", type=int, default=None, help="stop after this many batches")
+@click.option("--min-age", type=float, default=None, help="ignore files newer than this many seconds")
+def gc_command(apply_changes: bool, batch_size: int | None, max_batches: int | None, min_age: float | None):
+	"""Find (and with --apply, remove) orphaned uploads and stale image data."""
+	report = run_locked(dry_run=not apply_changes, batch_size=batch_size, max_batches=max_batches, min_age=min_age)
+	if report is None:
+		raise click.ClickException("another media GC run is in progress")
+	click.echo(json.dumps(report, indent=2))
+
+
+def init_app(app) -> None:
+	_install_listeners()
@@ -0,0 +1,405 @@
+import hmac
+import os
+import json
+import threading
+from collections.abc import Callable
+from contextlib import contextmanager
+from time import perf_counter, time
+from uuid import uuid4
+
+from flask import Blueprint, Flask, Response, current_app, g, has_request_context, redirect, request, session, url_for, before_render_template, template_rendered
+from sqlalchemy import event
+
+from .json_provider import JSONProvider
+
+try:  # POSIX only; elsewhere two scrapes may both fold the same exited worker
+	import fcntl
+except ImportError:  # pragma: no cover - Windows
+	fcntl = None
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+# In-process caches reporting counters to /metrics (name -> stats callable)
+_cache_sources: dict[str, Callable[[], dict]] = {}
+_CACHE_COUNTERS = ("hits", "misses", "admissions", "rejections", "evictions")
+_CACHE_GAUGES = ("bytes", "entries")
+
+
+def register_cache(name: str, stats: Callable[[], dict]) -> None:
+	_cache_sources[name] = stats
+
+
+# -------- Per-request phase timings (Server-Timing) --------
+_PHASES = ("db", "github", "render", "serialize", "compress")
+
+
+def _timings() -> dict | None:
+	if not has_request_context():
+		return None
+	timings = g.get("_timings")
+	if timings is None:
+		timings = g._timings = {"db_count": 0}
+	return timings
+
+
+def record(phase: str, seconds: float) -> None:
+	"""Add ``seconds`` to the named phase of the current request, if any."""
+	timings = _timings()
+	if timings is not None:
+		timings[phase] = timings.get(phase, 0.0) + seconds
+
+
+@contextmanager
+def timed(phase: str):
+	"""Time a block of work and attribute it to a Server-Timing phase."""
+	start = perf_counter()
+	try:
+		yield
+	finally:
+		record(phase, perf_counter() - start)
+
+
+class TimedJSONProvider(JSONProvider):
+	"""The app's JSON provider, reporting serialization time."""
+
+	def response(self, *args, **kwargs):
+		with timed("serialize"):
+			return super().response(*args, **kwargs)
+
+
+# -------- Aggregated metrics, shared across workers via snapshot files --------
+_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Registry:
+	"""Per-process metric store, periodically flushed to ``METRICS_DIR``.
+
+	Each worker owns one JSON snapshot file; ``/metrics`` merges every file so
+	the exposition covers all gunicorn workers without shared memory.
+	"""
+
+	def __init__(self):
+		self.lock = threading.Lock()
+		self.requests: dict[str, int] = {}
+		self.histograms: dict[str, list] = {}
+		self.phases: dict[str, float] = {}
+		self.queries: dict[str, int] = {}
+		self.last_flush = 0.0
+		self.token = f"{os.getpid()}-{uuid4().hex[:8]}"
+		self.pid = os.getpid()
+
+	def reset_after_fork(self) -> None:
+		with self.lock:
+			self.requests.clear()
+			self.histograms.clear()
+			self.phases.clear()
+			self.queries.clear()
+			self.pid = os.getpid()
+			self.token = f"{self.pid}-{uuid4().hex[:8]}"
+
+	def observe(self, endpoint: str, method: str, status: int, duration: float, timings: dict) -> None:
+		if self.pid != os.getpid():
+			self.reset_after_fork()
+		key = f"{endpoint}|{method}"
+		with self.lock:
+			req_key = f"{key}|{status}"
+			self.requests[req_key] = self.requests.get(req_key, 0) + 1
+			hist = self.histograms.get(key)
+			if hist is None:
+				# bucket counts, then +Inf count, then sum
+				hist = self.histograms[key] = [0] * (len(_BUCKETS) + 1) + [0.0]
+			for i, bound in enumerate(_BUCKETS):
+				if duration <= bound:
+					hist[i] += 1
+			hist[len(_BUCKETS)] += 1
+			hist[-1] += duration
+			self.queries[endpoint] = self.queries.get(endpoint, 0) + timings.get("db_count", 0)
+			for phase in _PHASES:
+				if phase in timings:
+					phase_key = f"{endpoint}|{phase}"
+					self.phases[phase_key] = self.phases.get(phase_key, 0.0) + timings[phase]
+
+	def snapshot(self) -> dict:
+		with self.lock:
+			return {
+				"requests": dict(self.requests),
+				"histograms": {k: list(v) for k, v in self.histograms.items()},
+				"phases": dict(self.phases),
+				"queries": dict(self.queries),
+				"caches": {name: stats() for name, stats in _cache_sources.items()},
+			}
+
+	def flush(self, directory: str, force: bool = False, interval: float = 5.0) -> None:
+		now = time()
+		if not force and now - self.last_flush < interval:
+			return
+		self.last_flush = now
+		try:
+			os.makedirs(directory, exist_ok=True)
+			path = os.path.join(directory, f"{self.token}.json")
+			tmp_path = f"{path}.tmp"
+			with open(tmp_path, "w", encoding="utf-8") as fh:
+				json.dump(self.snapshot(), fh)
+			os.replace(tmp_path, path)
+		except OSError:
+			pass
+
+
+_registry = _Registry()
+
+
+_RETIRED = "retired.json"
+
+
+def _worker_alive(name: str) -> bool:
+	"""Whether the worker that wrote snapshot ``name`` (``<pid>-<id>.json``) still runs."""
+	pid = name.split("-", 1)[0]
+	if not pid.isdigit():
+		return True
+	try:
+		os.kill(int(pid), 0)
+	except ProcessLookupError:
+		return False
+	except OSError:
+		pass
+	return True
+
+
+def _add_snapshot(merged: dict, snap: dict, gauges: bool = True) -> None:
+	for section in ("requests", "phases", "queries"):
+		target = merged[section]
+		for key, value in snap.get(section, {}).items():
+			target[key] = target.get(key, 0) + value
+	for key, values in snap.get("histograms", {}).items():
+		existing = merged["histograms"].get(key)
+		if existing is None:
+			merged["histograms"][key] = list(values)
+		else:
+			merged["histograms"][key] = [a + b for a, b in zip(existing, values)]
+	for name, stats in snap.get("caches", {}).items():
+		target = merged["caches"].setdefault(name, {})
+		for field in (*_CACHE_COUNTERS, *(_CACHE_GAUGES if gauges else ())):
+			target[field] = target.get(field, 0) + stats.get(field, 0)
+
+
+def _empty() -> dict:
+	return {"requests": {}, "histograms": {}, "phases": {}, "queries": {}, "caches": {}}
+
+
+def _read(path: str) -> dict | None:
+	try:
+		with open(path, encoding="utf-8") as fh:
+			return json.load(fh)
+	except (OSError, ValueError):
+		return None
+
+
+def _retire(directory: str, names: list[str]) -> None:
+	"""Fold the counters of exited workers into ``retired.json`` and delete their snapshots.
+
+	Counters stay monotonic across worker recycling; the gauges (cache bytes
+	and entries) of a process that is gone are dropped.
+	"""
+	with open(os.path.join(directory, ".retire.lock"), "a") as lock_file:
+		if fcntl is not None:
+			fcntl.flock(lock_file, fcntl.LOCK_EX)
+		retired_path = os.path.join(directory, _RETIRED)
+		retired = _read(retired_path) or _empty()
+		folded = []
+		for name in names:
+			snap = _read(os.path.join(directory, name))
+			if snap is not None:  # another scrape may have folded it already
+				_add_snapshot(retired, snap, gauges=False)
+				folded.append(name)
+		if not folded:
+			return
+		for caches in retired["caches"].values():
+			for field in _CACHE_GAUGES:
+				caches.pop(field, None)
+		tmp = f"{retired_path}.{os.getpid()}.tmp"
+		with open(tmp, "w", encoding="utf-8") as fh:
+			json.dump(retired, fh)
+		os.replace(tmp, retired_path)
+		for name in folded:
+			try:
+				os.remove(os.path.join(directory, name))
+			except FileNotFoundError:
+				pass
+
+
+def _merge_snapshots(directory: str, stale_after: float = 300.0) -> dict:
+	"""Sum every worker's snapshot; gauges only from snapshots written in the last ``stale_after`` seconds."""
+	merged = _empty()
+	_add_snapshot(merged, _registry.snapshot())
+	if not os.path.isdir(directory):
+		return merged
+	own_file = f"{_registry.token}.json"
+	names = [n for n in os.listdir(directory) if n.endswith(".json") and n not in (own_file, _RETIRED)]
+	exited = [n for n in names if not _worker_alive(n)]
+	if exited:
+		try:
+			_retire(directory, exited)
+		except OSError as exc:
+			current_app.logger.warning("Could not retire metrics of exited workers: %s", exc)
+	retired = _read(os.path.join(directory, _RETIRED))
+	if retired is not None:
+		_add_snapshot(merged, retired, gauges=False)
+	cutoff = time() - stale_after
+	for name in names:
+		path = os.path.join(directory, name)
+		try:
+			fresh = os.stat(path).st_mtime >= cutoff
+		except OSError:
+			continue  # retired just now
+		snap = _read(path)
+		if snap is not None:
+			_add_snapshot(merged, snap, gauges=fresh)
+	for stats in merged["caches"].values():
+		for field in (*_CACHE_COUNTERS, *_CACHE_GAUGES):
+			stats.setdefault(field, 0)
+	return merged
+
+
+def _label(value: str) -> str:
+	return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def render_prometheus(directory: str, stale_after: float = 300.0) -> str:
+	data = _merge_snapshots(directory, stale_after)
+	lines = [
+		"# HELP portfolio_requests_total Total HTTP requests handled.",
+		"# TYPE portfolio_requests_total counter",
+	]
+	for key, value in sorted(data["requests"].items()):
+		endpoint, method, status = key.split("|")
+		lines.append(f'portfolio_requests_total{{endpoint="{_label(endpoint)}",method="{method}",status="{status}"}} {value}')
+
+	lines += [
+		"# HELP portfolio_request_duration_seconds Request latency by endpoint.",
+		"# TYPE portfolio_request_duration_seconds histogram",
+	]
+	for key, hist in sorted(data["histograms"].items()):
+		endpoint, method = key.split("|")
+		labels = f'endpoint="{_label(endpoint)}",method="{method}"'
+		for bound, count in zip(_BUCKETS, hist):
+			lines.append(f'portfolio_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+		lines.append(f'portfolio_request_duration_seconds_bucket{{{labels},le="+Inf"}} {hist[len(_BUCKETS)]}')
+		lines.append(f"portfolio_request_duration_seconds_sum{{{labels}}} {hist[-1]:.6f}")
+		lines.append(f"portfolio_request_duration_seconds_count{{{labels}}} {hist[len(_BUCKETS)]}")
+
+	lines += [
+		"# HELP portfolio_db_queries_total SQL statements executed while serving requests.",
+		"# TYPE portfolio_db_queries_total counter",
+	]
+	for endpoint, value in sorted(data["queries"].items()):
+		lines.append(f'portfolio_db_queries_total{{endpoint="{_label(endpoint)}"}} {value}')
+
+	lines += [
+		"# HELP portfolio_phase_seconds_total Time spent per request phase (db, github, render, serialize).",
+		"# TYPE portfolio_phase_seconds_total counter",
+	]
+	for key, value in sorted(data["phases"].items()):
+		endpoint, phase = key.split("|")
+		lines.append(f'portfolio_phase_seconds_total{{endpoint="{_label(endpoint)}",phase="{phase}"}} {value:.6f}')
+
+	for field in _CACHE_COUNTERS:
+		lines += [
+			f"# HELP portfolio_cache_{field}_total In-process cache {field}, summed over workers.",
+			f"# TYPE portfolio_cache_{field}_total counter",
+		]
+		for name, stats in sorted(data["caches"].items()):
+			lines.append(f'portfolio_cache_{field}_total{{cache="{_label(name)}"}} {stats[field]}')
+	for field in _CACHE_GAUGES:
+		lines += [
+			f"# HELP portfolio_cache_{field} In-process cache {field}, summed over workers.",
+			f"# TYPE portfolio_cache_{field} gauge",
+		]
+		for name, stats in sorted(data["caches"].items()):
+			lines.append(f'portfolio_cache_{field}{{cache="{_label(name)}"}} {stats[field]}')
+	return "\n".join(lines) + "\n"
+
+
+def _metrics_dir(app: Flask) -> str:
+	return app.config.get("METRICS_DIR") or os.path.join(app.instance_path, "metrics")
+
+
+# -------- Wiring --------
+
+def init_app(app: Flask) -> None:
+	"""Attach request timing, SQL counting and Server-Timing to ``app``."""
+	if not app.config.get("METRICS_ENABLED", True):
+		return
+
+	app.json = TimedJSONProvider(app)
+	directory = _metrics_dir(app)
+	interval = float(app.config.get("METRICS_FLUSH_INTERVAL", 5))
+
+	with app.app_context():
+		engine = app.extensions["sqlalchemy"].engine
+
+	@event.listens_for(engine, "before_cursor_execute")
+	def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # type: ignore[no-redef]
+		if has_request_context():
+			conn.info.setdefault("_query_start", []).append(perf_counter())
+
+	@event.listens_for(engine, "after_cursor_execute")
+	def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # type: ignore[no-redef]
+		starts = conn.info.get("_query_start")
+		timings = _timings()
+		if not starts or timings is None:
+			return
+		record("db", perf_counter() - starts.pop())
+		timings["db_count"] += 1
+
+	def _render_started(sender, template, context, **extra):
+		if has_request_context():
+			g._render_start = perf_counter()
+
+	def _render_finished(sender, template, context, **extra):
+		start = g.pop("_render_start", None) if has_request_context() else None
+		if start is not None:
+			record("render", perf_counter() - start)
+
+	before_render_template.connect(_render_started, app, weak=False)
+	template_rendered.connect(_render_finished, app, weak=False)
+
+	@app.before_request
+	def _start_request_timer():  # type: ignore[no-redef]
+		g._request_start = perf_counter()
+
+	@app.after_request
+	def _emit_server_timing(response):  # type: ignore[no-redef]
+		start = g.get("_request_start")
+		if start is None:
+			return response
+		duration = perf_counter() - start
+		timings = _timings() or {}
+		parts = []
+		for phase in _PHASES:
+			if phase in timings:
+				desc = f';desc="{timings["db_count"]} queries"' if phase == "db" else ""
+				parts.append(f"{phase};dur={timings[phase] * 1000:.2f}{desc}")
+		parts.append(f"total;dur={duration * 1000:.2f}")
+		response.headers["Server-Timing"] = ", ".join(parts)
+		endpoint = request.endpoint or "unmatched"
+		_registry.observe(endpoint, request.method, response.status_code, duration, timings)
+		_registry.flush(directory, interval=interval)
+		return response
+
+
+def _metrics_authorized() -> bool:
+	token = current_app.config.get("METRICS_TOKEN")
+	if token and hmac.compare_digest(request.headers.get("Authorization", "").encode(), f"Bearer {token}".encode()):
+		return True
+	return bool(session.get("admin_logged_in"))
+
+
+@metrics_bp.get("/metrics")
+def metrics():
+	if not _metrics_authorized():
+		if current_app.config.get("METRICS_TOKEN") and "Authorization" in request.headers:
+			return Response("Unauthorized\n", status=401, mimetype="text/plain")
+		return redirect(url_for("auth.login"))
+	body = render_prometheus(_metrics_dir(current_app), float(current_app.config.get("METRICS_STALE_SECONDS", 300)))
+	return Response(body, mimetype="text/plain; version=0.0.4")
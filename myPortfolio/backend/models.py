@@ -1,10 +1,28 @@
 from datetime import datetime
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Integer, String, Text, DateTime, ForeignKey, LargeBinary
+from sqlalchemy import Integer, String, Text, DateTime, ForeignKey, LargeBinary, Boolean, Column, Index, Table
 
 from .extensions import db
 
 
+# Normalized Project.tech_stack, kept in sync by backend/tags.py
+project_tags = Table(
+	"project_tags",
+	db.metadata,
+	Column("project_id", Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True),
+	Column("tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+	Index("ix_project_tags_tag_id", "tag_id", "project_id"),
+)
+
+
+class Tag(db.Model):
+	__tablename__ = "tags"
+
+	id: Mapped[int] = mapped_column(Integer, primary_key=True)
+	slug: Mapped[str] = mapped_column(String(100), unique=True, nullable=False)  # lowercased, for matching
+	label: Mapped[str] = mapped_column(String(100), nullable=False)  # as first written, for display
+
+
 class Project(db.Model):
 	__tablename__ = "projects"
 
@@ -19,6 +37,8 @@ class Project(db.Model):
 	image_mime: Mapped[str | None] = mapped_column(String(100), nullable=True)
 	created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
 
+	tags: Mapped[list[Tag]] = relationship(Tag, secondary=project_tags)
+
 	def to_dict(self) -> dict:
 		return {
 			"id": self.id,
@@ -74,7 +94,8 @@ class ContactMessage(db.Model):
 	last_name: Mapped[str] = mapped_column(String(100), nullable=False)
 	phone_number: Mapped[str] = mapped_column(String(100), nullable=False)
 	message: Mapped[str] = mapped_column(Text, nullable=False)
-	created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+	created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+	is_read: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
 
 	def to_dict(self) -> dict:
 		return {
@@ -84,6 +105,7 @@ class ContactMessage(db.Model):
 			"phone_number": self.phone_number,
 			"message": self.message,
 			"created_at": self.created_at.isoformat() if self.created_at else None,
+			"is_read": bool(self.is_read),
 		}
 
 
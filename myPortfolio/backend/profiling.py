@@ -0,0 +1,173 @@
+"""Opt-in sampling profiler for live requests.
+
+With ``PROFILE_ENABLED`` off (the default) nothing is registered, so normal
+requests pay nothing. When on, a request is profiled if it carries an
+``X-Profile`` header from a logged-in admin (or equal to ``PROFILE_TOKEN``),
+or at random with probability ``PROFILE_SAMPLE_RATE``. A helper thread then
+samples the request thread's stack every ``PROFILE_INTERVAL`` seconds until
+the request is torn down, and the stacks are written in the folded format
+(``frame;frame;frame count``) that flamegraph.pl, speedscope and inferno
+read, to ``instance/profiles`` (newest ``PROFILE_KEEP`` kept).
+"""
+
+import hmac
+import os
+import random
+import re
+import sys
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from time import perf_counter
+
+from flask import Blueprint, Flask, abort, current_app, g, render_template, request, send_file, session
+
+from .auth import login_required
+
+profiles_bp = Blueprint("profiles", __name__)
+
+_NAME = re.compile(r"^\d{8}T\d{12}Z-[A-Z]+-[\w.-]{1,80}-\d+ms\.folded$")
+
+
+def profiles_dir(app: Flask | None = None) -> str:
+	app = app or current_app
+	return app.config.get("PROFILE_DIR") or os.path.join(app.instance_path, "profiles")
+
+
+class _Sampler(threading.Thread):
+	"""Counts the stacks one thread is executing, sampled at a fixed interval."""
+
+	def __init__(self, thread_id: int, interval: float):
+		super().__init__(name="profile-sampler", daemon=True)
+		self.thread_id = thread_id
+		self.interval = interval
+		self.stacks: Counter[str] = Counter()
+		self._done = threading.Event()
+		self._labels: dict = {}
+
+	def _label(self, code) -> str:
+		label = self._labels.get(code)
+		if label is None:
+			path = code.co_filename.replace(os.sep, "/").rsplit("/", 2)
+			label = self._labels[code] = f"{code.co_name} ({'/'.join(path[-2:])}:{code.co_firstlineno})".replace(";", ":")
+		return label
+
+	def run(self) -> None:
+		current_frames = sys._current_frames
+		while not self._done.wait(self.interval):
+			frame = current_frames().get(self.thread_id)
+			stack = []
+			while frame is not None:
+				stack.append(self._label(frame.f_code))
+				frame = frame.f_back
+			if stack:
+				self.stacks[";".join(reversed(stack))] += 1
+
+	def stop(self) -> Counter:
+		self._done.set()
+		self.join()
+		return self.stacks
+
+
+def _write(app: Flask, name: str, stacks: Counter) -> None:
+	directory = profiles_dir(app)
+	os.makedirs(directory, exist_ok=True)
+	path = os.path.join(directory, name)
+	tmp = f"{path}.tmp"
+	with open(tmp, "w", encoding="utf-8") as f:
+		f.writelines(f"{stack} {count}\n" for stack, count in stacks.most_common())
+	os.replace(tmp, path)
+
+	keep = max(1, int(app.config.get("PROFILE_KEEP", 50)))
+	for stale in sorted(n for n in os.listdir(directory) if _NAME.match(n))[:-keep]:
+		try:
+			os.remove(os.path.join(directory, stale))
+		except OSError:
+			pass
+
+
+def _requested(app: Flask) -> bool:
+	header = request.headers.get("X-Profile")
+	if header is not None:
+		token = app.config.get("PROFILE_TOKEN") or ""
+		if token and hmac.compare_digest(header, token):
+			return True
+		if session.get("admin_logged_in"):
+			return True
+	rate = app.config.get("PROFILE_SAMPLE_RATE", 0.0)
+	return rate > 0 and random.random() < rate
+
+
+def init_app(app: Flask) -> None:
+	"""Register the profiling hooks, only when ``PROFILE_ENABLED`` is set."""
+	if not app.config.get("PROFILE_ENABLED"):
+		return
+	interval = float(app.config.get("PROFILE_INTERVAL", 0.005))
+	min_ms = float(app.config.get("PROFILE_MIN_DURATION_MS", 0))
+
+	@app.before_request
+	def _start_profile():  # type: ignore[no-redef]
+		if request.path.startswith("/admin/profiles") or not _requested(app):
+			return
+		sampler = _Sampler(threading.get_ident(), interval)
+		sampler.start()
+		g._profile = (sampler, perf_counter(), datetime.now(timezone.utc))
+
+	@app.teardown_request
+	def _stop_profile(exc):  # type: ignore[no-redef]
+		state = g.pop("_profile", None)
+		if state is None:
+			return
+		sampler, start, started_at = state
+		stacks = sampler.stop()
+		elapsed_ms = (perf_counter() - start) * 1000
+		if not stacks or elapsed_ms < min_ms:
+			return
+		slug = re.sub(r"[^\w.-]+", "_", request.path.strip("/"))[:80] or "index"
+		name = f"{started_at:%Y%m%dT%H%M%S%f}Z-{request.method}-{slug}-{int(elapsed_ms)}ms.folded"
+		try:
+			_write(app, name, stacks)
+		except OSError as exc:
+			app.logger.warning("Could not write profile %s: %s", name, exc)
+
+
+def list_profiles() -> list[dict]:
+	"""Stored captures, newest first."""
+	directory = profiles_dir()
+	if not os.path.isdir(directory):
+		return []
+	items = []
+	for entry in os.scandir(directory):
+		if entry.is_file() and _NAME.match(entry.name):
+			stamp, method, rest = entry.name.split("-", 2)
+			path, duration = rest[:-len(".folded")].rsplit("-", 1)
+			items.append({
+				"name": entry.name,
+				"captured_at": datetime.strptime(stamp, "%Y%m%dT%H%M%S%fZ").strftime("%Y-%m-%d %H:%M:%S"),
+				"method": method,
+				"path": "/" + path,
+				"duration_ms": int(duration[:-2]),
+				"size": entry.stat().st_size,
+			})
+	items.sort(key=lambda item: item["name"], reverse=True)
+	return items
+
+
+@profiles_bp.get("/profiles")
+@login_required
+def profiles_page():
+	return render_template(
+		"admin/profiles.html",
+		items=list_profiles(),
+		enabled=bool(current_app.config.get("PROFILE_ENABLED")),
+		sample_rate=current_app.config.get("PROFILE_SAMPLE_RATE", 0.0),
+	)
+
+
+@profiles_bp.get("/profiles/<name>")
+@login_required
+def profiles_download(name: str):
+	path = os.path.join(profiles_dir(), name)
+	if not _NAME.match(name) or not os.path.isfile(path):
+		abort(404)
+	return send_file(path, as_attachment=request.args.get("download") == "1", download_name=name, mimetype="text/plain")
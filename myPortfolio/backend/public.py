@@ -1,6 +1,12 @@
+import mimetypes
 import os
-from flask import Blueprint, current_app, send_from_directory, make_response
+from flask import Blueprint, Response, current_app, request, send_from_directory
 from pathlib import Path
+from werkzeug.security import safe_join
+
+from .assets import FRONTEND_DIR, pages_dir
+from .compression import negotiate
+from .media_cache import MediaEntry, media_cache
 
 public_bp = Blueprint("public", __name__)
 
@@ -8,19 +14,63 @@ public_bp = Blueprint("public", __name__)
 @public_bp.route("/")
 @public_bp.route("/index.html")
 def index():
-	frontend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "frontend"))
-	return send_from_directory(frontend_dir, "index.html")
+	return send_from_directory(pages_dir(), "index.html")
+
+
+def _media_response(entry: MediaEntry):
+	"""Answer from a media cache entry: 304, a pre-encoded variant, a byte range or the body."""
+	encoding = None
+	if entry.variants and not request.range:
+		preference = [name.strip() for name in current_app.config.get("COMPRESS_ALGORITHMS", "br,zstd,gzip").split(",")]
+		encoding = negotiate(request.accept_encodings, [name for name in preference if name in entry.variants])
+	body = entry.variants[encoding] if encoding else entry.data
+	resp = Response(body, mimetype=entry.mime)
+	# Each representation gets its own strong ETag
+	resp.set_etag(f"{entry.etag}-{encoding}" if encoding else entry.etag)
+	if entry.variants:
+		resp.vary.add("Accept-Encoding")
+	if encoding:
+		resp.headers["Content-Encoding"] = encoding
+	resp.headers["Cache-Control"] = "no-cache"
+	return resp.make_conditional(request, accept_ranges=encoding is None, complete_length=len(body))
+
+
+def _setting_payload(entry) -> bytes | None:
+	"""Setting bytes too large for the settings cache come from the media cache when hot."""
+	if entry.data is not None:
+		return entry.data
+	key = f"setting:{entry.key}"
+	cached = media_cache.get(key)
+	if cached is None or cached.etag != entry.etag:
+		payload = entry.payload()
+		if payload is None or not media_cache.admits(len(payload), key):
+			return payload
+		cached = media_cache.build(key, payload, entry.mime or "application/octet-stream", etag=entry.etag, admitted=True)
+	return cached.data
+
+
+def _setting_response(key: str, default_mime: str):
+	"""Stream a cached SiteSetting payload with a strong ETag (304 when unchanged)."""
+	from .site_settings import settings_cache
+	entry = settings_cache.get(key)
+	if entry is None or not entry.size:
+		return None
+	if entry.etag in request.if_none_match:
+		resp = Response(status=304)
+	else:
+		resp = Response(_setting_payload(entry), mimetype=entry.mime or default_mime)
+	resp.set_etag(entry.etag)
+	# URLs are not versioned, so let browsers keep the bytes but revalidate each time
+	resp.headers["Cache-Control"] = "no-cache"
+	return resp
 
 
 @public_bp.route("/media/hero.jpg")
 def media_hero():
 	"""Serve hero image from site settings if present, else 404."""
 	try:
-		from .models import SiteSetting
-		setting = SiteSetting.query.filter_by(key="hero_image").first()
-		if setting and setting.image_data:
-			resp = make_response(setting.image_data)
-			resp.headers.set('Content-Type', setting.image_mime or 'image/jpeg')
+		resp = _setting_response("hero_image", "image/jpeg")
+		if resp is not None:
 			return resp
 	except Exception as e:
 		current_app.logger.warning(f"Hero media fetch failed: {e}")
@@ -31,12 +81,11 @@ def media_hero():
 def media_cv():
 	"""Serve CV file stored in site settings (PDF recommended)."""
 	try:
-		from .models import SiteSetting
-		setting = SiteSetting.query.filter_by(key="cv_file").first()
-		if setting and setting.image_data:
-			resp = make_response(setting.image_data)
-			mime = setting.image_mime or 'application/pdf'
-			resp.headers.set('Content-Type', mime)
+		resp = _setting_response("cv_file", "application/pdf")
+		if resp is not None and resp.status_code == 304:
+			return resp
+		if resp is not None:
+			mime = resp.mimetype or 'application/pdf'
 			disposition = 'inline' if mime == 'application/pdf' else 'attachment'
 			resp.headers.set('Content-Disposition', f"{disposition}; filename=\"cv.pdf\"")
 			return resp
@@ -45,22 +94,6 @@ def media_cv():
 	return ("", 404)
 
 
-@public_bp.route("/health")
-def health_check():
-	"""Simple health check endpoint"""
-	uploads_dir = os.path.join(current_app.instance_path, "uploads")
-	uploads_exists = os.path.exists(uploads_dir)
-	uploads_contents = os.listdir(uploads_dir) if uploads_exists else []
-	
-	return {
-		"status": "healthy",
-		"uploads_dir": uploads_dir,
-		"uploads_exists": uploads_exists,
-		"uploads_contents": uploads_contents,
-		"instance_path": current_app.instance_path
-	}
-
-
 @public_bp.route("/uploads/<path:filename>")
 def serve_upload(filename):
 	"""Serve uploaded files from instance/uploads directory"""
@@ -69,16 +102,19 @@ def serve_upload(filename):
 	# Ensure uploads directory exists
 	Path(uploads_dir).mkdir(parents=True, exist_ok=True)
 	
+	# High-volume event: sampled (see LOG_SAMPLE_RATE)
+	current_app.logger.info("Upload request", extra={"upload": filename, "sampled": True})
+
+	# Hot images are answered from memory (see media_cache.py)
+	key = f"upload:{filename}"
+	entry = media_cache.get(key)
+	if entry is not None:
+		return _media_response(entry)
+
 	# Check if file exists
-	file_path = os.path.join(uploads_dir, filename)
-	
-	# Log the request for debugging
-	current_app.logger.info(f"Upload request: {filename}")
-	current_app.logger.info(f"Looking for file at: {file_path}")
-	current_app.logger.info(f"File exists: {os.path.isfile(file_path)}")
-	current_app.logger.info(f"Uploads directory contents: {os.listdir(uploads_dir) if os.path.exists(uploads_dir) else 'Directory not found'}")
-	
-	if not os.path.isfile(file_path):
+	file_path = safe_join(uploads_dir, filename)
+
+	if not file_path or not os.path.isfile(file_path):
 		# Attempt to serve from database-backed storage for BlogImage and Project
 		try:
 			from .extensions import db
@@ -86,26 +122,28 @@ def serve_upload(filename):
 			# Try blog images
 			img = BlogImage.query.filter(BlogImage.image_url == f"/uploads/{filename}").first()
 			if img and img.image_data:
-				resp = make_response(img.image_data)
-				resp.headers.set('Content-Type', img.image_mime or 'application/octet-stream')
-				return resp
+				return _media_response(media_cache.build(key, img.image_data, img.image_mime or 'application/octet-stream'))
 			# Try project image by URL match
 			proj = Project.query.filter(Project.image_url == f"/uploads/{filename}").first()
 			if proj and proj.image_data:
-				resp = make_response(proj.image_data)
-				resp.headers.set('Content-Type', proj.image_mime or 'application/octet-stream')
-				return resp
+				return _media_response(media_cache.build(key, proj.image_data, proj.image_mime or 'application/octet-stream'))
 		except Exception as e:
 			current_app.logger.warning(f"DB media fallback failed: {e}")
 		current_app.logger.warning(f"File not found: {file_path}")
 		return f"File not found: {filename}", 404
-	
+
+	if media_cache.admits(os.path.getsize(file_path), key):
+		with open(file_path, "rb") as f:
+			data = f.read()
+		mime = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+		return _media_response(media_cache.build(key, data, mime, admitted=True))
 	return send_from_directory(uploads_dir, filename)
 
 
 @public_bp.route("/<path:filename>")
 def public_files(filename):
-	frontend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "frontend"))
+	# Built pages reference the fingerprinted bundles; everything else comes from frontend/
+	frontend_dir = pages_dir() if filename.endswith(".html") else FRONTEND_DIR
 	file_path = os.path.join(frontend_dir, filename)
 	if os.path.isfile(file_path):
 		return send_from_directory(frontend_dir, filename)
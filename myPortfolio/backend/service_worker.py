@@ -0,0 +1,125 @@
+"""Service worker for the public pages.
+
+``/sw.js`` serves ``frontend/sw.js`` prefixed with its configuration: the app
+shell to precache (every page that loads ``offline.js``, the local assets and
+CDN files those pages reference) and a version, which is a digest of all of
+them. Any deploy that changes a page or asset changes the version, so
+browsers install a fresh shell and drop the old caches.
+
+Public API JSON is served stale-while-revalidate by the worker. The
+revalidation is a conditional request, so every GET under ``/api`` gets a
+strong ETag here when the view did not set one, and a matching
+``If-None-Match`` gets a bodiless 304.
+"""
+
+import json
+import os
+import re
+from hashlib import blake2b
+
+from flask import Blueprint, Flask, Response, current_app, request
+
+from .assets import FRONTEND_DIR, dist_dir, pages_dir
+
+sw_bp = Blueprint("service_worker", __name__)
+
+_SOURCE = os.path.join(FRONTEND_DIR, "sw.js")
+# Pages opt in by loading the registration script (bundled under the same stem once built)
+_REGISTERS = re.compile(r'<script src="/assets/[\w.-]*offline(?:\.[0-9a-f]{10})?\.js"></script>')
+_LOCAL = re.compile(r'(?:src|href)="(/assets/[\w.-]+)"')
+_CDN = re.compile(r'(?:src|href)="(https://cdn\.jsdelivr\.net/[^"]+)"')
+
+# Served while SW_ENABLED is off: clears what an earlier worker cached and unregisters
+_UNREGISTER = """self.addEventListener('install', () => self.skipWaiting());
+self.addEventListener('activate', event => {
+	event.waitUntil(caches.keys()
+		.then(keys => Promise.all(keys.map(key => caches.delete(key))))
+		.then(() => self.registration.unregister()));
+});
+"""
+
+_shell_cache: dict = {"signature": None, "config": None}
+
+
+def _asset_path(url: str) -> str:
+	name = url[len("/assets/"):]
+	built = dist_dir()
+	if built and os.path.isfile(os.path.join(built, "assets", name)):
+		return os.path.join(built, "assets", name)
+	return os.path.join(FRONTEND_DIR, "assets", name)
+
+
+def _shell() -> dict:
+	"""Precache list and version, recomputed only when a shell file changed on disk."""
+	root = pages_dir()
+	pages = {}
+	for name in sorted(os.listdir(root)):
+		if name.endswith(".html"):
+			with open(os.path.join(root, name), encoding="utf-8") as fh:
+				html = fh.read()
+			if _REGISTERS.search(html):
+				pages[name] = html
+	local = sorted({url for html in pages.values() for url in _LOCAL.findall(html)})
+	cdn = sorted({url for html in pages.values() for url in _CDN.findall(html)})
+
+	files = [_SOURCE, *(os.path.join(root, name) for name in pages), *(_asset_path(url) for url in local)]
+	signature = []
+	for path in files:
+		try:
+			st = os.stat(path)
+			signature.append((path, st.st_mtime_ns, st.st_size))
+		except OSError:
+			signature.append((path, 0, 0))
+	if signature == _shell_cache["signature"]:
+		return _shell_cache["config"]
+
+	digest = blake2b(digest_size=8)
+	for path, _, size in signature:
+		if size:
+			with open(path, "rb") as fh:
+				digest.update(fh.read())
+	digest.update("\n".join(cdn).encode())
+	config = {
+		"version": digest.hexdigest(),
+		"precache": ["/" if name == "index.html" else f"/{name}" for name in pages] + local + cdn,
+		"apiPaths": [p.strip() for p in current_app.config.get("SW_API_PATHS", "").split(",") if p.strip()],
+		"apiFreshSeconds": float(current_app.config.get("SW_API_FRESH_SECONDS", 60)),
+	}
+	_shell_cache.update(signature=signature, config=config)
+	return config
+
+
+@sw_bp.get("/sw.js")
+def service_worker():
+	if current_app.config.get("SW_ENABLED", True):
+		config = _shell()
+		with open(_SOURCE, encoding="utf-8") as fh:
+			body = f"self.SW_CONFIG = {json.dumps(config)};\n{fh.read()}"
+		etag = config["version"]
+	else:
+		body, etag = _UNREGISTER, "unregister"
+	resp = Response(body, mimetype="text/javascript")
+	resp.set_etag(etag)
+	# Browsers also bypass their HTTP cache for update checks; this covers the rest
+	resp.headers["Cache-Control"] = "no-cache"
+	return resp.make_conditional(request)
+
+
+def init_app(app: Flask) -> None:
+	"""Strong ETags and 304s for GET ``/api`` JSON; register after compression so this runs first."""
+
+	@app.after_request
+	def _api_etag(response):  # type: ignore[no-redef]
+		if (
+			request.method not in ("GET", "HEAD")
+			or not request.path.startswith("/api/")
+			or response.status_code != 200
+			or response.mimetype != "application/json"
+			or response.is_streamed
+			or response.direct_passthrough
+		):
+			return response
+		if response.get_etag()[0] is None:
+			response.set_etag(blake2b(response.get_data(), digest_size=16).hexdigest())
+		response.headers.setdefault("Cache-Control", "no-cache")
+		return response.make_conditional(request)
@@ -0,0 +1,134 @@
+import os
+import threading
+from hashlib import blake2b
+
+from flask import current_app
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from .extensions import db
+from .media_cache import media_cache
+from .models import SiteSetting
+
+
+class CachedSetting:
+	"""Metadata (and, when small enough, the payload) of one ``SiteSetting`` row."""
+
+	__slots__ = ("key", "value", "mime", "size", "etag", "data")
+
+	def __init__(self, key, value, mime, size, etag, data):
+		self.key = key
+		self.value = value
+		self.mime = mime
+		self.size = size
+		self.etag = etag
+		self.data = data
+
+	def payload(self) -> bytes | None:
+		"""The stored bytes, read from the database only if too large to cache."""
+		if self.data is not None or not self.size:
+			return self.data
+		return db.session.execute(select(SiteSetting.image_data).where(SiteSetting.key == self.key)).scalar()
+
+
+class SettingsCache:
+	"""Per-process copy of ``site_settings``, reloaded when the version stamp moves.
+
+	The stamp is the inode and mtime of ``instance/settings.version``; any
+	worker that commits a change to a setting replaces that file, so every
+	worker notices on its next read with a single ``stat()`` and no database
+	query. Payloads above
+	``SETTINGS_CACHE_MAX_BYTES`` keep only their ETag in memory.
+	"""
+
+	def __init__(self):
+		self._entries: dict[str, CachedSetting] | None = None
+		self._stamp = None
+		self._lock = threading.Lock()
+
+	@staticmethod
+	def _stamp_path() -> str:
+		return os.path.join(current_app.instance_path, "settings.version")
+
+	def _current_stamp(self):
+		path = self._stamp_path()
+		try:
+			st = os.stat(path)
+		except OSError:
+			return (path, 0, 0)
+		return (path, st.st_ino, st.st_mtime_ns)
+
+	def _load(self) -> dict[str, CachedSetting]:
+		limit = int(current_app.config.get("SETTINGS_CACHE_MAX_BYTES", 4 * 1024 * 1024))
+		entries = {}
+		rows = db.session.execute(select(SiteSetting.key, SiteSetting.value, SiteSetting.image_mime, func.length(SiteSetting.image_data))).all()
+		for key, value, mime, size in rows:
+			data = None
+			etag = None
+			if size:
+				blob = db.session.execute(select(SiteSetting.image_data).where(SiteSetting.key == key)).scalar()
+				etag = blake2b(blob, digest_size=16).hexdigest()
+				data = blob if size <= limit else None
+			entries[key] = CachedSetting(key, value, mime, size or 0, etag, data)
+		return entries
+
+	def entries(self) -> dict[str, CachedSetting]:
+		stamp = self._current_stamp()
+		if self._entries is not None and stamp == self._stamp:
+			return self._entries
+		with self._lock:
+			if self._entries is None or stamp != self._stamp:
+				# Read the stamp before the rows so a concurrent bump forces another reload
+				self._entries = self._load()
+				self._stamp = stamp
+			return self._entries
+
+	def get(self, key: str) -> CachedSetting | None:
+		return self.entries().get(key)
+
+	def value(self, key: str, default=None):
+		entry = self.get(key)
+		return entry.value if entry is not None and entry.value is not None else default
+
+	def invalidate(self) -> None:
+		self._entries = None
+		# Replace rather than touch: a new inode changes the stamp even on coarse-mtime filesystems
+		path = self._stamp_path()
+		tmp = f"{path}.{os.getpid()}.tmp"
+		try:
+			with open(tmp, "w") as fh:
+				fh.write(os.urandom(8).hex())
+			os.replace(tmp, path)
+		except OSError as exc:
+			current_app.logger.warning("Could not bump settings version: %s", exc)
+
+
+settings_cache = SettingsCache()
+_listening = {"installed": False}
+
+
+def _touches_settings(session) -> bool:
+	return any(isinstance(obj, SiteSetting) for obj in (*session.new, *session.dirty, *session.deleted))
+
+
+def init_app(app) -> None:
+	"""Invalidate the cache whenever a commit writes a ``SiteSetting``."""
+	# Session events are process-wide, so install them once however many apps exist
+	if _listening["installed"]:
+		return
+	_listening["installed"] = True
+
+	@event.listens_for(Session, "before_flush")
+	def _mark(session, flush_context, instances):
+		if _touches_settings(session):
+			session.info["site_settings_changed"] = True
+
+	@event.listens_for(Session, "after_commit")
+	def _bump(session):
+		if session.info.pop("site_settings_changed", False):
+			settings_cache.invalidate()
+			media_cache.invalidate()
+
+	@event.listens_for(Session, "after_rollback")
+	def _forget(session):
+		session.info.pop("site_settings_changed", None)
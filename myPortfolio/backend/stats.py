@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from .extensions import db
+
+# table name -> BLOB column whose size counts towards media bytes (or None)
+TRACKED_TABLES = {
+	"projects": "image_data",
+	"skills": None,
+	"contact": None,
+	"contact_messages": None,
+	"blogs": None,
+	"blog_categories": None,
+	"blog_images": "image_data",
+	"site_settings": "image_data",
+}
+
+
+def _media_delta(column: str | None, sign: str, row: str) -> str:
+	if not column:
+		return ""
+	return f", media_bytes = media_bytes {sign} COALESCE(length({row}.{column}), 0)"
+
+
+def _trigger_ddl(table: str, column: str | None) -> list[str]:
+	update_media = ""
+	if column:
+		update_media = f", media_bytes = media_bytes + COALESCE(length(NEW.{column}), 0) - COALESCE(length(OLD.{column}), 0)"
+	ddl = [
+		f"""CREATE TRIGGER IF NOT EXISTS stats_{table}_insert AFTER INSERT ON {table} BEGIN
+			UPDATE entity_stats SET row_count = row_count + 1{_media_delta(column, '+', 'NEW')}, last_activity = CURRENT_TIMESTAMP WHERE name = '{table}';
+		END""",
+		f"""CREATE TRIGGER IF NOT EXISTS stats_{table}_delete AFTER DELETE ON {table} BEGIN
+			UPDATE entity_stats SET row_count = row_count - 1{_media_delta(column, '-', 'OLD')}, last_activity = CURRENT_TIMESTAMP WHERE name = '{table}';
+		END""",
+		f"""CREATE TRIGGER IF NOT EXISTS stats_{table}_update AFTER UPDATE ON {table} BEGIN
+			UPDATE entity_stats SET last_activity = CURRENT_TIMESTAMP{update_media} WHERE name = '{table}';
+		END""",
+	]
+	if table == "contact_messages":
+		ddl.append(
+			"""CREATE TRIGGER IF NOT EXISTS stats_contact_messages_daily AFTER INSERT ON contact_messages BEGIN
+				INSERT INTO contact_message_daily (day, count) VALUES (date(COALESCE(NEW.created_at, CURRENT_TIMESTAMP)), 1)
+				ON CONFLICT(day) DO UPDATE SET count = count + 1;
+			END"""
+		)
+	return ddl
+
+
+def ensure_schema(conn) -> None:
+	"""Create the statistics tables and triggers (SQLite), backfilling once.
+
+	Counts are maintained by triggers rather than ORM session events so that
+	bulk Core inserts (e.g. content import) and raw SQL keep them correct too.
+	"""
+	conn.execute(text(
+		"CREATE TABLE IF NOT EXISTS entity_stats (name VARCHAR(64) PRIMARY KEY, row_count INTEGER NOT NULL DEFAULT 0, "
+		"media_bytes INTEGER NOT NULL DEFAULT 0, last_activity DATETIME)"
+	))
+	conn.execute(text("CREATE TABLE IF NOT EXISTS contact_message_daily (day DATE PRIMARY KEY, count INTEGER NOT NULL DEFAULT 0)"))
+	existing = {row[0] for row in conn.execute(text("SELECT name FROM entity_stats"))}
+	for table, column in TRACKED_TABLES.items():
+		if table not in existing:
+			media = f"COALESCE(SUM(length({column})), 0)" if column else "0"
+			conn.execute(text(
+				f"INSERT OR IGNORE INTO entity_stats (name, row_count, media_bytes, last_activity) "
+				f"SELECT '{table}', COUNT(*), {media}, NULL FROM {table}"
+			))
+			if table == "contact_messages":
+				conn.execute(text(
+					"INSERT OR IGNORE INTO contact_message_daily (day, count) "
+					"SELECT date(created_at), COUNT(*) FROM contact_messages GROUP BY date(created_at)"
+				))
+		for ddl in _trigger_ddl(table, column):
+			conn.execute(text(ddl))
+	conn.commit()
+
+
+def dashboard_stats(days: int = 7) -> dict:
+	"""Read every dashboard figure with a single query."""
+	today = datetime.utcnow().date()
+	since = (today - timedelta(days=days - 1)).isoformat()
+	rows = db.session.execute(text(
+		"SELECT name, row_count, media_bytes, last_activity FROM entity_stats "
+		"UNION ALL SELECT 'day:' || day, count, 0, NULL FROM contact_message_daily WHERE day >= :since"
+	), {"since": since}).all()
+
+	entities, per_day = {}, {}
+	for name, count, media_bytes, last_activity in rows:
+		if name.startswith("day:"):
+			per_day[name[4:]] = count
+		else:
+			entities[name] = {"count": count, "media_bytes": media_bytes, "last_activity": last_activity}
+	if not entities:
+		raise LookupError("entity_stats is empty")
+
+	def count(table: str) -> int:
+		return entities.get(table, {}).get("count", 0)
+
+	activity = [(name, e["last_activity"]) for name, e in entities.items() if e["last_activity"]]
+	window = [(today - timedelta(days=offset)).isoformat() for offset in range(days - 1, -1, -1)]
+	return {
+		"projects": count("projects"),
+		"skills": count("skills"),
+		"contacts": count("contact"),
+		"blogs": count("blogs"),
+		"categories": count("blog_categories"),
+		"blog_images": count("blog_images"),
+		"messages": count("contact_messages"),
+		"media_bytes": sum(e["media_bytes"] for e in entities.values()),
+		"messages_by_day": [(day, per_day.get(day, 0)) for day in window],
+		"latest_activity": sorted(activity, key=lambda item: str(item[1]), reverse=True)[:5],
+	}
@@ -0,0 +1,144 @@
+"""Tech tags: ``Project.tech_stack`` split into an indexed tag table.
+
+``tech_stack`` stays the editable source of truth (a comma-separated string).
+Create and update paths call :func:`set_project_tags`, bulk imports call
+:func:`sync_projects`, and the tag filter and facet counts are single
+indexed queries over ``project_tags``.
+"""
+
+from sqlalchemy import delete, func, insert, or_, select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .extensions import db
+from .models import Project, Tag, project_tags
+
+
+def parse(tech_stack: str | None) -> dict[str, str]:
+	"""``{slug: label}`` for a comma-separated stack, first spelling wins."""
+	tags: dict[str, str] = {}
+	for part in (tech_stack or "").split(","):
+		label = " ".join(part.split())[:100]
+		if label:
+			tags.setdefault(label.lower(), label)
+	return tags
+
+
+def slugs(values: list[str]) -> list[str]:
+	"""Normalize ``?tech=`` values (repeatable, each may also be comma-separated)."""
+	return list(dict.fromkeys(slug for value in values for slug in parse(value)))
+
+
+def _tag_ids(tags: dict[str, str]) -> dict[str, int]:
+	"""Ids for ``tags``, inserting the ones that do not exist yet."""
+	if not tags:
+		return {}
+	existing = dict(db.session.execute(select(Tag.slug, Tag.id).where(Tag.slug.in_(tags))).all())
+	missing = [{"slug": slug, "label": label} for slug, label in tags.items() if slug not in existing]
+	if missing:
+		# Another request may add the same tag concurrently; keep whichever row won
+		db.session.execute(sqlite_insert(Tag).on_conflict_do_nothing(index_elements=["slug"]), missing)
+		existing.update(db.session.execute(select(Tag.slug, Tag.id).where(Tag.slug.in_([m["slug"] for m in missing]))).all())
+	return existing
+
+
+def set_project_tags(project: Project) -> None:
+	"""Point ``project.tags`` at the tags in its ``tech_stack``."""
+	tags = parse(project.tech_stack)
+	ids = _tag_ids(tags)
+	project.tags = [db.session.get(Tag, ids[slug]) for slug in tags]
+
+
+def sync_projects(project_ids: list[int]) -> None:
+	"""Rebuild tag links for projects written with Core statements (imports)."""
+	if not project_ids:
+		return
+	rows = db.session.execute(select(Project.id, Project.tech_stack).where(Project.id.in_(project_ids))).all()
+	parsed = {project_id: parse(stack) for project_id, stack in rows}
+	ids = _tag_ids({slug: label for tags in parsed.values() for slug, label in tags.items()})
+	db.session.execute(delete(project_tags).where(project_tags.c.project_id.in_(project_ids)))
+	links = [{"project_id": project_id, "tag_id": ids[slug]} for project_id, tags in parsed.items() for slug in tags]
+	if links:
+		db.session.execute(insert(project_tags), links)
+
+
+def ensure_schema(conn) -> None:
+	"""Backfill ``project_tags`` once for databases created before tags existed."""
+	if conn.execute(text("SELECT 1 FROM project_tags LIMIT 1")).first():
+		return
+	rows = conn.execute(text("SELECT id, tech_stack FROM projects WHERE tech_stack IS NOT NULL AND tech_stack != ''")).all()
+	if not rows:
+		return
+	labels: dict[str, str] = {}
+	for _, stack in rows:
+		for slug, label in parse(stack).items():
+			labels.setdefault(slug, label)
+	conn.execute(text("INSERT OR IGNORE INTO tags (slug, label) VALUES (:slug, :label)"), [{"slug": s, "label": l} for s, l in labels.items()])
+	ids = dict(conn.execute(text("SELECT slug, id FROM tags")).all())
+	conn.execute(
+		text("INSERT OR IGNORE INTO project_tags (project_id, tag_id) VALUES (:project_id, :tag_id)"),
+		[{"project_id": project_id, "tag_id": ids[slug]} for project_id, stack in rows for slug in parse(stack)],
+	)
+	conn.commit()
+
+
+MATCH_MODES = ("all", "any", "contains")
+
+
+def _matching(tech: list[str], match: str):
+	"""Subquery of project ids carrying the given tag slugs.
+
+	``all`` wants every slug, ``any`` at least one, and ``contains`` a tag
+	whose slug contains one of the terms (``node`` finds "Node.js").
+	"""
+	if match == "contains":
+		condition = or_(*(Tag.slug.contains(term, autoescape=True) for term in tech))
+	else:
+		condition = Tag.slug.in_(tech)
+	stmt = (
+		select(project_tags.c.project_id)
+		.join(Tag, Tag.id == project_tags.c.tag_id)
+		.where(condition)
+		.group_by(project_tags.c.project_id)
+	)
+	if match == "all":
+		stmt = stmt.having(func.count() == len(tech))
+	return stmt
+
+
+def filter_projects(stmt, tech: list[str], match: str = "all"):
+	"""Restrict a select over ``projects`` to the tag filter."""
+	if not tech:
+		return stmt
+	return stmt.where(Project.id.in_(_matching(tech, match)))
+
+
+def facets(tech: list[str] | None = None, match: str = "all", limit: int | None = None) -> dict:
+	"""Tag counts over the projects matching the current filter.
+
+	Selected tags are always listed, even past ``limit`` or at zero, so the
+	client can still show them and let them be deselected.
+	"""
+	count = func.count(project_tags.c.project_id).label("count")
+	stmt = (
+		select(Tag.slug, Tag.label, count)
+		.join(project_tags, project_tags.c.tag_id == Tag.id)
+		.group_by(Tag.id)
+		.order_by(count.desc(), Tag.slug)
+	)
+	total = select(func.count()).select_from(Project)
+	if tech:
+		matching = _matching(tech, match)
+		stmt = stmt.where(project_tags.c.project_id.in_(matching))
+		total = total.where(Project.id.in_(matching))
+	rows = [{"tag": slug, "label": label, "count": n} for slug, label, n in db.session.execute(stmt.limit(limit) if limit else stmt)]
+	if tech and match != "contains":
+		listed = {row["tag"] for row in rows}
+		missing = [slug for slug in tech if slug not in listed]
+		if missing:
+			counts = dict(db.session.execute(stmt.with_only_columns(Tag.slug, count).where(Tag.slug.in_(missing))).all())
+			labels = dict(db.session.execute(select(Tag.slug, Tag.label).where(Tag.slug.in_(missing))).all())
+			rows += [{"tag": slug, "label": labels.get(slug, slug), "count": counts.get(slug, 0)} for slug in missing]
+	return {
+		"total": db.session.execute(total).scalar_one(),
+		"tags": rows,
+	}
@@ -0,0 +1,219 @@
+import os
+import mmap
+import struct
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from hashlib import blake2b
+from time import time
+
+from flask import current_app, jsonify, request
+
+try:  # POSIX only; elsewhere each worker keeps its own table
+	import fcntl
+except ImportError:  # pragma: no cover - Windows
+	fcntl = None
+
+
+def _key(*parts: str) -> int:
+	digest = blake2b("\x1f".join(parts).encode("utf-8"), digest_size=8).digest()
+	return int.from_bytes(digest, "little") or 1
+
+
+class SharedTable:
+	"""Fixed-size hash table of ``(key, a, b)`` slots in a shared mmap file.
+
+	All gunicorn workers map the same file, so token buckets and duplicate
+	fingerprints are shared without a database round-trip. Each slot update
+	is a lookup plus an ``flock``, i.e. microseconds. Colliding keys simply
+	evict each other, which only ever makes limits more lenient.
+	"""
+
+	_SLOT = struct.Struct("<Qdd")
+
+	def __init__(self, path: str, slots: int = 4096):
+		self.path = path
+		self.slots = slots
+		self._pid = None
+		self._map = None
+		self._fd = None
+		self._local: dict[int, tuple[float, float]] = {}
+		self._thread_lock = threading.Lock()
+
+	def _ensure_open(self) -> None:
+		if self._pid == os.getpid():
+			return
+		self._pid = os.getpid()
+		self._map = None
+		if fcntl is None:
+			return
+		try:
+			os.makedirs(os.path.dirname(self.path), exist_ok=True)
+			size = self.slots * self._SLOT.size
+			fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+			if os.fstat(fd).st_size < size:
+				os.ftruncate(fd, size)
+			self._fd = fd
+			self._map = mmap.mmap(fd, size)
+		except OSError:
+			self._map = None
+
+	@contextmanager
+	def _locked(self):
+		with self._thread_lock:
+			self._ensure_open()
+			if self._map is None:
+				yield
+				return
+			fcntl.flock(self._fd, fcntl.LOCK_EX)
+			try:
+				yield
+			finally:
+				fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+	def update(self, key: int, fn):
+		"""Apply ``fn(a, b) -> (a, b, result)`` to the slot for ``key`` atomically."""
+		with self._locked():
+			if self._map is None:
+				a, b = self._local.get(key, (None, None))
+				a, b, result = fn(a, b)
+				self._local[key] = (a, b)
+				return result
+			offset = (key % self.slots) * self._SLOT.size
+			stored, a, b = self._SLOT.unpack_from(self._map, offset)
+			if stored != key:
+				a = b = None
+			a, b, result = fn(a, b)
+			self._SLOT.pack_into(self._map, offset, key, a, b)
+			return result
+
+
+_tables: dict[str, SharedTable] = {}
+
+
+def _table(name: str) -> SharedTable:
+	table = _tables.get(name)
+	if table is None:
+		directory = current_app.config.get("THROTTLE_DIR") or current_app.instance_path
+		slots = int(current_app.config.get("THROTTLE_SLOTS", 4096))
+		table = _tables[name] = SharedTable(os.path.join(directory, f"throttle-{name}.bin"), slots)
+	return table
+
+
+def take_token(bucket: str, identity: str, capacity: float, refill_seconds: float) -> float:
+	"""Token bucket: return 0 when allowed, else seconds until a token frees up."""
+	now = time()
+	rate = 1.0 / refill_seconds
+
+	def step(tokens, stamp):
+		if tokens is None:
+			tokens, stamp = capacity, now
+		tokens = min(capacity, tokens + (now - stamp) * rate)
+		if tokens >= 1.0:
+			return tokens - 1.0, now, 0.0
+		return tokens, now, (1.0 - tokens) / rate
+
+	return _table(bucket).update(_key(bucket, identity), step)
+
+
+def seen_recently(namespace: str, fingerprint: str, window_seconds: float) -> bool:
+	"""Record ``fingerprint`` and report whether it was seen within the window."""
+	now = time()
+
+	def step(last_seen, _unused):
+		duplicate = last_seen is not None and now - last_seen < window_seconds
+		return now, 0.0, duplicate
+
+	return _table(namespace).update(_key(namespace, fingerprint), step)
+
+
+def forget_seen(namespace: str, fingerprint: str) -> None:
+	"""Undo :func:`seen_recently` so the same fingerprint is accepted again."""
+	def step(_last_seen, _unused):
+		return 0.0, 0.0, None
+
+	_table(namespace).update(_key(namespace, fingerprint), step)
+
+
+def client_ip() -> str:
+	# ProxyFix (TRUSTED_PROXY_HOPS) has already replaced this with the client behind trusted proxies
+	return request.remote_addr or "unknown"
+
+
+# ---------- Contact form admission ----------
+
+_CONTACT_FIELDS = {"firstName": 100, "lastName": 100, "phoneNumber": 100, "message": 5000}
+
+
+def _reject(message: str, status: int, **headers):
+	resp = jsonify({"error": message})
+	resp.status_code = status
+	for name, value in headers.items():
+		resp.headers[name.replace("_", "-")] = value
+	return resp
+
+
+def _accepted_silently():
+	# Look like a success so bots don't learn they were filtered
+	return jsonify({"message": "Message sent successfully!", "telegram_sent": False}), 200
+
+
+def contact_admission(view_func):
+	"""Cheap checks in front of the contact form, cheapest first.
+
+	Size limit (from headers, before reading the body), per-IP token bucket,
+	JSON shape and field lengths, honeypot field, then a duplicate-message
+	fingerprint over a sliding window. Only requests that pass reach the
+	view's Telegram call and database write. The fingerprint is claimed
+	before the view runs, so concurrent resubmits still count as duplicates,
+	and released again unless the view answers 2xx, so a resubmit after a
+	failed save goes through.
+	"""
+	@wraps(view_func)
+	def wrapped(*args, **kwargs):
+		config = current_app.config
+		length = request.content_length
+		if length is None:
+			return _reject("Content-Length required", 411)
+		if length > int(config.get("CONTACT_MAX_BYTES", 8 * 1024)):
+			return _reject("Payload too large", 413)
+
+		ip = client_ip()
+		retry_after = take_token(
+			"contact",
+			ip,
+			float(config.get("CONTACT_RATE_BURST", 5)),
+			float(config.get("CONTACT_RATE_REFILL_SECONDS", 60)),
+		)
+		if retry_after:
+			return _reject("Too many messages. Please try again later.", 429, Retry_After=str(int(retry_after) + 1))
+
+		data = request.get_json(force=True, silent=True)
+		if not isinstance(data, dict):
+			return _reject("Invalid JSON body", 400)
+		for field, limit in _CONTACT_FIELDS.items():
+			value = data.get(field, "")
+			if not isinstance(value, str) or not value.strip():
+				return _reject(f"{field} is required", 400)
+			if len(value) > limit:
+				return _reject(f"{field} is too long", 400)
+
+		honeypot = config.get("CONTACT_HONEYPOT_FIELD", "website")
+		if honeypot and data.get(honeypot):
+			current_app.logger.info("Contact honeypot triggered", extra={"ip": ip, "sampled": True})
+			return _accepted_silently()
+
+		normalized = " ".join(data["message"].lower().split())
+		fingerprint = blake2b(f"{data['phoneNumber'].strip()}\x1f{normalized}".encode("utf-8"), digest_size=16).hexdigest()
+		if seen_recently("contact-dup", fingerprint, float(config.get("CONTACT_DUPLICATE_WINDOW", 600))):
+			return _accepted_silently()
+
+		try:
+			resp = current_app.make_response(view_func(*args, **kwargs))
+		except Exception:
+			forget_seen("contact-dup", fingerprint)
+			raise
+		if not 200 <= resp.status_code < 300:
+			forget_seen("contact-dup", fingerprint)
+		return resp
+	return wrapped
@@ -0,0 +1,400 @@
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+from datetime import datetime
+from time import perf_counter, time
+
+import click
+from flask import Blueprint, Response, current_app, flash, redirect, render_template, request, stream_with_context, url_for
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from .auth import login_required
+from . import tags
+from .extensions import db
+from .media_gc import upload_path
+from .uploads import write_blob
+from .models import Blog, BlogCategory, BlogImage, Project, Skill
+
+transfer_bp = Blueprint("transfer", __name__, cli_group="content")
+
+_CHUNK_SIZE = 64 * 1024
+_CONTENT_NAME = "content.ndjson"
+
+
+# ---------- Export ----------
+
+def _json_default(value):
+	if isinstance(value, datetime):
+		return value.isoformat()
+	raise TypeError(f"Unserializable value: {value!r}")
+
+
+def _dump(record: dict) -> bytes:
+	return (json.dumps(record, default=_json_default, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def iter_records():
+	"""Yield every exportable row as a dict, streaming from the database.
+
+	Rows are ordered so that references always point backwards: categories
+	before blogs, blogs before their images. BLOB columns are never loaded
+	here; ``media_size`` tells the tar writer how many bytes follow.
+	"""
+	stream = {"yield_per": 1000}
+	for row in db.session.execute(select(BlogCategory.id, BlogCategory.name).order_by(BlogCategory.id).execution_options(**stream)):
+		yield {"type": "category", "id": row.id, "name": row.name}
+
+	for row in db.session.execute(select(Skill.id, Skill.name, Skill.level).order_by(Skill.id).execution_options(**stream)):
+		yield {"type": "skill", "id": row.id, "name": row.name, "level": row.level}
+
+	project_cols = select(
+		Project.id, Project.title, Project.description, Project.tech_stack, Project.github_link,
+		Project.demo_link, Project.image_url, Project.image_mime, Project.created_at,
+		func.length(Project.image_data).label("media_size"),
+	).order_by(Project.id)
+	for row in db.session.execute(project_cols.execution_options(**stream)):
+		yield {"type": "project", **row._asdict()}
+
+	blog_cols = select(
+		Blog.id, Blog.title, Blog.content, Blog.created_at, BlogCategory.name.label("category"),
+	).outerjoin(BlogCategory, Blog.category_id == BlogCategory.id).order_by(Blog.id)
+	for row in db.session.execute(blog_cols.execution_options(**stream)):
+		yield {"type": "blog", **row._asdict()}
+
+	image_cols = select(
+		BlogImage.id, BlogImage.blog_id, BlogImage.image_url, BlogImage.image_mime, BlogImage.alt_text,
+		BlogImage.created_at, func.length(BlogImage.image_data).label("media_size"),
+	).order_by(BlogImage.id)
+	for row in db.session.execute(image_cols.execution_options(**stream)):
+		yield {"type": "blog_image", **row._asdict()}
+
+
+def iter_ndjson():
+	for record in iter_records():
+		yield _dump(record)
+
+
+def _iter_blob(table: str, column: str, row_id: int):
+	"""Yield a BLOB in chunks without materializing it (SQLite incremental I/O)."""
+	raw = db.session.connection().connection.driver_connection
+	blobopen = getattr(raw, "blobopen", None)
+	if blobopen is not None:
+		with blobopen(table, column, row_id, readonly=True) as blob:
+			while chunk := blob.read(_CHUNK_SIZE):
+				yield chunk
+		return
+	value = db.session.execute(db.text(f"SELECT {column} FROM {table} WHERE id = :id"), {"id": row_id}).scalar()
+	if value:
+		yield bytes(value)
+
+
+def _iter_file(path: str, size: int):
+	"""Yield exactly ``size`` bytes of ``path`` (zero-padded if it shrank meanwhile)."""
+	remaining = size
+	with open(path, "rb") as fh:
+		while remaining and (chunk := fh.read(min(_CHUNK_SIZE, remaining))):
+			remaining -= len(chunk)
+			yield chunk
+	if remaining:
+		yield b"\0" * remaining
+
+
+def _tar_member(name: str, size: int, chunks, mtime: float):
+	info = tarfile.TarInfo(name)
+	info.size = size
+	info.mtime = int(mtime)
+	yield info.tobuf(format=tarfile.PAX_FORMAT)
+	yield from chunks
+	if size % tarfile.BLOCKSIZE:
+		yield b"\0" * (tarfile.BLOCKSIZE - size % tarfile.BLOCKSIZE)
+
+
+def iter_tar():
+	"""Stream a tar archive: ``content.ndjson``, one member per BLOB, then upload files.
+
+	The NDJSON part is spooled to a temporary file because tar headers need
+	the size up front; media is copied straight from SQLite in chunks. Images
+	that only exist as files under ``instance/uploads`` follow as
+	``uploads/<name>`` members, streamed from disk.
+	"""
+	now = time()
+	media: list[tuple[str, str, int, int]] = []
+	files: dict[str, str] = {}
+	with tempfile.TemporaryFile() as spool:
+		for record in iter_records():
+			if record.get("media_size"):
+				table = "projects" if record["type"] == "project" else "blog_images"
+				media.append((f"media/{record['type']}/{record['id']}", table, record["id"], record["media_size"]))
+			elif (path := upload_path(record.get("image_url"))) and os.path.isfile(path):
+				files.setdefault(record["image_url"][1:], path)
+			spool.write(_dump(record))
+		size = spool.tell()
+		spool.seek(0)
+		yield from _tar_member(_CONTENT_NAME, size, iter(lambda: spool.read(_CHUNK_SIZE), b""), now)
+
+	for name, table, row_id, size in media:
+		yield from _tar_member(name, size, _iter_blob(table, "image_data", row_id), now)
+	for name, path in files.items():
+		try:
+			stat = os.stat(path)
+		except OSError:
+			continue  # deleted since the records were read
+		yield from _tar_member(name, stat.st_size, _iter_file(path, stat.st_size), stat.st_mtime)
+	yield b"\0" * (tarfile.BLOCKSIZE * 2)
+
+
+# ---------- Import ----------
+
+class ContentImporter:
+	"""Batch NDJSON records (and optional media) into the database.
+
+	Each record type is buffered and flushed with a single executemany
+	``INSERT ... RETURNING id`` per batch; old ids are mapped to new ones so
+	blog images and media land on the right rows. Categories are matched by
+	name and created when missing. BLOBs are streamed into place with SQLite
+	incremental I/O, and upload files referenced by an imported record are
+	written to ``instance/uploads``. Nothing is committed until ``finish()``.
+
+	Imports only append: apart from categories, nothing is matched against
+	existing rows, so importing the same export twice duplicates its records.
+	"""
+
+	_MODELS = {"skill": Skill, "project": Project, "blog": Blog, "blog_image": BlogImage}
+	_COLUMNS = {
+		"skill": ("name", "level"),
+		"project": ("title", "description", "tech_stack", "github_link", "demo_link", "image_url", "image_mime", "created_at"),
+		"blog": ("title", "category_id", "content", "created_at"),
+		"blog_image": ("blog_id", "image_url", "image_mime", "alt_text", "created_at"),
+	}
+
+	def __init__(self, batch_size: int = 1000):
+		self.batch_size = batch_size
+		self.ids: dict[str, dict[int, int]] = {kind: {} for kind in ("category", *self._MODELS)}
+		self.counts: dict[str, int] = {}
+		self.media_bytes = 0
+		self._pending: list[dict] = []
+		self._pending_type: str | None = None
+		self._upload_urls: set[str] = set()
+		self._written: list[str] = []
+		self._started = perf_counter()
+		self._categories = {name: cid for cid, name in db.session.execute(select(BlogCategory.id, BlogCategory.name))}
+
+	# -- records --
+
+	def add(self, record: dict) -> None:
+		kind = record.get("type")
+		if kind == "category":
+			self._category_id(record.get("name"), record.get("id"))
+			return
+		if kind not in self._MODELS:
+			return
+		if record.get("image_url"):
+			self._upload_urls.add(record["image_url"])
+		if kind != self._pending_type:
+			self._flush()
+			self._pending_type = kind
+		self._pending.append(record)
+		if len(self._pending) >= self.batch_size:
+			self._flush()
+
+	def add_lines(self, lines) -> None:
+		for line in lines:
+			if line.strip():
+				self.add(json.loads(line))
+
+	def _category_id(self, name: str | None, old_id: int | None = None) -> int | None:
+		if not name:
+			return None
+		cid = self._categories.get(name)
+		if cid is None:
+			cid = db.session.execute(insert(BlogCategory).returning(BlogCategory.id), {"name": name}).scalar_one()
+			self._categories[name] = cid
+			self.counts["category"] = self.counts.get("category", 0) + 1
+		if old_id is not None:
+			self.ids["category"][old_id] = cid
+		return cid
+
+	def _row(self, kind: str, record: dict) -> dict | None:
+		row = {col: record.get(col) for col in self._COLUMNS[kind]}
+		if row.get("created_at"):
+			row["created_at"] = datetime.fromisoformat(row["created_at"])
+		else:
+			row["created_at"] = datetime.utcnow()
+		if kind == "blog":
+			row["category_id"] = self._category_id(record.get("category"))
+		elif kind == "blog_image":
+			row["blog_id"] = self.ids["blog"].get(record.get("blog_id"))
+			if row["blog_id"] is None:
+				return None
+		return row
+
+	def _flush(self) -> None:
+		kind, records = self._pending_type, self._pending
+		self._pending = []
+		if not kind or not records:
+			return
+		model = self._MODELS[kind]
+		pairs = [(record.get("id"), row) for record in records if (row := self._row(kind, record)) is not None]
+		if not pairs:
+			return
+		stmt = insert(model).returning(model.id, sort_by_parameter_order=True)
+		new_ids = db.session.execute(stmt, [row for _, row in pairs]).scalars().all()
+		for (old_id, _), new_id in zip(pairs, new_ids):
+			if old_id is not None:
+				self.ids[kind][old_id] = new_id
+		self.counts[kind] = self.counts.get(kind, 0) + len(new_ids)
+		if kind == "project":
+			tags.sync_projects(new_ids)
+
+	# -- media --
+
+	def add_media(self, name: str, fileobj, size: int) -> None:
+		"""Stream a ``media/<type>/<old id>`` member into its row's BLOB."""
+		parts = name.split("/")
+		if len(parts) != 3 or parts[0] != "media" or parts[1] not in ("project", "blog_image") or not parts[2].isdigit():
+			return
+		self._flush()
+		new_id = self.ids[parts[1]].get(int(parts[2]))
+		if new_id is None:
+			return
+		write_blob(self._MODELS[parts[1]].__table__.name, "image_data", new_id, fileobj, size)
+		self.media_bytes += size
+
+	def add_upload(self, name: str, fileobj) -> None:
+		"""Write an ``uploads/<name>`` member that an imported record refers to."""
+		url = f"/{name}"
+		path = upload_path(url)
+		# Existing files are kept: a re-import into the same site must not clobber them
+		if url not in self._upload_urls or path is None or os.path.exists(path):
+			return
+		os.makedirs(os.path.dirname(path), exist_ok=True)
+		tmp = f"{path}.{os.getpid()}.tmp"
+		with open(tmp, "wb") as fh:
+			shutil.copyfileobj(fileobj, fh, _CHUNK_SIZE)
+		os.replace(tmp, path)
+		self._written.append(path)
+		self.media_bytes += os.path.getsize(path)
+
+	def abort(self) -> None:
+		"""Roll back, and remove the upload files this import wrote."""
+		db.session.rollback()
+		for path in self._written:
+			try:
+				os.remove(path)
+			except OSError:
+				pass
+
+	def finish(self) -> dict:
+		self._flush()
+		db.session.commit()
+		seconds = perf_counter() - self._started
+		total = sum(self.counts.values())
+		return {
+			"counts": dict(self.counts),
+			"rows": total,
+			"media_bytes": self.media_bytes,
+			"seconds": round(seconds, 3),
+			"rows_per_second": round(total / seconds, 1) if seconds > 0 else 0.0,
+		}
+
+
+def import_stream(fileobj, filename: str = "", batch_size: int = 1000) -> dict:
+	"""Import an NDJSON file or a tar archive produced by ``iter_tar``."""
+	importer = ContentImporter(batch_size=batch_size)
+	try:
+		if filename.endswith((".ndjson", ".jsonl")):
+			importer.add_lines(fileobj)
+		else:
+			with tarfile.open(fileobj=fileobj, mode="r|*") as archive:
+				for member in archive:
+					if not member.isfile():
+						continue
+					extracted = archive.extractfile(member)
+					if member.name == _CONTENT_NAME:
+						importer.add_lines(extracted)
+					elif member.name.startswith("uploads/"):
+						importer.add_upload(member.name, extracted)
+					else:
+						importer.add_media(member.name, extracted, member.size)
+		return importer.finish()
+	except Exception:
+		importer.abort()
+		raise
+
+
+# ---------- Admin routes ----------
+
+@transfer_bp.get("/transfer")
+@login_required
+def transfer_page():
+	return render_template("admin/transfer.html")
+
+
+@transfer_bp.get("/export.tar")
+@login_required
+def export_tar():
+	stamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+	return Response(
+		stream_with_context(iter_tar()),
+		mimetype="application/x-tar",
+		headers={"Content-Disposition": f'attachment; filename="portfolio-{stamp}.tar"'},
+	)
+
+
+@transfer_bp.get("/export.ndjson")
+@login_required
+def export_ndjson():
+	stamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+	return Response(
+		stream_with_context(iter_ndjson()),
+		mimetype="application/x-ndjson",
+		headers={"Content-Disposition": f'attachment; filename="portfolio-{stamp}.ndjson"'},
+	)
+
+
+@transfer_bp.post("/import")
+@login_required
+def import_content():
+	file = request.files.get("archive")
+	if not file or not file.filename:
+		flash("Choose an export file to import", "danger")
+		return redirect(url_for("transfer.transfer_page"))
+	try:
+		report = import_stream(file.stream, file.filename)
+	except (ValueError, KeyError, TypeError, tarfile.TarError, SQLAlchemyError) as exc:
+		# import_stream has already rolled back and removed the files it wrote
+		current_app.logger.warning("Content import failed: %s", exc)
+		# A database error's own text includes the whole statement; the driver's message is enough
+		flash(f"Import failed: {getattr(exc, 'orig', None) or exc}", "danger")
+		return redirect(url_for("transfer.transfer_page"))
+	flash(f"Imported {report['rows']} rows and {report['media_bytes']} media bytes in {report['seconds']}s ({report['rows_per_second']} rows/s)", "success")
+	return redirect(url_for("transfer.transfer_page"))
+
+
+# ---------- CLI: flask content export/import ----------
+
+@transfer_bp.cli.command("export")
+@click.argument("path", type=click.Path(dir_okay=False, writable=True))
+def export_command(path: str):
+	"""Write all content to PATH (.tar with media, .ndjson without)."""
+	chunks = iter_ndjson() if path.endswith((".ndjson", ".jsonl")) else iter_tar()
+	written = 0
+	started = perf_counter()
+	with open(path, "wb") as fh:
+		for chunk in chunks:
+			fh.write(chunk)
+			written += len(chunk)
+	click.echo(f"Wrote {written} bytes to {path} in {perf_counter() - started:.2f}s")
+
+
+@transfer_bp.cli.command("import")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--batch-size", default=1000, show_default=True, help="rows per executemany batch")
+def import_command(path: str, batch_size: int):
+	"""Import content from an export file."""
+	with open(path, "rb") as fh:
+		report = import_stream(fh, path, batch_size=batch_size)
+	click.echo(json.dumps(report, indent=2))
@@ -0,0 +1,298 @@
+"""Resumable chunked uploads (a small subset of the tus protocol).
+
+A client announces a file with ``POST /api/uploads`` (name and total size),
+then sends it in ``PATCH`` requests of at most ``UPLOAD_CHUNK_SIZE`` bytes,
+each carrying the ``Upload-Offset`` it starts at and optionally an
+``Upload-Checksum: sha256 <base64>`` of its bytes. Chunks are streamed from
+the request body straight into a staging file under ``uploads/.partial``
+(never buffered whole); a chunk whose checksum does not match is cut off
+again, so the stored offset only ever covers verified bytes. After a dropped
+connection ``HEAD`` returns the offset to resume from.
+
+A finished upload is claimed by the admin form it was made for: image
+uploads are renamed into ``instance/uploads`` with ``os.replace`` and files
+destined for a BLOB column are copied in with SQLite incremental blob I/O,
+so neither path holds the file in memory.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import re
+from time import time
+from uuid import uuid4
+
+from flask import Blueprint, current_app, jsonify, request, session, url_for
+from sqlalchemy import text
+from werkzeug.utils import secure_filename
+
+from .extensions import db
+
+try:  # POSIX only; elsewhere two chunks for one upload are not kept apart
+	import fcntl
+except ImportError:  # pragma: no cover - Windows
+	fcntl = None
+
+uploads_bp = Blueprint("uploads", __name__)
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
+DOCUMENT_EXTENSIONS = {".pdf"}
+
+_ID = re.compile(r"^[0-9a-f]{32}$")
+_BLOCK_SIZE = 256 * 1024
+
+
+class UploadError(Exception):
+	pass
+
+
+# ---------- Staging ----------
+
+def _staging_dir() -> str:
+	# Inside uploads/ so finishing is a same-filesystem rename; media GC skips dot directories
+	path = os.path.join(current_app.instance_path, "uploads", ".partial")
+	os.makedirs(path, exist_ok=True)
+	return path
+
+
+def _paths(upload_id: str) -> tuple[str, str]:
+	if not _ID.match(upload_id or ""):
+		raise UploadError("unknown upload")
+	base = os.path.join(_staging_dir(), upload_id)
+	return f"{base}.part", f"{base}.json"
+
+
+def _load(upload_id: str) -> dict:
+	part, meta = _paths(upload_id)
+	try:
+		with open(meta, encoding="utf-8") as f:
+			info = json.load(f)
+	except (OSError, ValueError):
+		raise UploadError("unknown upload")
+	info["path"] = part
+	return info
+
+
+def _save(info: dict) -> None:
+	_, meta = _paths(info["id"])
+	tmp = f"{meta}.tmp"
+	with open(tmp, "w", encoding="utf-8") as f:
+		json.dump({k: v for k, v in info.items() if k != "path"}, f)
+	os.replace(tmp, meta)
+
+
+def discard(upload_id: str) -> None:
+	"""Remove a staged upload (finished or not)."""
+	for path in _paths(upload_id):
+		try:
+			os.remove(path)
+		except FileNotFoundError:
+			pass
+
+
+def _expire_stale() -> None:
+	"""Drop uploads nobody touched for ``UPLOAD_EXPIRY`` seconds."""
+	cutoff = time() - float(current_app.config.get("UPLOAD_EXPIRY", 86400))
+	for entry in os.scandir(_staging_dir()):
+		name, _, ext = entry.name.partition(".")
+		if ext == "json" and _ID.match(name) and entry.stat().st_mtime < cutoff:
+			discard(name)
+
+
+# ---------- Claiming finished uploads ----------
+
+def claim(upload_id: str, allowed: set[str]) -> dict:
+	"""A finished upload with an extension in ``allowed``, for a form to consume."""
+	info = _load(upload_id)
+	if not info.get("complete"):
+		raise UploadError(f"{info['filename']} was not uploaded completely")
+	if info["ext"] not in allowed:
+		raise UploadError(f"{info['filename']}: file type not allowed")
+	return info
+
+
+def publish(info: dict) -> str:
+	"""Move a claimed upload into the public uploads directory; returns its URL."""
+	saved_name = f"{uuid4().hex}{info['ext']}"
+	target = os.path.join(current_app.instance_path, "uploads", saved_name)
+	os.replace(info["path"], target)
+	info["path"] = target
+	discard(info["id"])
+	return f"/uploads/{saved_name}"
+
+
+def write_blob(table: str, column: str, row_id: int, fileobj, size: int) -> None:
+	"""Copy ``size`` bytes from ``fileobj`` into a BLOB cell in the current transaction, in blocks."""
+	conn = db.session.connection()
+	raw = conn.connection.driver_connection
+	if not hasattr(raw, "blobopen"):  # Python < 3.11 or another driver: one read
+		conn.execute(text(f"UPDATE {table} SET {column} = :data WHERE id = :id"), {"data": fileobj.read(size), "id": row_id})
+		return
+	conn.execute(text(f"UPDATE {table} SET {column} = zeroblob(:size) WHERE id = :id"), {"size": size, "id": row_id})
+	if size:
+		with raw.blobopen(table, column, row_id) as blob:
+			remaining = size
+			while remaining and (block := fileobj.read(min(_BLOCK_SIZE, remaining))):
+				blob.write(block)
+				remaining -= len(block)
+
+
+def store_blob(obj, column: str, path: str) -> None:
+	"""Fill ``obj.<column>`` (a BLOB) from ``path`` in the current transaction, in blocks."""
+	db.session.flush()
+	with open(path, "rb") as f:
+		write_blob(obj.__table__.name, column, obj.id, f, os.path.getsize(path))
+	# The identity map still holds whatever was there before
+	db.session.expire(obj, [column])
+
+
+# ---------- Protocol ----------
+
+def _status(info: dict):
+	resp = jsonify({
+		"id": info["id"],
+		"filename": info["filename"],
+		"size": info["size"],
+		"offset": info["offset"],
+		"complete": info["complete"],
+	})
+	resp.headers["Upload-Offset"] = str(info["offset"])
+	resp.headers["Upload-Length"] = str(info["size"])
+	resp.headers["Upload-Chunk-Size"] = str(current_app.config.get("UPLOAD_CHUNK_SIZE", 4 * 1024 * 1024))
+	resp.headers["Cache-Control"] = "no-store"
+	return resp
+
+
+def _error(message: str, status: int, info: dict | None = None):
+	resp = jsonify({"error": message, **({"offset": info["offset"]} if info else {})})
+	if info:
+		resp.headers["Upload-Offset"] = str(info["offset"])
+	return resp, status
+
+
+@uploads_bp.before_request
+def _require_admin():
+	if not session.get("admin_logged_in"):
+		return jsonify({"error": "Unauthorized"}), 401
+
+
+@uploads_bp.post("/uploads")
+def create_upload():
+	data = request.get_json(silent=True) or {}
+	filename = secure_filename(str(data.get("filename") or ""))
+	ext = os.path.splitext(filename)[1].lower()
+	try:
+		size = int(data.get("size"))
+	except (TypeError, ValueError):
+		return _error("size is required", 400)
+	if not filename or ext not in IMAGE_EXTENSIONS | DOCUMENT_EXTENSIONS:
+		return _error("file type not allowed", 400)
+	if not 0 < size <= current_app.config.get("UPLOAD_MAX_SIZE", 64 * 1024 * 1024):
+		return _error("file is empty or too large", 413)
+
+	_expire_stale()
+	info = {
+		"id": uuid4().hex,
+		"filename": filename,
+		"ext": ext,
+		"mime": str(data.get("mime") or "application/octet-stream")[:100],
+		"size": size,
+		"offset": 0,
+		"complete": False,
+		"created": time(),
+	}
+	part, _ = _paths(info["id"])
+	open(part, "wb").close()
+	_save(info)
+	info["path"] = part
+	resp = _status(info)
+	resp.status_code = 201
+	resp.headers["Location"] = url_for("uploads.upload_status", upload_id=info["id"])
+	return resp
+
+
+@uploads_bp.route("/uploads/<upload_id>", methods=["GET", "HEAD"])
+def upload_status(upload_id: str):
+	try:
+		return _status(_load(upload_id))
+	except UploadError as exc:
+		return _error(str(exc), 404)
+
+
+@uploads_bp.delete("/uploads/<upload_id>")
+def upload_delete(upload_id: str):
+	try:
+		discard(upload_id)
+	except UploadError as exc:
+		return _error(str(exc), 404)
+	return ("", 204)
+
+
+def _expected_digest() -> bytes | None:
+	header = request.headers.get("Upload-Checksum")
+	if not header:
+		return None
+	algorithm, _, value = header.partition(" ")
+	if algorithm.lower() != "sha256":
+		raise UploadError("only sha256 checksums are supported")
+	try:
+		return base64.b64decode(value, validate=True)
+	except ValueError:
+		raise UploadError("malformed Upload-Checksum")
+
+
+@uploads_bp.patch("/uploads/<upload_id>")
+def upload_chunk(upload_id: str):
+	try:
+		part, _ = _paths(upload_id)
+		expected = _expected_digest()
+	except UploadError as exc:
+		return _error(str(exc), 400)
+	length = request.content_length
+	if length is None:
+		return _error("Content-Length is required", 411)
+	if length > current_app.config.get("UPLOAD_CHUNK_SIZE", 4 * 1024 * 1024):
+		return _error("chunk too large", 413)
+
+	try:
+		f = open(part, "r+b")
+	except FileNotFoundError:
+		return _error("unknown upload", 404)
+	with f:
+		if fcntl is not None:
+			try:
+				fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+			except BlockingIOError:
+				return _error("another chunk of this upload is being written", 409)
+		try:
+			info = _load(upload_id)
+		except UploadError as exc:
+			return _error(str(exc), 404)
+		if request.headers.get("Upload-Offset", type=int) != info["offset"]:
+			return _error("offset mismatch", 409, info)
+		if info["offset"] + length > info["size"]:
+			return _error("chunk runs past the announced size", 400, info)
+
+		digest = hashlib.sha256()
+		f.seek(info["offset"])
+		f.truncate()
+		remaining = length
+		while remaining:
+			block = request.stream.read(min(_BLOCK_SIZE, remaining))
+			if not block:
+				break
+			f.write(block)
+			digest.update(block)
+			remaining -= len(block)
+		if remaining or (expected is not None and digest.digest() != expected):
+			f.truncate(info["offset"])
+			if remaining:
+				return _error("chunk ended early", 400, info)
+			return _error("checksum mismatch", 460, info)
+		f.flush()
+
+		info["offset"] += length
+		info["complete"] = info["offset"] == info["size"]
+		_save(info)
+	return _status(info)
@@ -0,0 +1 @@
+"""Benchmark suite: seeded data generator, fake GitHub server and route harness."""
@@ -0,0 +1,56 @@
+"""Diff two benchmark result files and flag latency regressions.
+
+    python -m bench.compare bench/results/client-abc123.json bench/results/client-def456.json
+
+Exits non-zero when any route's p95 regresses by more than ``--threshold`` percent.
+"""
+
+import argparse
+import json
+import sys
+
+
+def _delta(old: float, new: float) -> float:
+	if not old:
+		return 0.0
+	return (new - old) / old * 100.0
+
+
+def main(argv: list[str] | None = None) -> int:
+	parser = argparse.ArgumentParser(description="Compare two benchmark JSON reports")
+	parser.add_argument("baseline")
+	parser.add_argument("candidate")
+	parser.add_argument("--threshold", type=float, default=10.0, help="allowed p95 regression in percent")
+	args = parser.parse_args(argv)
+
+	with open(args.baseline, encoding="utf-8") as fh:
+		old = json.load(fh)
+	with open(args.candidate, encoding="utf-8") as fh:
+		new = json.load(fh)
+
+	print(f"baseline:  {old['meta'].get('revision')} ({old['meta'].get('mode')})")
+	print(f"candidate: {new['meta'].get('revision')} ({new['meta'].get('mode')})")
+	print(f"{'route':<24}{'p50 old':>10}{'p50 new':>10}{'p95 old':>10}{'p95 new':>10}{'p95 %':>9}{'rps %':>9}")
+	regressions = []
+	for name, stats in new["routes"].items():
+		base = old["routes"].get(name)
+		if base is None:
+			print(f"{name:<24}{'-':>10}{stats['p50_ms']:>10.2f}{'-':>10}{stats['p95_ms']:>10.2f}")
+			continue
+		p95_delta = _delta(base["p95_ms"], stats["p95_ms"])
+		rps_delta = _delta(base["rps"], stats["rps"])
+		flag = " !" if p95_delta > args.threshold else ""
+		print(f"{name:<24}{base['p50_ms']:>10.2f}{stats['p50_ms']:>10.2f}{base['p95_ms']:>10.2f}{stats['p95_ms']:>10.2f}{p95_delta:>+8.1f}%{rps_delta:>+8.1f}%{flag}")
+		if flag:
+			regressions.append(name)
+
+	old_rss, new_rss = old.get("rss_kb", {}).get("peak", 0), new.get("rss_kb", {}).get("peak", 0)
+	print(f"peak RSS: {old_rss} KB -> {new_rss} KB ({_delta(old_rss, new_rss):+.1f}%)")
+	if regressions:
+		print(f"p95 regressions over {args.threshold:.0f}%: {', '.join(regressions)}")
+		return 1
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
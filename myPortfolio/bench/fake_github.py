@@ -0,0 +1,153 @@
+"""Minimal stand-in for the GitHub REST API used by the benchmarks.
+
+Serves deterministic payloads for the endpoints ``backend/github.py`` calls so
+benchmark runs never touch the network or the real rate limit.
+"""
+
+import json
+import random
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import sleep
+
+LANGUAGES = ["Python", "JavaScript", "TypeScript", "Go", "Rust", "HTML", "CSS", "Shell"]
+
+
+def build_repos(username: str, count: int, seed: int = 42) -> list[dict]:
+	rng = random.Random(seed)
+	base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+	repos = []
+	for i in range(count):
+		updated = (base + timedelta(hours=rng.randint(0, 20000))).strftime("%Y-%m-%dT%H:%M:%SZ")
+		name = f"repo-{i:03d}"
+		repos.append({
+			"id": 1000 + i,
+			"name": name,
+			"full_name": f"{username}/{name}",
+			"description": f"Synthetic repository {i}",
+			"html_url": f"https://github.com/{username}/{name}",
+			"clone_url": f"https://github.com/{username}/{name}.git",
+			"language": rng.choice(LANGUAGES),
+			"stargazers_count": rng.randint(0, 500),
+			"forks_count": rng.randint(0, 80),
+			"watchers_count": rng.randint(0, 500),
+			"open_issues_count": rng.randint(0, 30),
+			"fork": rng.random() < 0.1,
+			"archived": False,
+			"disabled": False,
+			"private": False,
+			"created_at": "2023-01-01T00:00:00Z",
+			"updated_at": updated,
+			"pushed_at": updated,
+			"size": rng.randint(10, 50000),
+			"default_branch": "main",
+			"topics": rng.sample(["flask", "api", "cli", "web", "ml", "tools"], 2),
+			"license": {"name": "MIT License"},
+			"homepage": None,
+			"has_wiki": True,
+			"has_pages": False,
+			"has_downloads": True,
+			"has_issues": True,
+			"has_projects": False,
+		})
+	return repos
+
+
+def build_languages(repo: str, seed: int = 42) -> dict:
+	rng = random.Random(f"{seed}:{repo}")
+	return {lang: rng.randint(1000, 400000) for lang in rng.sample(LANGUAGES, 3)}
+
+
+class FakeGitHub:
+	"""Threaded HTTP server answering ``/users/*`` and ``/repos/*`` requests."""
+
+	def __init__(self, repo_count: int = 100, latency_ms: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+		self.repo_count = repo_count
+		self.latency = latency_ms / 1000.0
+		self.hits = 0
+		fake = self
+
+		class Handler(BaseHTTPRequestHandler):
+			def log_message(self, fmt, *args):  # silence per-request logging
+				pass
+
+			def do_GET(self):
+				fake.hits += 1
+				if fake.latency:
+					sleep(fake.latency)
+				path = self.path.split("?", 1)[0]
+				payload = fake.route(path)
+				if payload is None:
+					self.send_response(404)
+					body = b'{"message": "Not Found"}'
+				else:
+					self.send_response(200)
+					body = json.dumps(payload).encode("utf-8")
+				self.send_header("Content-Type", "application/json")
+				self.send_header("Content-Length", str(len(body)))
+				self.end_headers()
+				self.wfile.write(body)
+
+		self.server = ThreadingHTTPServer((host, port), Handler)
+		self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+	@property
+	def url(self) -> str:
+		host, port = self.server.server_address[:2]
+		return f"http://{host}:{port}"
+
+	def route(self, path: str):
+		if m := re.fullmatch(r"/users/([^/]+)/repos", path):
+			return build_repos(m.group(1), self.repo_count)
+		if m := re.fullmatch(r"/users/([^/]+)", path):
+			login = m.group(1)
+			return {
+				"login": login,
+				"id": 1,
+				"name": "Bench User",
+				"email": None,
+				"bio": "Synthetic profile",
+				"company": None,
+				"blog": "",
+				"location": "Localhost",
+				"hireable": True,
+				"public_repos": self.repo_count,
+				"public_gists": 0,
+				"followers": 123,
+				"following": 7,
+				"created_at": "2020-01-01T00:00:00Z",
+				"updated_at": "2024-01-01T00:00:00Z",
+				"avatar_url": "https://example.invalid/avatar.png",
+				"html_url": f"https://github.com/{login}",
+				"type": "User",
+				"site_admin": False,
+			}
+		if m := re.fullmatch(r"/repos/([^/]+)/([^/]+)/languages", path):
+			return build_languages(m.group(2))
+		return None
+
+	def start(self) -> "FakeGitHub":
+		self.thread.start()
+		return self
+
+	def stop(self) -> None:
+		self.server.shutdown()
+		self.server.server_close()
+
+
+if __name__ == "__main__":
+	import argparse
+
+	parser = argparse.ArgumentParser(description="Run the fake GitHub API server")
+	parser.add_argument("--port", type=int, default=8765)
+	parser.add_argument("--repos", type=int, default=100)
+	parser.add_argument("--latency-ms", type=float, default=0.0)
+	args = parser.parse_args()
+	fake = FakeGitHub(repo_count=args.repos, latency_ms=args.latency_ms, port=args.port)
+	print(f"Fake GitHub listening on {fake.url}")
+	try:
+		fake.server.serve_forever()
+	except KeyboardInterrupt:
+		pass
@@ -0,0 +1,301 @@
+"""Drive every public route and record latency, throughput and memory.
+
+Two modes share the same seeded dataset and fake GitHub server:
+
+* ``client``   - in-process through Flask's test client (no network, no WSGI server)
+* ``gunicorn`` - a real gunicorn instance hit by a thread pool over HTTP
+
+Results are written as JSON so runs from different commits can be diffed with
+``python -m bench.compare old.json new.json``.
+
+    python -m bench.harness --mode client --requests 200
+    python -m bench.harness --mode gunicorn --workers 2 --concurrency 8
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from itertools import cycle
+from time import perf_counter, sleep
+
+from .fake_github import FakeGitHub
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+# ---------- Stats helpers ----------
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+	if not sorted_values:
+		return 0.0
+	rank = max(int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1, 0)
+	return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(latencies: list[float], wall: float, errors: int, size: int) -> dict:
+	values = sorted(latencies)
+	return {
+		"requests": len(values),
+		"errors": errors,
+		"bytes_per_response": size,
+		"p50_ms": round(percentile(values, 50) * 1000, 3),
+		"p95_ms": round(percentile(values, 95) * 1000, 3),
+		"p99_ms": round(percentile(values, 99) * 1000, 3),
+		"mean_ms": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+		"rps": round(len(values) / wall, 1) if wall > 0 else 0.0,
+	}
+
+
+def _rss_kb(pid: int) -> int:
+	try:
+		with open(f"/proc/{pid}/status", encoding="ascii") as fh:
+			for line in fh:
+				if line.startswith("VmRSS:"):
+					return int(line.split()[1])
+	except OSError:
+		pass
+	return 0
+
+
+def _children(pid: int) -> list[int]:
+	try:
+		with open(f"/proc/{pid}/task/{pid}/children", encoding="ascii") as fh:
+			return [int(p) for p in fh.read().split()]
+	except OSError:
+		return []
+
+
+def _git_revision() -> str | None:
+	try:
+		out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=10)
+		return out.stdout.strip() or None
+	except (OSError, subprocess.SubprocessError):
+		return None
+
+
+# ---------- Routes ----------
+
+def build_routes(dataset: dict, seed: int) -> dict[str, list[str]]:
+	rng = random.Random(seed)
+	blog_ids = dataset["blog_ids"] or [1]
+	uploads = dataset["upload_urls"] or ["/uploads/missing.png"]
+	return {
+		"/": ["/"],
+		"/api/projects": ["/api/projects"],
+		"/api/projects?tech=": ["/api/projects?tech=python", "/api/projects?tech=flask&tech=sqlite", "/api/projects?tech=react,docker&match=any"],
+		"/api/projects/facets": ["/api/projects/facets", "/api/projects/facets?tech=python"],
+		"/api/skills": ["/api/skills"],
+		"/api/categories": ["/api/categories"],
+		"/api/blogs": ["/api/blogs"],
+		"/api/blogs/<id>": [f"/api/blogs/{i}" for i in rng.sample(blog_ids, min(50, len(blog_ids)))],
+		"/api/blogimages/<id>": [f"/api/blogimages/{i}" for i in rng.sample(blog_ids, min(50, len(blog_ids)))],
+		"/api/github/repos": ["/api/github/repos"],
+		"/api/github/user": ["/api/github/user"],
+		"/api/github/stats": ["/api/github/stats"],
+		"/uploads/*": rng.sample(uploads, min(100, len(uploads))),
+		"/media/hero.jpg": ["/media/hero.jpg"],
+		"/media/cv": ["/media/cv"],
+	}
+
+
+# ---------- Runners ----------
+
+def run_client(app, routes: dict[str, list[str]], requests_per_route: int, warmup: int) -> dict:
+	client = app.test_client()
+	results = {}
+	for name, paths in routes.items():
+		urls = cycle(paths)
+		for _ in range(warmup):
+			client.get(next(urls))
+		latencies, errors, size = [], 0, 0
+		wall_start = perf_counter()
+		for _ in range(requests_per_route):
+			start = perf_counter()
+			resp = client.get(next(urls))
+			body = resp.get_data()
+			latencies.append(perf_counter() - start)
+			size = len(body)
+			if resp.status_code >= 400:
+				errors += 1
+		results[name] = summarize(latencies, perf_counter() - wall_start, errors, size)
+	usage = resource.getrusage(resource.RUSAGE_SELF)
+	return {"routes": results, "rss_kb": {"current": _rss_kb(os.getpid()), "peak": usage.ru_maxrss}}
+
+
+def _free_port() -> int:
+	with socket.socket() as sock:
+		sock.bind(("127.0.0.1", 0))
+		return sock.getsockname()[1]
+
+
+def run_gunicorn(env: dict, routes: dict[str, list[str]], requests_per_route: int, warmup: int, workers: int, threads: int, concurrency: int, worker_class: str = "sync", config: str | None = None) -> dict:
+	import requests
+
+	port = _free_port()
+	cmd = [sys.executable, "-m", "gunicorn", "backend.app:app"]
+	if config:
+		# Profile settings first; the explicit flags below still override them
+		cmd += ["--config", config]
+	cmd += [
+		"--bind", f"127.0.0.1:{port}",
+		"--workers", str(workers),
+		"--threads", str(threads),
+		"--worker-class", worker_class,
+		"--log-level", "warning",
+	]
+	proc = subprocess.Popen(cmd, cwd=ROOT, env=env)
+	base = f"http://127.0.0.1:{port}"
+	try:
+		deadline = perf_counter() + 30
+		while True:
+			try:
+				if requests.get(f"{base}/api/skills", timeout=1).ok:
+					break
+			except requests.RequestException:
+				pass
+			if perf_counter() > deadline or proc.poll() is not None:
+				raise RuntimeError("gunicorn did not become ready")
+			sleep(0.2)
+
+		local = threading.local()
+
+		def fetch(url: str) -> tuple[float, int, int]:
+			session = getattr(local, "session", None)
+			if session is None:
+				session = local.session = requests.Session()
+			start = perf_counter()
+			resp = session.get(base + url, timeout=60)
+			return perf_counter() - start, resp.status_code, len(resp.content)
+
+		results = {}
+		peak_rss = 0
+		with ThreadPoolExecutor(max_workers=concurrency) as pool:
+			for name, paths in routes.items():
+				urls = cycle(paths)
+				list(pool.map(fetch, [next(urls) for _ in range(warmup)]))
+				batch = [next(urls) for _ in range(requests_per_route)]
+				wall_start = perf_counter()
+				outcomes = list(pool.map(fetch, batch))
+				wall = perf_counter() - wall_start
+				errors = sum(1 for _, status, _ in outcomes if status >= 400)
+				size = outcomes[-1][2] if outcomes else 0
+				results[name] = summarize([o[0] for o in outcomes], wall, errors, size)
+				rss = _rss_kb(proc.pid) + sum(_rss_kb(child) for child in _children(proc.pid))
+				peak_rss = max(peak_rss, rss)
+		return {"routes": results, "rss_kb": {"current": rss, "peak": peak_rss}}
+	finally:
+		proc.terminate()
+		try:
+			proc.wait(timeout=15)
+		except subprocess.TimeoutExpired:
+			proc.kill()
+
+
+# ---------- Entry point ----------
+
+def main(argv: list[str] | None = None) -> int:
+	parser = argparse.ArgumentParser(description="Benchmark the portfolio's public routes")
+	parser.add_argument("--mode", choices=["client", "gunicorn"], default="client")
+	parser.add_argument("--requests", type=int, default=200, help="timed requests per route")
+	parser.add_argument("--warmup", type=int, default=10)
+	parser.add_argument("--projects", type=int, default=50)
+	parser.add_argument("--blogs", type=int, default=500)
+	parser.add_argument("--categories", type=int, default=10)
+	parser.add_argument("--images-per-blog", type=int, default=1)
+	parser.add_argument("--image-kb", type=int, default=32)
+	parser.add_argument("--repos", type=int, default=100, help="repositories served by the fake GitHub")
+	parser.add_argument("--github-latency-ms", type=float, default=50.0)
+	parser.add_argument("--workers", type=int, default=2)
+	parser.add_argument("--threads", type=int, default=1)
+	parser.add_argument("--concurrency", type=int, default=8)
+	parser.add_argument("--worker-class", default="sync", help="gunicorn worker class (sync, gthread, gevent)")
+	parser.add_argument("--config", help="gunicorn config file, e.g. gunicorn.conf.py")
+	parser.add_argument("--seed", type=int, default=1234)
+	parser.add_argument("--out", help="output JSON path (default: bench/results/<mode>-<rev>.json)")
+	parser.add_argument("--keep", action="store_true", help="keep the temporary database and media")
+	args = parser.parse_args(argv)
+
+	workdir = tempfile.mkdtemp(prefix="portfolio-bench-")
+	fake = FakeGitHub(repo_count=args.repos, latency_ms=args.github_latency_ms).start()
+	env_overrides = {
+		"DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+		"GITHUB_API_URL": fake.url,
+		"GITHUB_USERNAME": "bench",
+		"GITHUB_TOKEN": "",
+		"METRICS_DIR": os.path.join(workdir, "metrics"),
+		# app.log, uploads, version stamps and locks stay out of the real instance/
+		"INSTANCE_PATH": os.path.join(workdir, "instance"),
+	}
+	os.environ.update(env_overrides)
+	sys.path.insert(0, ROOT)
+
+	from backend.app import create_app
+	from backend.github_languages import language_stats
+	from .seed import generate
+
+	app = create_app()
+	seed_start = perf_counter()
+	dataset = generate(
+		app,
+		projects=args.projects,
+		categories=args.categories,
+		blogs=args.blogs,
+		images_per_blog=args.images_per_blog,
+		image_bytes=args.image_kb * 1024,
+		seed=args.seed,
+	)
+	seed_seconds = perf_counter() - seed_start
+	routes = build_routes(dataset, args.seed)
+
+	try:
+		if args.mode == "client":
+			outcome = run_client(app, routes, args.requests, args.warmup)
+		else:
+			outcome = run_gunicorn(dict(os.environ), routes, args.requests, args.warmup, args.workers, args.threads, args.concurrency, args.worker_class, args.config)
+	finally:
+		# Background language refreshes call the fake GitHub; let them finish first
+		language_stats.wait(timeout=30)
+		fake.stop()
+		if not args.keep:
+			shutil.rmtree(workdir, ignore_errors=True)
+
+	revision = _git_revision()
+	report = {
+		"meta": {
+			"mode": args.mode,
+			"revision": revision,
+			"timestamp": datetime.now(timezone.utc).isoformat(),
+			"python": platform.python_version(),
+			"platform": platform.platform(),
+			"seed_seconds": round(seed_seconds, 3),
+			"github_hits": fake.hits,
+			"params": {k: v for k, v in vars(args).items() if k not in {"out", "keep"}},
+		},
+		**outcome,
+	}
+	out = args.out or os.path.join(os.path.dirname(__file__), "results", f"{args.mode}-{revision or 'local'}.json")
+	os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+	with open(out, "w", encoding="utf-8") as fh:
+		json.dump(report, fh, indent=2)
+
+	print(f"{'route':<24}{'p50':>9}{'p95':>9}{'p99':>9}{'rps':>10}{'err':>6}")
+	for name, stats in report["routes"].items():
+		print(f"{name:<24}{stats['p50_ms']:>9.2f}{stats['p95_ms']:>9.2f}{stats['p99_ms']:>9.2f}{stats['rps']:>10.1f}{stats['errors']:>6}")
+	print(f"RSS: {report['rss_kb']['current']} KB (peak {report['rss_kb']['peak']} KB)")
+	print(f"Wrote {out}")
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
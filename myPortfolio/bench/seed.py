@@ -0,0 +1,146 @@
+"""Seeded synthetic dataset generator for benchmarks.
+
+Fills the existing schema with N projects, skills, categories, blogs and blog
+images. Image payloads are random bytes of a configurable size behind a PNG
+signature; some are written to ``<instance>/uploads/bench`` and the rest are
+served from their BLOB column, so both branches of ``serve_upload`` get
+exercised. The benchmarks point ``INSTANCE_PATH`` at their scratch directory.
+
+    python -m bench.seed --projects 200 --blogs 1000 --image-kb 64
+"""
+
+import os
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+WORDS = (
+	"flask python sqlite api cache latency worker request response query index "
+	"image upload portfolio blog project skill deploy gunicorn template json"
+).split()
+TECH = ["Python", "Flask", "SQLite", "JavaScript", "React", "Vue", "Docker", "FastAPI", "HTML", "CSS", "Node", "Flutter"]
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+	return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _image_bytes(rng: random.Random, size: int) -> bytes:
+	return PNG_SIGNATURE + rng.randbytes(max(size - len(PNG_SIGNATURE), 0))
+
+
+def generate(
+	app,
+	*,
+	projects: int = 50,
+	skills: int = 20,
+	categories: int = 8,
+	blogs: int = 200,
+	images_per_blog: int = 1,
+	image_bytes: int = 32 * 1024,
+	disk_ratio: float = 0.5,
+	seed: int = 1234,
+) -> dict:
+	"""Populate ``app``'s database and return the generated media URLs."""
+	from backend import tags
+	from backend.extensions import db
+	from backend.models import Blog, BlogCategory, BlogImage, Project, Skill, SiteSetting
+
+	rng = random.Random(seed)
+	base = datetime(2023, 1, 1)
+	upload_dir = os.path.join(app.instance_path, "uploads", "bench")
+	os.makedirs(upload_dir, exist_ok=True)
+	urls: list[str] = []
+
+	def media(prefix: str, index: int) -> tuple[str, bytes | None, str]:
+		data = _image_bytes(rng, image_bytes)
+		name = f"bench/{prefix}-{index:06d}.png"
+		urls.append(f"/uploads/{name}")
+		if rng.random() < disk_ratio:
+			with open(os.path.join(app.instance_path, "uploads", name), "wb") as fh:
+				fh.write(data)
+		return f"/uploads/{name}", data, "image/png"
+
+	with app.app_context():
+		db.session.execute(insert(BlogCategory), [{"name": f"Category {i}"} for i in range(categories)])
+		category_ids = [row[0] for row in db.session.execute(db.select(BlogCategory.id)).all()]
+
+		db.session.execute(insert(Skill), [
+			{"name": rng.choice(TECH) + f" {i}", "level": rng.choice(["Beginner", "Intermediate", "Advanced", "Expert"])}
+			for i in range(skills)
+		])
+
+		project_rows = []
+		for i in range(projects):
+			url, data, mime = media("project", i)
+			project_rows.append({
+				"title": f"Project {i}",
+				"description": " ".join(_sentence(rng, 12) for _ in range(3)),
+				"tech_stack": ", ".join(rng.sample(TECH, 3)),
+				"github_link": f"https://github.com/bench/project-{i}",
+				"demo_link": None,
+				"image_url": url,
+				"image_data": data,
+				"image_mime": mime,
+				"created_at": base + timedelta(days=i),
+			})
+		if project_rows:
+			project_ids = db.session.execute(insert(Project).returning(Project.id), project_rows).scalars().all()
+			tags.sync_projects(project_ids)
+
+		blog_rows = [
+			{
+				"title": f"Blog post {i}",
+				"category_id": rng.choice(category_ids) if category_ids else None,
+				"content": " ".join(_sentence(rng, 15) for _ in range(rng.randint(5, 30))),
+				"created_at": base + timedelta(hours=i * 7),
+			}
+			for i in range(blogs)
+		]
+		if blog_rows:
+			db.session.execute(insert(Blog), blog_rows)
+		blog_ids = [row[0] for row in db.session.execute(db.select(Blog.id)).all()]
+
+		image_rows = []
+		for blog_id in blog_ids:
+			for _ in range(images_per_blog):
+				url, data, mime = media("blog", len(image_rows))
+				image_rows.append({"blog_id": blog_id, "image_url": url, "image_data": data, "image_mime": mime, "alt_text": "bench", "created_at": base})
+		if image_rows:
+			db.session.execute(insert(BlogImage), image_rows)
+
+		db.session.add(SiteSetting(key="hero_image", image_data=_image_bytes(rng, image_bytes), image_mime="image/png"))
+		db.session.add(SiteSetting(key="cv_file", image_data=b"%PDF-1.4\n" + rng.randbytes(image_bytes), image_mime="application/pdf"))
+		db.session.commit()
+
+	return {"upload_urls": urls, "blog_ids": blog_ids, "category_ids": category_ids}
+
+
+if __name__ == "__main__":
+	import argparse
+
+	parser = argparse.ArgumentParser(description="Seed the configured database with synthetic content")
+	parser.add_argument("--projects", type=int, default=50)
+	parser.add_argument("--skills", type=int, default=20)
+	parser.add_argument("--categories", type=int, default=8)
+	parser.add_argument("--blogs", type=int, default=200)
+	parser.add_argument("--images-per-blog", type=int, default=1)
+	parser.add_argument("--image-kb", type=int, default=32)
+	parser.add_argument("--seed", type=int, default=1234)
+	args = parser.parse_args()
+
+	from backend.app import create_app
+
+	result = generate(
+		create_app(),
+		projects=args.projects,
+		skills=args.skills,
+		categories=args.categories,
+		blogs=args.blogs,
+		images_per_blog=args.images_per_blog,
+		image_bytes=args.image_kb * 1024,
+		seed=args.seed,
+	)
+	print(f"Seeded {len(result['blog_ids'])} blogs and {len(result['upload_urls'])} media files")
@@ -0,0 +1,141 @@
+"""Compare JSON serialization strategies for the project and blog list endpoints.
+
+For each list (default 1,000 rows) four strategies are timed, both for the
+encoder alone (data fetched up front) and end to end (query + encode):
+
+* ``orm+to_dict/stdlib``  - ORM objects, ``to_dict()``, Flask's default provider (the old path)
+* ``orm+to_dict/fast``    - the same dicts through ``backend.json_provider.JSONProvider``
+* ``rows/stdlib``         - column-projected rows through the provider's stdlib fallback
+* ``rows/fast``           - column-projected rows through the provider (orjson when installed)
+
+    python -m bench.serialize --rows 1000 --repeat 50
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timezone
+from time import perf_counter
+
+from .harness import ROOT, _git_revision, percentile
+
+
+def _time(fn, repeat: int) -> tuple[dict, int]:
+	fn()  # warm caches and lazy imports
+	samples = []
+	size = 0
+	for _ in range(repeat):
+		start = perf_counter()
+		size = len(fn())
+		samples.append(perf_counter() - start)
+	samples.sort()
+	p50 = percentile(samples, 50)
+	return {
+		"p50_ms": round(p50 * 1000, 3),
+		"p95_ms": round(percentile(samples, 95) * 1000, 3),
+		"mb_per_s": round(size / p50 / 1e6, 1) if p50 else 0.0,
+	}, size
+
+
+def main(argv: list[str] | None = None) -> int:
+	parser = argparse.ArgumentParser(description="Benchmark JSON serialization of list endpoints")
+	parser.add_argument("--rows", type=int, default=1000, help="projects and blogs to seed")
+	parser.add_argument("--repeat", type=int, default=50)
+	parser.add_argument("--image-kb", type=int, default=8, help="BLOB size stored on each project")
+	parser.add_argument("--seed", type=int, default=1234)
+	parser.add_argument("--out", help="output JSON path (default: bench/results/serialize-<rev>.json)")
+	args = parser.parse_args(argv)
+
+	workdir = tempfile.mkdtemp(prefix="portfolio-serialize-")
+	os.environ.update({
+		"DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+		"METRICS_DIR": os.path.join(workdir, "metrics"),
+		"INSTANCE_PATH": os.path.join(workdir, "instance"),
+	})
+	sys.path.insert(0, ROOT)
+
+	from flask.json.provider import DefaultJSONProvider
+
+	from backend import json_provider
+	from backend.api import _BLOG_FIELDS, _PROJECT_FIELDS
+	from backend.app import create_app
+	from backend.extensions import db
+	from backend.models import Blog, BlogCategory, Project
+	from .seed import generate
+
+	app = create_app()
+	generate(app, projects=args.rows, blogs=args.rows, images_per_blog=0, image_bytes=args.image_kb * 1024, seed=args.seed)
+
+	stdlib = DefaultJSONProvider(app)
+	fast = json_provider.JSONProvider(app)
+
+	def fallback_dumps(obj) -> str:
+		return json.dumps(json_provider._plain(obj), default=json_provider._default, ensure_ascii=True, sort_keys=True)
+
+	def project_objects():
+		return [p.to_dict() for p in Project.query.order_by(Project.created_at.desc()).all()]
+
+	def project_rows():
+		return db.session.execute(db.select(*_PROJECT_FIELDS).order_by(Project.created_at.desc())).all()
+
+	def blog_objects():
+		return [b.to_dict() for b in Blog.query.order_by(Blog.created_at.desc()).all()]
+
+	def blog_rows():
+		stmt = db.select(*_BLOG_FIELDS).outerjoin(BlogCategory, Blog.category_id == BlogCategory.id)
+		return db.session.execute(stmt.order_by(Blog.created_at.desc())).all()
+
+	strategies = {
+		"orm+to_dict/stdlib": (stdlib.dumps, {"projects": project_objects, "blogs": blog_objects}),
+		"orm+to_dict/fast": (fast.dumps, {"projects": project_objects, "blogs": blog_objects}),
+		"rows/stdlib": (fallback_dumps, {"projects": project_rows, "blogs": blog_rows}),
+		"rows/fast": (fast.dumps, {"projects": project_rows, "blogs": blog_rows}),
+	}
+
+	results: dict = {}
+	try:
+		with app.app_context():
+			for name, (dumps, loaders) in strategies.items():
+				for listing, load in loaders.items():
+					data = load()
+					encode, size = _time(lambda: dumps(data), args.repeat)
+
+					def end_to_end():
+						db.session.expunge_all()
+						return dumps(load())
+
+					total, _ = _time(end_to_end, args.repeat)
+					results.setdefault(listing, {})[name] = {"bytes": size, "encode": encode, "end_to_end": total}
+	finally:
+		shutil.rmtree(workdir, ignore_errors=True)
+
+	revision = _git_revision()
+	report = {
+		"meta": {
+			"revision": revision,
+			"timestamp": datetime.now(timezone.utc).isoformat(),
+			"python": platform.python_version(),
+			"orjson": getattr(json_provider.orjson, "__version__", None),
+			"params": {k: v for k, v in vars(args).items() if k != "out"},
+		},
+		"results": results,
+	}
+	out = args.out or os.path.join(os.path.dirname(__file__), "results", f"serialize-{revision or 'local'}.json")
+	os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+	with open(out, "w", encoding="utf-8") as fh:
+		json.dump(report, fh, indent=2)
+
+	print(f"{'list':<10}{'strategy':<22}{'encode p50':>12}{'MB/s':>8}{'query+encode p50':>18}")
+	for listing, by_strategy in results.items():
+		for name, stats in by_strategy.items():
+			print(f"{listing:<10}{name:<22}{stats['encode']['p50_ms']:>12.2f}{stats['encode']['mb_per_s']:>8.1f}{stats['end_to_end']['p50_ms']:>18.2f}")
+	print(f"Wrote {out}")
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
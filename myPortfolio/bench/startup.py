@@ -0,0 +1,149 @@
+"""Measure cold start: import time and app construction in a fresh interpreter.
+
+Each run spawns ``python -X importtime`` to import ``backend.app`` and call
+``create_app()`` once, against a throwaway SQLite database. Reported per run:
+wall time of the whole process, time to import, time to build the app, and
+whether heavy optional modules (``requests``) were pulled in. The importtime
+log gives the slowest modules by cumulative time.
+
+Use it as a guard in CI: the exit status is 1 when ``create_app`` ran more
+than once, when a deferred module was imported at startup, or when the
+median import+create time exceeds ``--max-ms``.
+
+    python -m bench.startup --runs 5 --max-ms 1500
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from time import perf_counter
+
+from .harness import ROOT, _git_revision
+
+# Runs inside the child interpreter; prints one JSON line
+_CHILD = """
+import json, sys
+from time import perf_counter
+start = perf_counter()
+import backend.app as module
+imported = perf_counter()
+# An app built as an import side effect counts as a construction too
+calls = [1] if "app" in vars(module) else []
+original = module.create_app
+def counting_create_app():
+	calls.append(1)
+	return original()
+module.create_app = counting_create_app
+module.app
+built = perf_counter()
+print(json.dumps({
+	"import_ms": (imported - start) * 1000,
+	"create_ms": (built - imported) * 1000,
+	"create_app_calls": len(calls),
+	"lazy_modules": {name: name in sys.modules for name in ("requests", "urllib3", "charset_normalizer")},
+}))
+"""
+
+
+def _parse_importtime(stderr: str) -> list[tuple[str, int]]:
+	"""Top-level (cumulative) import times in microseconds, slowest first."""
+	entries = []
+	for line in stderr.splitlines():
+		if not line.startswith("import time:") or "|" not in line:
+			continue
+		try:
+			_, cumulative, name = line[len("import time:"):].split("|")
+			entries.append((name.rstrip(), int(cumulative)))
+		except ValueError:
+			continue
+	top = [(name.strip(), us) for name, us in entries if not name.startswith("  ")]
+	return sorted(top, key=lambda item: item[1], reverse=True)
+
+
+def run_once(workdir: str, index: int) -> dict:
+	env = dict(os.environ)
+	env.update({
+		"DATABASE_URL": f"sqlite:///{os.path.join(workdir, f'startup-{index}.db')}",
+		"METRICS_DIR": os.path.join(workdir, "metrics"),
+		"INSTANCE_PATH": os.path.join(workdir, "instance"),
+	})
+	start = perf_counter()
+	proc = subprocess.run([sys.executable, "-X", "importtime", "-c", _CHILD], cwd=ROOT, env=env, capture_output=True, text=True, timeout=120)
+	wall = perf_counter() - start
+	if proc.returncode != 0:
+		raise RuntimeError(f"startup child failed:\n{proc.stderr[-2000:]}")
+	result = json.loads(proc.stdout.strip().splitlines()[-1])
+	result["wall_ms"] = wall * 1000
+	result["slowest_imports"] = [{"module": name, "ms": round(us / 1000, 1)} for name, us in _parse_importtime(proc.stderr)[:10]]
+	return result
+
+
+def main(argv: list[str] | None = None) -> int:
+	parser = argparse.ArgumentParser(description="Benchmark application cold start")
+	parser.add_argument("--runs", type=int, default=5)
+	parser.add_argument("--max-ms", type=float, help="fail if median import+create exceeds this")
+	parser.add_argument("--out", help="output JSON path (default: bench/results/startup-<rev>.json)")
+	args = parser.parse_args(argv)
+
+	workdir = tempfile.mkdtemp(prefix="portfolio-startup-")
+	try:
+		run_once(workdir, -1)  # populate bytecode caches so runs compare like for like
+		runs = [run_once(workdir, i) for i in range(args.runs)]
+	finally:
+		shutil.rmtree(workdir, ignore_errors=True)
+
+	def median(key: str) -> float:
+		return round(statistics.median(run[key] for run in runs), 1)
+
+	summary = {
+		"wall_ms": median("wall_ms"),
+		"import_ms": median("import_ms"),
+		"create_ms": median("create_ms"),
+		"startup_ms": round(median("import_ms") + median("create_ms"), 1),
+		"create_app_calls": max(run["create_app_calls"] for run in runs),
+		"lazy_modules_loaded": sorted({name for run in runs for name, loaded in run["lazy_modules"].items() if loaded}),
+	}
+	revision = _git_revision()
+	report = {
+		"meta": {
+			"revision": revision,
+			"timestamp": datetime.now(timezone.utc).isoformat(),
+			"python": platform.python_version(),
+			"params": {k: v for k, v in vars(args).items() if k != "out"},
+		},
+		"summary": summary,
+		"slowest_imports": runs[-1]["slowest_imports"],
+		"runs": [{k: v for k, v in run.items() if k != "slowest_imports"} for run in runs],
+	}
+	out = args.out or os.path.join(os.path.dirname(__file__), "results", f"startup-{revision or 'local'}.json")
+	os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+	with open(out, "w", encoding="utf-8") as fh:
+		json.dump(report, fh, indent=2)
+
+	print(f"import {summary['import_ms']:.1f} ms + create_app {summary['create_ms']:.1f} ms (process wall {summary['wall_ms']:.1f} ms)")
+	print(f"create_app calls: {summary['create_app_calls']}; heavy modules loaded: {', '.join(summary['lazy_modules_loaded']) or 'none'}")
+	for item in report["slowest_imports"][:5]:
+		print(f"  {item['ms']:>8.1f} ms  {item['module']}")
+	print(f"Wrote {out}")
+
+	failed = summary["create_app_calls"] != 1
+	if args.max_ms is not None and summary["startup_ms"] > args.max_ms:
+		print(f"FAIL: startup {summary['startup_ms']:.1f} ms exceeds --max-ms {args.max_ms:.1f}")
+		failed = True
+	if summary["create_app_calls"] != 1:
+		print(f"FAIL: create_app ran {summary['create_app_calls']} times")
+	if summary["lazy_modules_loaded"]:
+		print(f"FAIL: imported at startup: {', '.join(summary['lazy_modules_loaded'])}")
+		failed = True
+	return 1 if failed else 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,126 @@
+"""Compare gunicorn worker profiles on DB-bound and GitHub-bound routes.
+
+Each profile boots gunicorn with ``gunicorn.conf.py`` (preload, post-fork
+pool disposal) and overrides only the worker model, then drives two route
+groups with the same client concurrency:
+
+* ``db``     - list and detail endpoints served from SQLite
+* ``github`` - GitHub proxy endpoints; the fake upstream sleeps
+  ``--github-latency-ms`` per call and the app cache is disabled, so every
+  request waits on the network like a cold cache in production
+
+    python -m bench.workers --workers 2 --concurrency 16
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+from .fake_github import FakeGitHub
+from .harness import ROOT, _git_revision, build_routes, run_gunicorn
+
+DB_ROUTES = ("/api/projects", "/api/blogs", "/api/blogs/<id>", "/api/categories")
+GITHUB_ROUTES = ("/api/github/repos", "/api/github/user")
+
+
+def _profiles(workers: int, threads: int) -> list[dict]:
+	profiles = [
+		{"name": "sync", "worker_class": "sync", "workers": workers, "threads": 1},
+		{"name": f"gthread x{threads}", "worker_class": "gthread", "workers": workers, "threads": threads},
+	]
+	if importlib.util.find_spec("gevent") is not None:
+		profiles.append({"name": "gevent", "worker_class": "gevent", "workers": workers, "threads": 1})
+	return profiles
+
+
+def main(argv: list[str] | None = None) -> int:
+	parser = argparse.ArgumentParser(description="Benchmark gunicorn worker models")
+	parser.add_argument("--workers", type=int, default=2)
+	parser.add_argument("--threads", type=int, default=4, help="threads per gthread worker")
+	parser.add_argument("--concurrency", type=int, default=16)
+	parser.add_argument("--requests", type=int, default=200, help="timed requests per route")
+	parser.add_argument("--warmup", type=int, default=10)
+	parser.add_argument("--blogs", type=int, default=500)
+	parser.add_argument("--github-latency-ms", type=float, default=100.0)
+	parser.add_argument("--seed", type=int, default=1234)
+	parser.add_argument("--out", help="output JSON path (default: bench/results/workers-<rev>.json)")
+	args = parser.parse_args(argv)
+
+	workdir = tempfile.mkdtemp(prefix="portfolio-workers-")
+	fake = FakeGitHub(repo_count=100, latency_ms=args.github_latency_ms).start()
+	os.environ.update({
+		"DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+		"GITHUB_API_URL": fake.url,
+		"GITHUB_USERNAME": "bench",
+		"GITHUB_TOKEN": "",
+		"GITHUB_CACHE_TTL": "0",
+		"METRICS_DIR": os.path.join(workdir, "metrics"),
+		"INSTANCE_PATH": os.path.join(workdir, "instance"),
+	})
+	sys.path.insert(0, ROOT)
+
+	from backend.app import create_app
+	from .seed import generate
+
+	app = create_app()
+	dataset = generate(app, blogs=args.blogs, images_per_blog=0, seed=args.seed)
+	all_routes = build_routes(dataset, args.seed)
+	groups = {
+		"db": {name: all_routes[name] for name in DB_ROUTES},
+		"github": {name: all_routes[name] for name in GITHUB_ROUTES},
+	}
+	config = os.path.join(ROOT, "gunicorn.conf.py")
+
+	results: dict = {}
+	try:
+		for profile in _profiles(args.workers, args.threads):
+			for group, routes in groups.items():
+				outcome = run_gunicorn(
+					dict(os.environ), routes, args.requests, args.warmup,
+					profile["workers"], profile["threads"], args.concurrency,
+					profile["worker_class"], config,
+				)
+				stats = outcome["routes"]
+				results.setdefault(profile["name"], {})[group] = {
+					"rps": round(sum(s["rps"] for s in stats.values()) / len(stats), 1),
+					"p95_ms": max(s["p95_ms"] for s in stats.values()),
+					"errors": sum(s["errors"] for s in stats.values()),
+					"rss_kb": outcome["rss_kb"]["peak"],
+					"routes": stats,
+				}
+	finally:
+		fake.stop()
+		shutil.rmtree(workdir, ignore_errors=True)
+
+	revision = _git_revision()
+	report = {
+		"meta": {
+			"revision": revision,
+			"timestamp": datetime.now(timezone.utc).isoformat(),
+			"python": platform.python_version(),
+			"cpus": os.cpu_count(),
+			"params": {k: v for k, v in vars(args).items() if k != "out"},
+		},
+		"profiles": results,
+	}
+	out = args.out or os.path.join(os.path.dirname(__file__), "results", f"workers-{revision or 'local'}.json")
+	os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+	with open(out, "w", encoding="utf-8") as fh:
+		json.dump(report, fh, indent=2)
+
+	print(f"{'profile':<14}{'group':<8}{'mean rps':>10}{'worst p95':>11}{'err':>6}{'peak RSS KB':>13}")
+	for name, by_group in results.items():
+		for group, stats in by_group.items():
+			print(f"{name:<14}{group:<8}{stats['rps']:>10.1f}{stats['p95_ms']:>11.1f}{stats['errors']:>6}{stats['rss_kb']:>13}")
+	print(f"Wrote {out}")
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -1,6 +1,7 @@
 let allBlogs = [];
-let allCategories = [];
+let facets = { total: 0, categories: [], uncategorized: 0, archive: [] };
 let currentCategory = 'all';
+let currentMonth = null;
 let displayedCount = 6;
 
 async function fetchJSON(url) {
@@ -23,14 +24,20 @@ function truncateText(text, maxLength = 150) {
 	return text.substring(0, maxLength).trim() + '...';
 }
 
+// Category names are admin-entered; escape them wherever they go into markup
+function escapeHTML(text) {
+	const div = document.createElement('div');
+	div.textContent = text;
+	return div.innerHTML.replace(/"/g, '&quot;').replace(/'/g, '&#39;');
+}
+
 function setCategoryFilter(name) {
 	const btn = Array.from(document.querySelectorAll('#categoryFilters button')).find(b => b.dataset.category === name);
 	if (btn) btn.click();
 }
 
 function renderBlogCard(blog) {
-	const category = allCategories.find(c => c.id === blog.category_id);
-	const categoryName = category ? category.name : 'Uncategorized';
+	const categoryName = escapeHTML(blog.category_name || 'Uncategorized');
 	
 	return `
 		<div class="col-lg-6 col-md-6 animate-fade-in-up">
@@ -50,7 +57,7 @@ function renderBlogCard(blog) {
 							<i class="bi bi-journal-text me-1"></i>
 							Read More
 						</a>
-						<a class="text-muted text-decoration-none" href="#" aria-label="View category" onclick="event.preventDefault(); setCategoryFilter('${categoryName}');">
+						<a class="text-muted text-decoration-none" href="#" aria-label="View category" data-category="${categoryName}">
 							<i class="bi bi-tag me-1"></i>${categoryName}
 						</a>
 					</div>
@@ -60,21 +67,25 @@ function renderBlogCard(blog) {
 	`;
 }
 
-function filterBlogs() {
-	const filteredBlogs = currentCategory === 'all' 
-		? allBlogs 
-		: allBlogs.filter(blog => {
-			const category = allCategories.find(c => c.id === blog.category_id);
-			if (!category) return false;
-			return category.name.toLowerCase() === currentCategory.toLowerCase();
-		});
-	
-	return filteredBlogs;
+// Posts are filtered by the server; the facet index supplies pills and archive
+function blogsQuery() {
+	const params = new URLSearchParams();
+	const category = facets.categories.find(c => c.name.toLowerCase() === currentCategory.toLowerCase());
+	if (category) params.set('category_id', category.id);
+	if (currentMonth) params.set('month', currentMonth);
+	const query = params.toString();
+	return query ? `?${query}` : '';
+}
+
+async function loadFacets() {
+	facets = await fetchJSON('/api/blogs/facets');
+	renderCategoryFilters();
+	renderArchive();
 }
 
 function displayBlogs() {
 	const container = document.getElementById('blogContainer');
-	const filteredBlogs = filterBlogs();
+	const filteredBlogs = allBlogs;
 	const blogsToShow = filteredBlogs.slice(0, displayedCount);
 	
 	if (blogsToShow.length === 0) {
@@ -90,6 +101,12 @@ function displayBlogs() {
 	}
 	
 	container.innerHTML = blogsToShow.map(renderBlogCard).join('');
+	container.querySelectorAll('a[data-category]').forEach(link => {
+		link.addEventListener('click', (event) => {
+			event.preventDefault();
+			setCategoryFilter(link.dataset.category);
+		});
+	});
 	
 	// Show/hide load more button
 	const loadMoreBtn = document.getElementById('loadMoreBtn');
@@ -100,7 +117,7 @@ function displayBlogs() {
 	}
 	
 	// Reset displayed count when filtering
-	if (currentCategory !== 'all') {
+	if (currentCategory !== 'all' || currentMonth) {
 		displayedCount = 6;
 	}
 }
@@ -109,17 +126,9 @@ async function loadBlogs() {
 	const container = document.getElementById('blogContainer');
 	
 	try {
-		// Load both blogs and categories
-		const [blogs, categories] = await Promise.all([
-			fetchJSON('/api/blogs'),
-			fetchJSON('/api/categories')
-		]);
-		
-		allBlogs = blogs;
-		allCategories = categories;
-		renderCategoryFilters();
+		allBlogs = await fetchJSON(`/api/blogs${blogsQuery()}`);
 		
-		if (allBlogs.length === 0) {
+		if (allBlogs.length === 0 && currentCategory === 'all' && !currentMonth) {
 			container.innerHTML = `
 				<div class="col-12 text-center">
 					<div class="alert alert-warning">
@@ -150,10 +159,11 @@ function renderCategoryFilters() {
 	const container = document.getElementById('categoryFilters');
 	if (!container) return;
 	const buttons = [];
-	buttons.push(`<button type="button" class="btn btn-outline-primary ${currentCategory==='all'?'active':''}" data-category="all">All</button>`);
-	allCategories.forEach(cat => {
+	buttons.push(`<button type="button" class="btn btn-outline-primary ${currentCategory==='all'?'active':''}" data-category="all">All <span class="badge bg-secondary">${facets.total}</span></button>`);
+	facets.categories.filter(cat => cat.count > 0).forEach(cat => {
 		const active = currentCategory.toLowerCase() === (cat.name||'').toLowerCase();
-		buttons.push(`<button type=\"button\" class=\"btn btn-outline-primary ${active?'active':''}\" data-category=\"${cat.name}\">${cat.name}</button>`);
+		const name = escapeHTML(cat.name || '');
+		buttons.push(`<button type="button" class="btn btn-outline-primary ${active?'active':''}" data-category="${name}">${name} <span class="badge bg-secondary">${cat.count}</span></button>`);
 	});
 	container.innerHTML = buttons.join('');
 	setupCategoryFilters();
@@ -170,10 +180,34 @@ function setupCategoryFilters() {
 			// Add active class to clicked button
 			button.classList.add('active');
 			
-			// Update filter and display
+			// Update filter and fetch the matching posts
 			currentCategory = button.getAttribute('data-category');
 			displayedCount = 6;
-			displayBlogs();
+			loadBlogs();
+		});
+	});
+}
+
+function renderArchive() {
+	const container = document.getElementById('archiveNav');
+	if (!container) return;
+	container.innerHTML = facets.archive.map(year => `
+		<div class="mb-2">
+			<div class="fw-semibold">${year.year} <small class="text-muted">(${year.count})</small></div>
+			${year.months.map(m => {
+				const label = new Date(`${m.month}-01T00:00:00`).toLocaleDateString('en-US', { month: 'long' });
+				return `<a href="#" class="d-block small ${currentMonth === m.month ? 'fw-bold' : 'text-muted'}" data-month="${m.month}">${label} (${m.count})</a>`;
+			}).join('')}
+		</div>
+	`).join('');
+	container.querySelectorAll('[data-month]').forEach(link => {
+		link.addEventListener('click', (event) => {
+			event.preventDefault();
+			const month = link.getAttribute('data-month');
+			currentMonth = currentMonth === month ? null : month;
+			displayedCount = 6;
+			renderArchive();
+			loadBlogs();
 		});
 	});
 }
@@ -215,7 +249,11 @@ function setupAnimations() {
 
 // Initialize when DOM is loaded
 window.addEventListener('DOMContentLoaded', () => {
-	loadBlogs();
+	// Pills and archive come from the small facet index; the post query maps the
+	// selected category name to its id through it, so posts load once it is in
+	loadFacets()
+		.catch(error => console.error('Error loading blog facets:', error))
+		.finally(loadBlogs);
 	setupLoadMore();
 	setupAnimations();
 });
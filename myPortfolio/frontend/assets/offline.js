@@ -0,0 +1,8 @@
+// Register the service worker (see frontend/sw.js); pages behave the same without it.
+if ('serviceWorker' in navigator) {
+	window.addEventListener('load', () => {
+		navigator.serviceWorker.register('/sw.js').catch(error => {
+			console.warn('Service worker registration failed:', error);
+		});
+	});
+}
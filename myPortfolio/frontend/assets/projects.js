@@ -53,32 +53,52 @@ function renderProjectCard(project) {
 	`;
 }
 
-function filterProjects() {
-	const filteredProjects = currentFilter === 'all' 
-		? allProjects 
-		: allProjects.filter(project => {
-			const tech = project.tech_stack?.toLowerCase() || '';
-			switch (currentFilter) {
-				case 'web':
-					return tech.includes('html') || tech.includes('css') || tech.includes('javascript') || 
-						   tech.includes('react') || tech.includes('vue') || tech.includes('angular');
-				case 'api':
-					return tech.includes('python') || tech.includes('flask') || tech.includes('django') || 
-						   tech.includes('node') || tech.includes('express') || tech.includes('fastapi');
-				case 'mobile':
-					return tech.includes('react native') || tech.includes('flutter') || tech.includes('ionic') || 
-						   tech.includes('mobile') || tech.includes('pwa');
-				default:
-					return true;
-			}
+// Category buttons map to terms matched inside tags ("vue" finds "Vue.js"); the server does the matching
+const FILTER_TAGS = {
+	web: ['html', 'css', 'javascript', 'react', 'vue', 'angular'],
+	api: ['python', 'flask', 'django', 'node', 'express', 'fastapi'],
+	mobile: ['react native', 'flutter', 'ionic', 'mobile', 'pwa'],
+};
+let selectedTags = [];
+
+function filterQuery() {
+	const params = new URLSearchParams();
+	if (selectedTags.length > 0) {
+		selectedTags.forEach(tag => params.append('tech', tag));
+	} else if (FILTER_TAGS[currentFilter]) {
+		FILTER_TAGS[currentFilter].forEach(tag => params.append('tech', tag));
+		params.set('match', 'contains');
+	}
+	const query = params.toString();
+	return query ? `?${query}` : '';
+}
+
+function renderFacets(facets) {
+	const container = document.getElementById('techFacets');
+	if (!container) return;
+	// Labels come from admin-entered tech_stack: set them as text, never parse them as markup
+	container.replaceChildren(...facets.tags.map(facet => {
+		const button = document.createElement('button');
+		button.type = 'button';
+		button.className = `btn btn-sm ${selectedTags.includes(facet.tag) ? 'btn-primary' : 'btn-outline-secondary'}`;
+		button.dataset.tag = facet.tag;
+		const badge = document.createElement('span');
+		badge.className = 'badge bg-light text-dark';
+		badge.textContent = facet.count;
+		button.append(`${facet.label} `, badge);
+		button.addEventListener('click', () => {
+			const tag = button.dataset.tag;
+			selectedTags = selectedTags.includes(tag) ? selectedTags.filter(t => t !== tag) : [...selectedTags, tag];
+			displayedCount = 6;
+			loadProjects();
 		});
-	
-	return filteredProjects;
+		return button;
+	}));
 }
 
 function displayProjects() {
 	const container = document.getElementById('projectsContainer');
-	const filteredProjects = filterProjects();
+	const filteredProjects = allProjects;
 	const projectsToShow = filteredProjects.slice(0, displayedCount);
 	
 	if (projectsToShow.length === 0) {
@@ -111,11 +131,18 @@ function displayProjects() {
 
 async function loadProjects() {
 	const container = document.getElementById('projectsContainer');
+	const filtered = currentFilter !== 'all' || selectedTags.length > 0;
 	
 	try {
-		allProjects = await fetchJSON('/api/projects');
+		const query = filterQuery();
+		const [projects, facets] = await Promise.all([
+			fetchJSON(`/api/projects${query}`),
+			fetchJSON(`/api/projects/facets${query}${query ? '&' : '?'}limit=20`),
+		]);
+		allProjects = projects;
+		renderFacets(facets);
 		
-		if (allProjects.length === 0) {
+		if (allProjects.length === 0 && !filtered) {
 			container.innerHTML = `
 				<div class="col-12 text-center">
 					<div class="alert alert-warning">
@@ -153,10 +180,11 @@ function setupFilterButtons() {
 			// Add active class to clicked button
 			button.classList.add('active');
 			
-			// Update filter and display
+			// Update filter and fetch the matching projects
 			currentFilter = button.getAttribute('data-filter');
+			selectedTags = [];
 			displayedCount = 6;
-			displayProjects();
+			loadProjects();
 		});
 	});
 }
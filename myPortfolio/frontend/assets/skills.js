@@ -146,6 +146,38 @@ function renderSkillCard(skill) {
 	`;
 }
 
+async function loadLanguages() {
+	const section = document.getElementById('githubLanguages');
+	const list = document.getElementById('githubLanguagesList');
+	if (!section || !list) return;
+
+	try {
+		const data = await fetchJSON('/api/github/languages');
+		const languages = (data.languages || []).slice(0, 8);
+		if (languages.length === 0) return;
+
+		list.innerHTML = languages.map(lang => `
+			<div class="skill-item mb-3">
+				<div class="skill-header">
+					<span class="skill-name">${lang.name}</span>
+					<small class="text-muted">${lang.percent.toFixed(1)}%</small>
+				</div>
+				<div class="progress">
+					<div class="progress-bar" role="progressbar" style="width: 0%" data-width="${lang.percent}"
+						 aria-valuenow="${lang.percent}" aria-valuemin="0" aria-valuemax="100"></div>
+				</div>
+			</div>
+		`).join('');
+		section.classList.remove('d-none');
+		setTimeout(() => {
+			animateProgressBars();
+		}, 100);
+	} catch (error) {
+		// Optional section: stays hidden when GitHub is not configured or unavailable
+		console.warn('GitHub languages unavailable:', error);
+	}
+}
+
 function animateProgressBars() {
 	const progressBars = document.querySelectorAll('.progress-bar[data-width]');
 	
@@ -160,6 +192,7 @@ function animateProgressBars() {
 // Initialize when DOM is loaded
 window.addEventListener('DOMContentLoaded', () => {
 	loadSkills();
+	loadLanguages();
 	
 	// Setup animations
 	const observerOptions = {
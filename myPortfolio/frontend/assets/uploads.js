@@ -0,0 +1,121 @@
+// Resumable uploads for admin forms: file inputs marked data-resumable are sent
+// to /api/uploads in chunks before the form is submitted, and the form carries
+// only the finished upload ids. A dropped chunk is retried from the offset the
+// server confirms, and an upload interrupted by a reload resumes where it stopped.
+(function () {
+	const MAX_RETRIES = 6;
+
+	function storageKey(file) {
+		return `upload:${file.name}:${file.size}:${file.lastModified}`;
+	}
+
+	async function checksum(blob) {
+		// crypto.subtle only exists on secure origins; the checksum is optional
+		if (!window.crypto || !crypto.subtle) return null;
+		const digest = new Uint8Array(await crypto.subtle.digest('SHA-256', await blob.arrayBuffer()));
+		return btoa(String.fromCharCode(...digest));
+	}
+
+	async function status(id) {
+		const res = await fetch(`/api/uploads/${id}`, { method: 'HEAD' });
+		if (!res.ok) return null;
+		return {
+			id,
+			offset: Number(res.headers.get('Upload-Offset')),
+			chunkSize: Number(res.headers.get('Upload-Chunk-Size')),
+		};
+	}
+
+	async function start(file) {
+		const saved = localStorage.getItem(storageKey(file));
+		if (saved) {
+			const upload = await status(saved).catch(() => null);
+			if (upload) return upload;
+		}
+		const res = await fetch('/api/uploads', {
+			method: 'POST',
+			headers: { 'Content-Type': 'application/json' },
+			body: JSON.stringify({ filename: file.name, size: file.size, mime: file.type }),
+		});
+		const data = await res.json().catch(() => ({}));
+		if (!res.ok) throw new Error(`${file.name}: ${data.error || `upload failed (${res.status})`}`);
+		localStorage.setItem(storageKey(file), data.id);
+		return { id: data.id, offset: 0, chunkSize: Number(res.headers.get('Upload-Chunk-Size')) };
+	}
+
+	async function send(file, onProgress) {
+		const upload = await start(file);
+		let failures = 0;
+		while (upload.offset < file.size) {
+			onProgress(upload.offset / file.size);
+			const chunk = file.slice(upload.offset, upload.offset + upload.chunkSize);
+			const headers = { 'Content-Type': 'application/offset+octet-stream', 'Upload-Offset': String(upload.offset) };
+			const sum = await checksum(chunk);
+			if (sum) headers['Upload-Checksum'] = `sha256 ${sum}`;
+
+			let res = null;
+			try {
+				res = await fetch(`/api/uploads/${upload.id}`, { method: 'PATCH', headers, body: chunk });
+			} catch (error) {
+				// Network error: retry below from the offset the server has
+			}
+			if (res && res.ok) {
+				upload.offset = Number(res.headers.get('Upload-Offset'));
+				failures = 0;
+				continue;
+			}
+			// 409 (offset moved) and 460 (checksum mismatch) are retried like network errors
+			if (res && res.status < 500 && res.status !== 409 && res.status !== 460) {
+				const data = await res.json().catch(() => ({}));
+				throw new Error(`${file.name}: ${data.error || `upload failed (${res.status})`}`);
+			}
+			if (++failures > MAX_RETRIES) throw new Error(`${file.name}: upload keeps failing, try again later`);
+			await new Promise(resolve => setTimeout(resolve, 500 * 2 ** failures));
+			const current = await status(upload.id).catch(() => null);
+			if (current) upload.offset = current.offset;
+		}
+		localStorage.removeItem(storageKey(file));
+		onProgress(1);
+		return upload.id;
+	}
+
+	document.querySelectorAll('form').forEach(form => {
+		const inputs = [...form.querySelectorAll('input[type=file][data-resumable]')];
+		if (inputs.length === 0) return;
+
+		form.addEventListener('submit', async event => {
+			const files = inputs.flatMap(input => [...input.files]);
+			if (files.length === 0) return;
+			event.preventDefault();
+
+			const buttons = form.querySelectorAll('button');
+			buttons.forEach(button => { button.disabled = true; });
+			const note = document.createElement('div');
+			note.className = 'alert alert-info mt-3';
+			form.append(note);
+
+			try {
+				for (const [index, file] of files.entries()) {
+					const id = await send(file, progress => {
+						note.textContent = `Uploading ${file.name} (${index + 1} of ${files.length}): ${Math.round(progress * 100)}%`;
+					});
+					const field = document.createElement('input');
+					field.type = 'hidden';
+					field.name = 'upload_id';
+					field.value = id;
+					form.append(field);
+				}
+				inputs.forEach(input => {
+					input.value = '';
+					input.required = false;
+				});
+				note.textContent = 'Saving…';
+				form.submit();
+			} catch (error) {
+				note.className = 'alert alert-danger mt-3';
+				note.textContent = `${error.message}. Submit again to resume.`;
+				buttons.forEach(button => { button.disabled = false; });
+			}
+		});
+	});
+})();
@@ -0,0 +1,113 @@
+// Service worker (served by /sw.js, which prepends self.SW_CONFIG).
+// - App shell (pages, assets, CDN files) is precached per version; a deploy
+//   changes the version, and activating the new worker deletes older caches.
+// - Pages are network-first, falling back to the cached copy when offline.
+// - Fingerprinted assets and CDN files are cache-first (their URLs change with their content);
+//   other assets are stale-while-revalidate, starting from the precached shell copy.
+// - Public API JSON is stale-while-revalidate: answered from cache, and once older
+//   than apiFreshSeconds revalidated in the background with If-None-Match.
+const { version, precache, apiPaths, apiFreshSeconds } = self.SW_CONFIG;
+const SHELL = `shell-${version}`;
+const RUNTIME = `runtime-${version}`;
+const API = `api-${version}`;
+const FETCHED_AT = 'sw-fetched-at';
+const HASHED = /\.[0-9a-f]{10}\.(?:js|css)$/;
+
+self.addEventListener('install', event => {
+	event.waitUntil((async () => {
+		const cache = await caches.open(SHELL);
+		// One unreachable file (a CDN hiccup) must not block the rest of the shell
+		await Promise.all(precache.map(url => cache.add(url).catch(() => null)));
+		await self.skipWaiting();
+	})());
+});
+
+self.addEventListener('activate', event => {
+	event.waitUntil((async () => {
+		const keep = new Set([SHELL, RUNTIME, API]);
+		const keys = await caches.keys();
+		await Promise.all(keys.filter(key => !keep.has(key)).map(key => caches.delete(key)));
+		await self.clients.claim();
+	})());
+});
+
+self.addEventListener('fetch', event => {
+	const { request } = event;
+	if (request.method !== 'GET') return;
+	const url = new URL(request.url);
+
+	if (url.origin === self.location.origin) {
+		if (request.mode === 'navigate') {
+			event.respondWith(networkFirst(request));
+		} else if (url.pathname.startsWith('/assets/')) {
+			event.respondWith(HASHED.test(url.pathname) ? cacheFirst(request) : staleWhileRevalidate(event, RUNTIME, 0));
+		} else if (apiPaths.some(path => url.pathname.startsWith(path))) {
+			event.respondWith(staleWhileRevalidate(event, API, apiFreshSeconds));
+		}
+	} else if (url.hostname === 'cdn.jsdelivr.net') {
+		event.respondWith(cacheFirst(request));
+	}
+});
+
+async function networkFirst(request) {
+	try {
+		const response = await fetch(request);
+		if (response.ok) {
+			const cache = await caches.open(RUNTIME);
+			await cache.put(request, response.clone());
+		}
+		return response;
+	} catch (error) {
+		const cached = await caches.match(request, { ignoreSearch: true });
+		if (cached) return cached;
+		throw error;
+	}
+}
+
+async function cacheFirst(request) {
+	const cached = await caches.match(request);
+	if (cached) return cached;
+	const response = await fetch(request);
+	if (response.ok) {
+		const cache = await caches.open(RUNTIME);
+		await cache.put(request, response.clone());
+	}
+	return response;
+}
+
+async function staleWhileRevalidate(event, cacheName, freshSeconds) {
+	const cache = await caches.open(cacheName);
+	// Unfingerprinted assets were precached into the shell at install; serve those offline too
+	const cached = await cache.match(event.request) || await (await caches.open(SHELL)).match(event.request);
+	if (!cached) return revalidate(cache, event.request, null);
+
+	const age = (Date.now() - Number(cached.headers.get(FETCHED_AT) || 0)) / 1000;
+	if (age >= freshSeconds) {
+		// Offline or failing: keep serving the cached copy
+		event.waitUntil(revalidate(cache, event.request, cached.clone()).catch(() => null));
+	}
+	return cached;
+}
+
+async function revalidate(cache, request, cached) {
+	const etag = cached && cached.headers.get('ETag');
+	const response = await fetch(request.url, {
+		cache: 'no-store',
+		credentials: 'same-origin',
+		headers: etag ? { 'If-None-Match': etag } : {},
+	});
+	if (response.status === 304 && cached) {
+		await cache.put(request, await stamped(cached));
+		return cached;
+	}
+	if (response.ok && !/no-store/.test(response.headers.get('Cache-Control') || '')) {
+		await cache.put(request, await stamped(response.clone()));
+	}
+	return response;
+}
+
+async function stamped(response) {
+	const headers = new Headers(response.headers);
+	headers.set(FETCHED_AT, String(Date.now()));
+	return new Response(await response.blob(), { status: response.status, statusText: response.statusText, headers });
+}
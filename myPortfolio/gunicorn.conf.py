@@ -0,0 +1,120 @@
+"""Gunicorn deployment profile.
+
+    gunicorn -c myPortfolio/gunicorn.conf.py myPortfolio.backend.app:app
+
+Every setting can be overridden from the environment (names below), and
+gunicorn's own GUNICORN_CMD_ARGS still wins over this file.
+
+* ``GUNICORN_WORKER_CLASS`` - ``gthread`` (default) or ``gevent``. Most request
+  time is I/O: SQLite reads and GitHub API calls with 15 s timeouts. A
+  handful of processes with threads, or gevent greenlets, keeps a slow
+  GitHub response from tying up a whole worker.
+* ``WEB_CONCURRENCY`` - worker processes (default: the CPUs this container
+  may use, from the cgroup quota or affinity mask, between 2 and
+  ``GUNICORN_MAX_WORKERS``, default 4). Each worker holds its own media,
+  settings and compression caches, so the host's CPU count is not used.
+* ``GUNICORN_THREADS`` - threads per gthread worker (default 4).
+* ``GUNICORN_PRELOAD`` - import the app once in the master (default on), so
+  migrations run once and workers share the imported code copy-on-write.
+* ``ASSETS_BUILD_ON_START`` - run the frontend build (``flask assets build``)
+  in the master before workers start (default on), so every deploy serves
+  minified, fingerprinted, precompressed assets matching its sources.
+"""
+
+import importlib.util
+import os
+
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+
+if worker_class == "gevent":
+    # Patch before the preloaded app imports socket/ssl/requests
+    from gevent import monkey
+    monkey.patch_all()
+
+def _available_cpus() -> int:
+    """CPUs this process may actually use: cgroup quota, else affinity mask, else the host."""
+    try:  # cgroup v2
+        with open("/sys/fs/cgroup/cpu.max") as fh:
+            quota, period = fh.read().split()[:2]
+        if quota != "max":
+            return max(1, int(int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    try:  # cgroup v1
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as fh:
+            quota = int(fh.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as fh:
+            period = int(fh.read())
+        if quota > 0 and period > 0:
+            return max(1, quota // period)
+    except (OSError, ValueError):
+        pass
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+_cpus = _available_cpus()
+_max_workers = int(os.getenv("GUNICORN_MAX_WORKERS", "4"))
+
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+workers = int(os.getenv("WEB_CONCURRENCY", str(max(min(_cpus, _max_workers), 2))))
+threads = int(os.getenv("GUNICORN_THREADS", "4")) if worker_class == "gthread" else 1
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "200"))  # gevent only
+
+# GitHub calls time out after 15 s each; leave room for one plus DB work
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "45"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# Recycle workers to bound slow leaks; jitter so they don't all restart together
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", str(max(max_requests // 10, 1) if max_requests else 0)))
+
+preload_app = os.getenv("GUNICORN_PRELOAD", "True").lower() == "true"
+
+# Heartbeat files on tmpfs avoid stalls on slow container disks
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+forwarded_allow_ips = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+accesslog = os.getenv("GUNICORN_ACCESS_LOG") or None
+
+
+def on_starting(server):
+    """Build ``frontend/dist`` from the deployed sources before any worker serves."""
+    if os.getenv("ASSETS_BUILD_ON_START", "True").lower() != "true":
+        return
+    # Loaded by path: the module only needs Flask and click, whichever import path serves the app
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend", "assets.py")
+    spec = importlib.util.spec_from_file_location("_portfolio_assets_build", path)
+    assets = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(assets)
+    try:
+        manifest = assets.build(assets.FRONTEND_DIR, os.getenv("ASSETS_DIST_DIR") or None)
+    except Exception:
+        # Serving the unbuilt sources beats not starting at all
+        server.log.exception("Frontend asset build failed; serving sources")
+        return
+    server.log.info("Built %d frontend assets", len(manifest))
+
+
+def post_fork(server, worker):
+    """Give each worker its own database connections.
+
+    With ``preload_app`` the master built the app (and ran the schema
+    migrations), so its pooled SQLite connections were inherited by the fork.
+    Dropping them without closing leaves the parent's sockets/handles alone
+    and lets the worker open fresh ones on first use.
+    """
+    if not preload_app:
+        return
+    app = server.app.wsgi()
+    # Looked up on the app so it works whichever import path loaded the package
+    sqlalchemy = getattr(app, "extensions", {}).get("sqlalchemy")
+    if sqlalchemy is None:
+        return
+    with app.app_context():
+        sqlalchemy.engine.dispose(close=False)
+    server.log.debug("Worker %s: disposed inherited DB pool", worker.pid)
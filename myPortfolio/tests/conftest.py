@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+@pytest.fixture()
+def app(tmp_path, monkeypatch):
+	monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'portfolio.db'}")
+	monkeypatch.setenv("BACKUP_DIR", str(tmp_path / "backups"))
+	# Config reads the environment at import time
+	for module in [m for m in sys.modules if m == "backend" or m.startswith("backend.")]:
+		del sys.modules[module]
+	from backend.app import create_app
+
+	app = create_app(instance_path=str(tmp_path / "instance"))
+	with app.app_context():
+		yield app
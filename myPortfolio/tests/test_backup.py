@@ -0,0 +1,74 @@
+from datetime import datetime
+
+
+def _titles() -> list[str]:
+	from backend.models import Project
+
+	return [p.title for p in Project.query.order_by(Project.id)]
+
+
+def _add_project(title: str) -> None:
+	from backend.extensions import db
+	from backend.models import Project
+
+	db.session.add(Project(title=title, description=title))
+	db.session.commit()
+
+
+def test_pre_restore_backup_can_be_listed_and_restored(app):
+	from backend.backup import create_backup, list_backups, restore_backup
+
+	_add_project("before")
+	backup = create_backup(keep=5)
+	_add_project("after")
+
+	result = restore_backup(backup["name"])
+	assert _titles() == ["before"]
+
+	names = [item["name"] for item in list_backups()]
+	assert result["safety_backup"].endswith("-pre-restore.db")
+	assert result["safety_backup"] in names
+
+	undo = restore_backup(result["safety_backup"])
+	assert _titles() == ["before", "after"]
+	# Undoing the restore keeps its own safety copy instead of overwriting the one it read
+	names = [item["name"] for item in list_backups()]
+	assert {backup["name"], result["safety_backup"], undo["safety_backup"]} <= set(names)
+	assert undo["safety_backup"] != result["safety_backup"]
+
+
+def test_restore_moves_the_blog_index_past_every_generation_seen(app):
+	from backend.backup import create_backup, restore_backup
+	from backend.blog_index import FacetIndex
+	from backend.extensions import db
+	from backend.models import Blog
+
+	backup = create_backup(keep=5)
+	db.session.add(Blog(title="first", content="first"))
+	db.session.commit()
+	# Another worker built the index from the database about to be replaced
+	other_worker = FacetIndex()
+	assert other_worker.get()[0]["total"] == 1
+
+	restore_backup(backup["name"])
+	# Same number of writes since the backup, so without a bump the generation would repeat
+	db.session.add(Blog(title="second", content="second", created_at=datetime(2020, 1, 1)))
+	db.session.commit()
+	assert other_worker.get()[0]["archive"][0]["months"] == [{"month": "2020-01", "count": 1}]
+
+
+def test_restore_clears_every_workers_history_dedupe(app):
+	from backend import github_history
+	from backend.backup import create_backup, restore_backup
+
+	backup = create_backup(keep=5)
+	github_history.record({"user:me": {"followers": 3}})
+	seen, stamp = dict(github_history._seen), github_history._seen_stamp["value"]
+
+	restore_backup(backup["name"])
+	# What a worker that did not run the restore still holds
+	github_history._seen.update(seen)
+	github_history._seen_stamp["value"] = stamp
+
+	assert github_history.record({"user:me": {"followers": 3}}) == 1
+	assert github_history.history("user:me")["followers"][-1]["value"] == 3
@@ -0,0 +1,70 @@
+from datetime import datetime
+
+from sqlalchemy import text
+
+
+def _blog(title: str, category_id: int | None, created_at: datetime):
+	from backend.models import Blog
+
+	return Blog(title=title, content=title, category_id=category_id, created_at=created_at)
+
+
+def test_counts_follow_inserts_moves_and_deletes(app):
+	from backend.blog_index import facet_index
+	from backend.extensions import db
+	from backend.models import BlogCategory
+
+	news = BlogCategory(name="News")
+	db.session.add(news)
+	db.session.flush()
+	db.session.add_all([
+		_blog("a", news.id, datetime(2024, 1, 5)),
+		_blog("b", news.id, datetime(2024, 2, 5)),
+		_blog("c", None, datetime(2023, 12, 5)),
+	])
+	db.session.commit()
+
+	payload, etag = facet_index.get()
+	assert payload["total"] == 3 and payload["uncategorized"] == 1
+	assert payload["categories"] == [{"id": news.id, "name": "News", "count": 2}]
+	assert [(y["year"], y["count"]) for y in payload["archive"]] == [(2024, 2), (2023, 1)]
+
+	# Moving a post between months and categories, and raw SQL deletes, are counted too
+	db.session.execute(text("UPDATE blogs SET created_at = '2023-12-20 00:00:00', category_id = NULL WHERE title = 'b'"))
+	db.session.execute(text("DELETE FROM blogs WHERE title = 'a'"))
+	db.session.commit()
+	payload, changed = facet_index.get()
+	assert changed != etag
+	assert payload["categories"][0]["count"] == 0 and payload["uncategorized"] == 2
+	assert payload["archive"] == [{"year": 2023, "count": 2, "months": [{"month": "2023-12", "count": 2}]}]
+
+
+def test_category_rename_changes_the_etag(app):
+	from backend.blog_index import facet_index
+	from backend.extensions import db
+	from backend.models import BlogCategory
+
+	category = BlogCategory(name="Old")
+	db.session.add(category)
+	db.session.commit()
+	_, etag = facet_index.get()
+	assert facet_index.get()[1] == etag
+
+	category.name = "New"
+	db.session.commit()
+	payload, changed = facet_index.get()
+	assert changed != etag and payload["categories"][0]["name"] == "New"
+
+
+def test_facets_endpoint_answers_304_until_a_post_changes(app):
+	from backend.extensions import db
+
+	client = app.test_client()
+	first = client.get("/api/blogs/facets")
+	assert first.status_code == 200
+	assert client.get("/api/blogs/facets", headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+
+	db.session.add(_blog("new", None, datetime(2024, 3, 1)))
+	db.session.commit()
+	again = client.get("/api/blogs/facets", headers={"If-None-Match": first.headers["ETag"]})
+	assert again.status_code == 200 and again.get_json()["total"] == 1
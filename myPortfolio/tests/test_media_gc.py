@@ -0,0 +1,99 @@
+import os
+from time import time
+
+
+def _upload(app, name: str, age: float = 7200) -> str:
+	path = os.path.join(app.instance_path, "uploads", name)
+	os.makedirs(os.path.dirname(path), exist_ok=True)
+	with open(path, "wb") as fh:
+		fh.write(b"x" * 10)
+	stamp = time() - age
+	os.utime(path, (stamp, stamp))
+	return path
+
+
+def _remaining(app) -> set[str]:
+	root = os.path.join(app.instance_path, "uploads")
+	return {
+		os.path.relpath(os.path.join(dirpath, name), root).replace(os.sep, "/")
+		for dirpath, _, names in os.walk(root)
+		for name in names
+	}
+
+
+def _reference_files(app) -> None:
+	from backend.extensions import db
+	from backend.models import Blog, BlogImage, Project
+
+	db.session.add(Project(title="p", description="p", image_url="/uploads/project.png"))
+	blog = Blog(title="b", content='<img src="/uploads/inline/body.png">')
+	db.session.add(blog)
+	db.session.flush()
+	db.session.add(BlogImage(blog_id=blog.id, image_url="/uploads/blog.png"))
+	db.session.commit()
+	for name in ("project.png", "blog.png", "inline/body.png"):
+		_upload(app, name)
+
+
+def test_apply_removes_only_orphan_files(app):
+	from backend.media_gc import collect
+
+	_reference_files(app)
+	_upload(app, "orphan.png")
+	_upload(app, "nested/orphan.png")
+	# Younger than min_age: may belong to an upload whose row is not committed yet
+	_upload(app, "fresh.png", age=0)
+
+	report = collect(dry_run=True, pause=0)
+	assert report["complete"] and report["orphan_files"] == 2
+	assert len(_remaining(app)) == 6
+
+	report = collect(dry_run=False, pause=0)
+	assert report["complete"]
+	assert sorted(report["samples"]["orphan_files"]) == ["/uploads/nested/orphan.png", "/uploads/orphan.png"]
+	assert _remaining(app) == {"project.png", "blog.png", "inline/body.png", "fresh.png"}
+
+
+def test_capped_dry_runs_resume_where_the_last_one_stopped(app):
+	from backend.media_gc import collect
+
+	names = ["a.png", "b.png", "c.png", "sub/d.png", "sub/e.png"]
+	for name in names:
+		_upload(app, name)
+
+	seen = []
+	for _ in range(3):
+		report = collect(dry_run=True, batch_size=2, max_batches=1, pause=0)
+		seen.append(report["samples"]["orphan_files"])
+	assert seen == [
+		["/uploads/a.png", "/uploads/b.png"],
+		["/uploads/c.png", "/uploads/sub/d.png"],
+		["/uploads/sub/e.png"],
+	]
+	assert report["complete"]
+	assert report["resumed_from"] == {"phase": "orphan_files", "after": "/uploads/sub/d.png"}
+
+	# The pass finished, so the next capped run starts over
+	report = collect(dry_run=True, batch_size=2, max_batches=1, pause=0)
+	assert report["resumed_from"] is None
+	assert report["samples"]["orphan_files"] == ["/uploads/a.png", "/uploads/b.png"]
+	# Uncapped runs ignore the saved position and always do a full pass
+	assert collect(dry_run=True, batch_size=2, pause=0)["orphan_files"] == 5
+
+
+def test_capped_apply_runs_resume_past_files_they_deleted(app):
+	from backend.media_gc import collect
+
+	_reference_files(app)
+	for name in ("a.png", "c.png", "sub/d.png"):
+		_upload(app, name)
+
+	runs = 0
+	while True:
+		runs += 1
+		report = collect(dry_run=False, batch_size=2, max_batches=1, pause=0)
+		if report["complete"]:
+			break
+		assert runs < 10
+	assert runs > 1
+	assert _remaining(app) == {"project.png", "blog.png", "inline/body.png"}
@@ -0,0 +1,39 @@
+from datetime import datetime
+
+from sqlalchemy import insert, text
+
+
+def test_counters_follow_orm_core_and_raw_sql_writes(app):
+	from backend.extensions import db
+	from backend.models import ContactMessage, Project, Skill
+	from backend.stats import dashboard_stats
+
+	db.session.add(Project(title="p", description="p", image_data=b"x" * 100))
+	db.session.execute(insert(Skill), [{"name": f"s{i}", "level": "Expert"} for i in range(3)])
+	db.session.add(ContactMessage(first_name="a", last_name="b", phone_number="1", message="hi"))
+	db.session.commit()
+	stats = dashboard_stats()
+	assert (stats["projects"], stats["skills"], stats["messages"]) == (1, 3, 1)
+	assert stats["media_bytes"] == 100
+	assert stats["messages_by_day"][-1] == (datetime.utcnow().date().isoformat(), 1)
+
+	db.session.execute(text("UPDATE projects SET image_data = zeroblob(40)"))
+	db.session.execute(text("DELETE FROM skills WHERE name = 's0'"))
+	db.session.commit()
+	stats = dashboard_stats()
+	assert (stats["skills"], stats["media_bytes"]) == (2, 40)
+
+
+def test_missing_counters_are_backfilled_from_the_tables(app):
+	from backend import stats
+	from backend.extensions import db
+	from backend.models import Skill
+
+	db.session.add_all([Skill(name="a", level="Expert"), Skill(name="b", level="Expert")])
+	db.session.commit()
+	db.session.execute(text("DELETE FROM entity_stats WHERE name = 'skills'"))
+	db.session.commit()
+
+	with db.engine.connect() as conn:
+		stats.ensure_schema(conn)
+	assert stats.dashboard_stats()["skills"] == 2